@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Cold vs warm compile time for each installed LaTeX engine on our templates.
+
+Cold is the first compile with an empty format cache; warm is the median
+of the following runs. The PDF compile cache is bypassed throughout.
+
+Run from the backend directory:
+    python benchmarks/bench_compile_engines.py [--runs 5] [--entries 4]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_validation import build_resume
+from src.services import pdf_compiler
+from src.services.format_cache import FormatCache
+from src.services.latex_engines import ENGINES
+from src.services.latex_renderer import LaTeXRenderer
+from src.services.template_registry import template_registry
+
+
+def time_compiles(engine, tex: str, runs: int):
+    """
+    (cold seconds, warm median seconds) for one engine and source
+    """
+    with tempfile.TemporaryDirectory(prefix='bench-formats-') as format_dir:
+        # Fresh format cache so the first run pays for the dump
+        pdf_compiler.format_cache = FormatCache(format_dir, engine=engine.name if engine.supports_formats else 'pdflatex')
+        compiler = pdf_compiler.PDFCompiler(use_compile_cache=False, engine=engine)
+        timings = []
+        for _ in range(runs + 1):
+            started = time.perf_counter()
+            compiler.compile(tex)
+            timings.append(time.perf_counter() - started)
+    return timings[0], statistics.median(timings[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='warm runs per engine')
+    parser.add_argument('--entries', type=int, default=4, help='experience entries in the sample resume')
+    args = parser.parse_args()
+
+    engines = [engine for engine in ENGINES.values() if engine.available()]
+    if not engines:
+        print("No LaTeX engine found on PATH")
+        return
+
+    resume = build_resume(args.entries)
+    renderer = LaTeXRenderer()
+    print(f"{'template':<28} {'engine':<10} {'cold':>9} {'warm':>9}")
+    for template_name in template_registry.names():
+        tex = renderer.render(resume, template_name)
+        for engine in engines:
+            try:
+                cold, warm = time_compiles(engine, tex, args.runs)
+            except Exception as e:
+                print(f"{template_name:<28} {engine.name:<10} failed: {str(e).splitlines()[0]}")
+                continue
+            print(f"{template_name:<28} {engine.name:<10} {cold * 1000:6.0f} ms {warm * 1000:6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
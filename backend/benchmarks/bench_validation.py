@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of validate_resume_schema.
+
+Run from the backend directory:
+    python benchmarks/bench_validation.py [--entries 20] [--runs 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jsonschema
+from src.utils.resume_schema import RESUME_SCHEMA, RESUME_VALIDATOR, is_valid_resume
+from src.utils.validation import validate_resume_schema
+
+
+def build_resume(entries: int) -> dict:
+    """
+    Synthetic optimized resume with `entries` experience items
+    """
+    return {
+        "meta": {"region": "US", "seniority": "senior", "tone": "standard",
+                 "atsKeywords": ["python", "flask", "latex", "sql"]},
+        "contact": {"name": "Jane Doe", "email": "jane@example.com", "phone": "555-0100",
+                    "links": [{"label": "GitHub", "url": "https://github.com/jane"}]},
+        "summary": "Engineer building document pipelines.",
+        "experience": [
+            {
+                "company": f"Company {i}",
+                "role": "Software Engineer",
+                "location": "Remote",
+                "startDate": "2020-01",
+                "endDate": None if i == 0 else "2021-01",
+                "bullets": [
+                    {"text": f"Cut report latency {j * 10}% by caching renders", "skills": ["python"],
+                     "metric": f"{j * 10}%"}
+                    for j in range(4)
+                ]
+            }
+            for i in range(entries)
+        ],
+        "projects": [{"name": "Resume tool", "bullets": ["Built it", "Shipped it"]}],
+        "education": [{"institution": "State University", "degree": "BSc"}],
+        "skills": {"languages": ["Python", "SQL"], "tools": ["Docker"]},
+    }
+
+
+def legacy_validate(data: dict) -> None:
+    """
+    Pre-refactor behaviour: schema re-checked and validator rebuilt per call
+    """
+    try:
+        jsonschema.validate(data, RESUME_SCHEMA)
+    except jsonschema.ValidationError:
+        pass
+
+
+def report(label: str, func, data, runs: int) -> float:
+    per_call = min(timeit.repeat(lambda: func(data), number=runs, repeat=5)) / runs
+    print(f"{label:<34} {per_call * 1e6:10.1f} us/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    data = build_resume(args.entries)
+    print(f"resume with {args.entries} experience entries, best of 5 x {args.runs} calls")
+    before = report("jsonschema.validate (before)", legacy_validate, data, args.runs)
+    after = report("validate_resume_schema (after)", validate_resume_schema, data, args.runs)
+    print(f"speedup: {before / after:.1f}x")
+
+    reference = report("Draft7Validator.is_valid", RESUME_VALIDATOR.is_valid, data, args.runs)
+    generated = report("generated is_valid_resume", is_valid_resume, data, args.runs)
+    print(f"generated vs reference: {reference / generated:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Run parse -> optimize -> render -> compile over a directory of resumes.
+
+Every .pdf/.docx/.doc under INPUT_DIR becomes <name>.json (optimized),
+<name>.tex and <name>.pdf under OUTPUT_DIR, mirroring subdirectories.
+Each finished file is appended to a JSONL manifest; running the same
+command again skips files already done (matched by content hash), so a
+crashed or interrupted run continues where it stopped.
+
+Run from the backend directory:
+    python -m src.batch_cli INPUT_DIR OUTPUT_DIR [--jd job.txt] [--workers 8]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from tqdm import tqdm
+from src.utils.file_utils import allowed_file
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+# Per-process state set up by _init_worker
+_semaphores: Dict[str, Any] = {}
+_services: Dict[str, Any] = {}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_inputs(input_dir: str, skip_dir: str) -> List[str]:
+    """
+    Resume files under input_dir (relative paths, sorted), ignoring the output directory
+    """
+    found = []
+    skip_dir = os.path.abspath(skip_dir)
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != skip_dir)
+        for name in sorted(files):
+            if allowed_file(name):
+                found.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return found
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Latest record per input file. A line cut short by a crash is ignored.
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record['file']] = record
+    return records
+
+
+def _init_worker(semaphores: Dict[str, Any]):
+    _semaphores.update(semaphores)
+    load_dotenv()
+
+
+def _service(name: str):
+    """
+    One instance of each pipeline service per worker process
+    """
+    if name not in _services:
+        if name == 'parser':
+            from src.services.resume_parser import ResumeParser
+            _services[name] = ResumeParser()
+        elif name == 'optimizer':
+            from src.services.gemini_optimizer import GeminiOptimizer
+            _services[name] = GeminiOptimizer()
+        elif name == 'renderer':
+            from src.services.latex_renderer import LaTeXRenderer
+            _services[name] = LaTeXRenderer()
+        elif name == 'compiler':
+            from src.services.pdf_compiler import PDFCompiler
+            _services[name] = PDFCompiler()
+    return _services[name]
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def process_file(task: Tuple[str, str, str, bool, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Run one file through every stage. Returns its manifest record;
+    failures are recorded with the stage they happened in, never raised.
+    With `reuse_optimized` the optimized JSON from an earlier run is
+    loaded instead of calling Gemini again.
+    """
+    from src.services.page_fitter import page_fitter
+    input_dir, relative_path, output_dir, reuse_optimized, options = task
+    source_path = os.path.join(input_dir, relative_path)
+    output_base = os.path.join(output_dir, os.path.splitext(relative_path)[0])
+    record: Dict[str, Any] = {'file': relative_path, 'timings': {}}
+    started = time.perf_counter()
+
+    @contextmanager
+    def stage(name: str):
+        record['stage'] = name
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['timings'][name] = round((time.perf_counter() - began) * 1000, 1)
+
+    try:
+        with stage('read'):
+            record['sha256'] = file_sha256(source_path)
+        if reuse_optimized:
+            with stage('optimize'):
+                with open(output_base + '.json', 'r', encoding='utf-8') as f:
+                    optimized_json = json.load(f)
+        else:
+            with stage('parse'):
+                with _semaphores['parse']:
+                    draft = _service('parser').parse_file(source_path)
+
+            with stage('optimize'):
+                with _semaphores['optimize']:
+                    optimized_json = _service('optimizer').optimize_resume(
+                        draft, options['jd'], options['region'], options['seniority'], options['tone']
+                    )
+                _write_atomic(output_base + '.json', json.dumps(optimized_json, indent=2).encode('utf-8'))
+
+        with stage('render'):
+            tex_string = _service('renderer').render(optimized_json, options['template'])
+            _write_atomic(output_base + '.tex', tex_string.encode('utf-8'))
+
+        with stage('compile'):
+            with _semaphores['compile']:
+                compiler = _service('compiler')
+                if options['fit_to_page']:
+                    tex_string = page_fitter.fit(tex_string, compiler)['texString']
+                pdf_bytes, _, warnings = compiler.compile(tex_string)
+            _write_atomic(output_base + '.pdf', pdf_bytes)
+
+        del record['stage']
+        record.update(status='ok', output=os.path.relpath(output_base + '.pdf', output_dir), warnings=len(warnings))
+    except Exception as e:
+        record.update(status='failed', error=str(e) or type(e).__name__)
+    record['timeMs'] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def plan(files: List[str], input_dir: str, output_dir: str, done: Dict[str, Dict[str, Any]],
+         retry_failed: bool) -> Iterator[Tuple[str, bool]]:
+    """
+    (file, reuse_optimized) for files still to process: new, changed since
+    their record, or (with retry_failed) previously failed. A retry that
+    failed after optimization reuses the optimized JSON it already wrote.
+    """
+    for relative_path in files:
+        record = done.get(relative_path)
+        if record is None or record.get('sha256') is None:
+            yield relative_path, False
+        elif record['sha256'] != file_sha256(os.path.join(input_dir, relative_path)):
+            yield relative_path, False
+        elif record['status'] != 'ok' and retry_failed:
+            optimized_path = os.path.join(output_dir, os.path.splitext(relative_path)[0] + '.json')
+            yield relative_path, record.get('stage') in ('render', 'compile') and os.path.exists(optimized_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input_dir', help='directory of .pdf/.docx/.doc resumes (searched recursively)')
+    parser.add_argument('output_dir', help='where .json/.tex/.pdf results and the manifest go')
+    parser.add_argument('--jd', help='file with the job description to optimize against')
+    parser.add_argument('--region', default='US')
+    parser.add_argument('--seniority', default='mid')
+    parser.add_argument('--tone', default='standard')
+    parser.add_argument('--template', default='default_user_template')
+    parser.add_argument('--fit-to-page', action='store_true', help='tighten layout until each resume fits one page')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='worker processes')
+    parser.add_argument('--parse-concurrency', type=int, default=None, help='files parsed at once (default: workers)')
+    parser.add_argument('--optimize-concurrency', type=int, default=4, help='Gemini calls in flight at once')
+    parser.add_argument('--compile-concurrency', type=int, default=None,
+                        help='LaTeX compiles at once (default: CPU count)')
+    parser.add_argument('--manifest', help=f'manifest path (default: OUTPUT_DIR/{MANIFEST_NAME})')
+    parser.add_argument('--retry-failed', action='store_true', help='also rerun files that failed last time')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if not os.path.isdir(args.input_dir):
+        parser.error(f'{args.input_dir} is not a directory')
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = args.manifest or os.path.join(args.output_dir, MANIFEST_NAME)
+    job_description = ''
+    if args.jd:
+        with open(args.jd, 'r', encoding='utf-8') as f:
+            job_description = f.read()
+
+    files = find_inputs(args.input_dir, args.output_dir)
+    pending = list(plan(files, args.input_dir, args.output_dir, load_manifest(manifest_path), args.retry_failed))
+    print(f'{len(files)} files, {len(files) - len(pending)} already done, {len(pending)} to process')
+    if not pending:
+        return 0
+
+    options = {
+        'jd': job_description, 'region': args.region, 'seniority': args.seniority,
+        'tone': args.tone, 'template': args.template, 'fit_to_page': args.fit_to_page
+    }
+    workers = max(1, min(args.workers, len(pending)))
+    # Shared across worker processes: each stage has its own cap
+    semaphores = {
+        'parse': multiprocessing.BoundedSemaphore(args.parse_concurrency or workers),
+        'optimize': multiprocessing.BoundedSemaphore(args.optimize_concurrency),
+        'compile': multiprocessing.BoundedSemaphore(args.compile_concurrency or os.cpu_count() or 2),
+    }
+    tasks = [(args.input_dir, relative_path, args.output_dir, reuse_optimized, options)
+             for relative_path, reuse_optimized in pending]
+
+    failed = 0
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(semaphores,))
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, tqdm(total=len(tasks), unit='resume') as progress:
+        try:
+            futures = [executor.submit(process_file, task) for task in tasks]
+            for future in as_completed(futures):
+                record = future.result()
+                # One line per finished file, flushed at once: this is the resume point
+                manifest.write(json.dumps(record) + '\n')
+                manifest.flush()
+                os.fsync(manifest.fileno())
+                if record['status'] != 'ok':
+                    failed += 1
+                    error = (record.get('error') or 'unknown error').splitlines() or ['unknown error']
+                    progress.write(f"{record['file']}: {record.get('stage', 'setup')} failed: {error[0]}")
+                progress.set_postfix(failed=failed)
+                progress.update(1)
+        except (BrokenProcessPool, KeyboardInterrupt) as e:
+            # Everything finished so far is in the manifest; rerun to continue
+            executor.shutdown(wait=False, cancel_futures=True)
+            progress.write(f'Stopped ({type(e).__name__}); rerun the same command to continue')
+            return 2
+    executor.shutdown()
+
+    print(f'{len(tasks) - failed} succeeded, {failed} failed; manifest: {manifest_path}')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
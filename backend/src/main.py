@@ -6,7 +6,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from dotenv import load_dotenv
+from sqlalchemy import event
 from src.models.user import db
+import src.models.resume  # registers the resume tables for create_all
 from src.routes.user import user_bp
 from src.routes.resume import resume_bp
 
@@ -18,8 +20,16 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', 12)) * 1024 * 1024
 
 # Enable CORS for all routes with explicit configuration
-CORS(app, origins=['*'], methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'], 
-     allow_headers=['Content-Type', 'Authorization'], supports_credentials=True)
+# Conditional requests (If-Match on PATCH, If-None-Match/Range on PDFs) need
+# their headers allowed, and clients must be able to read the validators
+# and metadata headers the API sets
+CORS(app, origins=['*'], methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
+     allow_headers=['Content-Type', 'Authorization', 'If-Match', 'If-None-Match', 'If-Range', 'Range'],
+     expose_headers=['ETag', 'Content-Disposition', 'Content-Location', 'Content-Range', 'Accept-Ranges',
+                     'Link', 'Retry-After', 'X-Compilation-Warnings', 'X-Compile-Cache',
+                     'X-Fit-Level', 'X-Fit-Pages', 'X-Fit-Iterations', 'X-Fit-Time-Ms',
+                     'X-Batch-Documents', 'X-Next-Cursor'],
+     supports_credentials=True)
 
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(resume_bp, url_prefix='/api/resume')
@@ -27,8 +37,33 @@ app.register_blueprint(resume_bp, url_prefix='/api/resume')
 # uncomment if you need to use database
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Threaded workers share a connection pool; a writer waits up to
+# SQLITE_BUSY_TIMEOUT_MS for the lock instead of failing at once
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+    'pool_pre_ping': True,
+    'connect_args': {
+        'check_same_thread': False,
+        'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000
+    }
+}
 db.init_app(app)
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside a writer; NORMAL sync is safe in WAL
+    and skips an fsync per commit. The busy timeout comes from the
+    driver's connect timeout above.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
 with app.app_context():
+    event.listen(db.engine, 'connect', _sqlite_pragmas)
     db.create_all()
 
 @app.route('/', defaults={'path': ''})
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import uuid
+from src.models.user import db
+
+
+def content_hash(document) -> str:
+    """
+    SHA-256 of a JSON document in canonical form (sorted keys, no
+    whitespace), so equal documents hash equally whatever their key order
+    """
+    canonical = json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+
+class ResumeDraft(db.Model):
+    """
+    Structured draft produced by ingest, before optimization
+    """
+    __tablename__ = 'resume_drafts'
+    __table_args__ = (db.Index('ix_resume_drafts_owner_created', 'owner_id', 'created_at'),)
+
+    id = db.Column(db.String(32), primary_key=True, default=_new_id)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+    source = db.Column(db.String(255))
+    document = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), index=True)
+
+    def __repr__(self):
+        return f'<ResumeDraft {self.id}>'
+
+
+class OptimizedResume(db.Model):
+    """
+    Optimized resume; `id` is the resumeId clients pass around. Edits
+    replace the document and bump `version` (compare-and-swap).
+    """
+    __tablename__ = 'optimized_resumes'
+    __table_args__ = (db.Index('ix_optimized_resumes_owner_created', 'owner_id', 'created_at'),)
+
+    id = db.Column(db.String(32), primary_key=True, default=_new_id)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    draft_id = db.Column(db.String(32), db.ForeignKey('resume_drafts.id'), nullable=True, index=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+    document = db.Column(db.JSON, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
+
+    def __repr__(self):
+        return f'<OptimizedResume {self.id} v{self.version}>'
+
+    def to_dict(self):
+        return {
+            'resumeId': self.id,
+            'ownerId': self.owner_id,
+            'draftId': self.draft_id,
+            'contentHash': self.content_hash,
+            'version': self.version,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class RenderedLatex(db.Model):
+    """
+    LaTeX source keyed by the SHA-256 of its bytes; `source_hash` is the
+    content hash of the optimized document it was rendered from
+    """
+    __tablename__ = 'rendered_latex'
+    __table_args__ = (db.Index('ix_rendered_latex_source_template', 'source_hash', 'template_name'),)
+
+    id = db.Column(db.String(64), primary_key=True)
+    source_hash = db.Column(db.String(64), nullable=True)
+    template_name = db.Column(db.String(120), nullable=True)
+    tex = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), index=True)
+
+    def __repr__(self):
+        return f'<RenderedLatex {self.id[:12]}>'
+
+
+class PdfArtifact(db.Model):
+    """
+    A compiled PDF keyed by the SHA-256 of its bytes. Only metadata lives
+    here: compiles are deterministic, so once the on-disk artifact store
+    has dropped the PDF, clients are sent to its LaTeX to compile again.
+    """
+    __tablename__ = 'pdf_artifacts'
+
+    id = db.Column(db.String(64), primary_key=True)
+    latex_id = db.Column(db.String(64), db.ForeignKey('rendered_latex.id'), nullable=False, index=True)
+    engine = db.Column(db.String(120), nullable=False)
+    size = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), index=True)
+
+    latex = db.relationship('RenderedLatex')
+
+    def __repr__(self):
+        return f'<PdfArtifact {self.id[:12]}>'
@@ -1,28 +1,78 @@
 import os
+import re
+import gzip
+import hashlib
 import json
 import tempfile
 import subprocess
-from flask import Blueprint, request, jsonify, send_file
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import Blueprint, request, jsonify, send_file, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import google.generativeai as genai
 from src.services.resume_parser import ResumeParser
-from src.services.gemini_optimizer import GeminiOptimizer
+from src.services.gemini_optimizer import GeminiOptimizer, GeminiBusy, GEMINI_TIMEOUT_BUDGET
 from src.services.latex_renderer import LaTeXRenderer
-from src.services.pdf_compiler import PDFCompiler
-from src.utils.validation import validate_resume_schema
+from src.services.preview_renderer import PREVIEW_RENDERERS
+from src.services.template_registry import TemplateNotFound
+from src.services.block_cache import block_cache
+from src.services.pdf_compiler import PDFCompiler, CompilationError
+from src.services.page_fitter import page_fitter
+from src.services.compile_cache import compile_cache
+from src.services.compile_workspace import workspace_manager
+from src.services.compile_scheduler import compile_scheduler, CompileQueueTimeout
+from src.services.batch_compiler import batch_compiler
+from src.services.artifact_store import artifact_store, ARTIFACT_TYPES
+from src.services.thumbnail_renderer import thumbnail_renderer, ThumbnailUnavailable, THUMBNAIL_FORMATS
+from src.services.resume_store import resume_store
+from src.models.user import db, User
+from src.utils.validation import validate_resume_schema, validate_resume_subtrees
+from src.utils.json_patch import apply_patch, JsonPatchError, JsonPatchTestFailed
 from src.utils.file_utils import allowed_file, extract_google_doc_id
+from src.utils.zip_stream import ZipStream
 
 resume_bp = Blueprint('resume', __name__)
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 
+# Seconds between keep-alive comments while a pipeline stage runs
+PIPELINE_HEARTBEAT = float(os.getenv('PIPELINE_HEARTBEAT', 15))
+# Pipeline stages run here so the response thread can keep the stream alive
+_pipeline_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('PIPELINE_MAX_CONCURRENCY', 8)),
+    thread_name_prefix='pipeline'
+)
+
+def _resolve_owner(data):
+    """
+    Optional ownerId (a user id) from a JSON body or form, checked
+    against the users table before anything is stored under it.
+    Returns (owner_id, error_response)
+    """
+    owner = data.get('ownerId') if data else None
+    if owner in (None, ''):
+        return None, None
+    try:
+        owner_id = int(owner)
+    except (TypeError, ValueError):
+        return None, (jsonify({'error': 'ownerId must be a user id'}), 400)
+    if db.session.get(User, owner_id) is None:
+        return None, (jsonify({'error': 'Owner not found'}), 404)
+    return owner_id, None
+
 @resume_bp.route('/ingest', methods=['POST'])
 def ingest_resume():
     """
     Ingest resume from file upload or Google Docs URL
     """
     try:
+        owner_id, error_response = _resolve_owner(
+            request.form if 'file' in request.files else request.get_json(silent=True)
+        )
+        if error_response:
+            return error_response
+        
         resume_parser = ResumeParser()
         
         # Check if file was uploaded
@@ -40,8 +90,10 @@ def ingest_resume():
                     
                     # Clean up temp file
                     os.unlink(temp_file.name)
-                    
+                
+                draft_id = resume_store.put_draft(resume_data, owner_id, filename)
                 return jsonify({
+                    'draftId': draft_id,
                     'resumeStructuredDraft': resume_data,
                     'rawTextStats': {
                         'wordCount': len(resume_data.get('rawText', '').split()),
@@ -61,7 +113,9 @@ def ingest_resume():
             # Parse Google Doc
             resume_data = resume_parser.parse_google_doc(doc_id)
             
+            draft_id = resume_store.put_draft(resume_data, owner_id, google_doc_url)
             return jsonify({
+                'draftId': draft_id,
                 'resumeStructuredDraft': resume_data,
                 'rawTextStats': {
                     'wordCount': len(resume_data.get('rawText', '').split()),
@@ -81,37 +135,333 @@ def optimize_resume():
     """
     Optimize resume using Gemini AI
     """
+    # The deadline starts with the request, not with the upstream call
+    request_started = time.monotonic()
     try:
         data = request.json
         resume_draft = data.get('resumeStructuredDraft')
+        draft_id = data.get('draftId')
         job_description = data.get('jd', '')
         region = data.get('region', 'US')
         seniority = data.get('seniority', 'mid')
         tone = data.get('tone', 'standard')
+        deadline_ms = data.get('deadlineMs')
         
+        if not resume_draft and draft_id:
+            resume_draft = resume_store.get_draft(draft_id)
+            if resume_draft is None:
+                return jsonify({'error': 'Draft not found'}), 404
         if not resume_draft:
-            return jsonify({'error': 'Resume structured draft is required'}), 400
+            return jsonify({'error': 'Resume structured draft or draftId is required'}), 400
+        owner_id, error_response = _resolve_owner(data)
+        if error_response:
+            return error_response
+        
+        # Client deadlines may only tighten the server-side budget
+        budget = GEMINI_TIMEOUT_BUDGET
+        if deadline_ms:
+            budget = min(budget, float(deadline_ms) / 1000.0)
         
         # Initialize Gemini optimizer
         optimizer = GeminiOptimizer()
         
         # Optimize resume
         optimized_json = optimizer.optimize_resume(
-            resume_draft, job_description, region, seniority, tone
+            resume_draft, job_description, region, seniority, tone,
+            deadline=request_started + budget
         )
         
         # Validate against schema
         validation_report = validate_resume_schema(optimized_json)
         
+        # Keep the result server-side so the editor can send patches instead of documents
+        resume_id = resume_store.put(optimized_json, owner_id, draft_id)
+        
         return jsonify({
+            'resumeId': resume_id,
             'optimizedJson': optimized_json,
             'atsKeywords': optimized_json.get('meta', {}).get('atsKeywords', []),
             'validationReport': validation_report
         })
         
+    except GeminiBusy as e:
+        response = jsonify({'error': 'Optimizer is busy, please retry', 'details': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse(event: str, data: dict) -> str:
+    """
+    One server-sent event
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stage(stage: str, timings: dict, fn, *args, inflight: list = None):
+    """
+    Run one pipeline stage on a worker thread, yielding SSE events: a
+    'started' event, ':' keep-alive comments while it runs (Gemini calls
+    can outlast proxy idle timeouts) and a 'completed' event with its
+    duration. Returns the stage's result; exceptions propagate. If the
+    stream closes first, a stage that has not started is cancelled and
+    one that has is added to `inflight`.
+    """
+    yield _sse('stage', {'stage': stage, 'status': 'started'})
+    started = time.perf_counter()
+    future = _pipeline_executor.submit(fn, *args)
+    try:
+        while True:
+            try:
+                result = future.result(timeout=PIPELINE_HEARTBEAT)
+                break
+            except FutureTimeout:
+                yield ': keep-alive\n\n'
+    except GeneratorExit:
+        if not future.cancel() and inflight is not None:
+            inflight.append(future)
+        raise
+    timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+    yield _sse('stage', {'stage': stage, 'status': 'completed', 'timeMs': timings[stage]})
+    return result
+
+def _pipeline_events(source_path: str, doc_id: str, owner_id: int, options: dict):
+    """
+    ingest -> optimize -> render -> compile as a stream of SSE events,
+    ending with 'complete' (artifact URLs) or 'error' (failing stage)
+    """
+    pipeline_started = time.monotonic()
+    timings = {}
+    # Stages still running after the client went away
+    inflight = []
+    stage = 'ingest'
+    try:
+        parser = ResumeParser()
+        if source_path:
+            draft = yield from _stage(stage, timings, parser.parse_file, source_path, inflight=inflight)
+        else:
+            draft = yield from _stage(stage, timings, parser.parse_google_doc, doc_id)
+        draft_id = resume_store.put_draft(draft, owner_id, options.get('fileName') or options.get('googleDocUrl'))
+        
+        stage = 'optimize'
+        budget = GEMINI_TIMEOUT_BUDGET
+        if options.get('deadlineMs'):
+            budget = min(budget, float(options['deadlineMs']) / 1000.0)
+        optimized_json = yield from _stage(
+            stage, timings, GeminiOptimizer().optimize_resume, draft, options.get('jd', ''),
+            options.get('region', 'US'), options.get('seniority', 'mid'), options.get('tone', 'standard'),
+            pipeline_started + budget
+        )
+        validation_report = validate_resume_schema(optimized_json)
+        resume_id = resume_store.put(optimized_json, owner_id, draft_id)
+        
+        stage = 'render'
+        tex_string = yield from _stage(stage, timings, LaTeXRenderer().render, optimized_json,
+                                       options.get('templateName') or 'default_user_template')
+        
+        stage = 'compile'
+        compiler = PDFCompiler()
+        fit_to_page = str(options.get('fitToOnePage', '')).lower() in ('1', 'true', 'yes')
+        
+        def compile_stage():
+            fitted = page_fitter.fit(tex_string, compiler)['texString'] if fit_to_page else tex_string
+            entry, pdf_bytes, warnings = compiler.compile_to_cache(fitted)
+            digest = artifact_store.put_cached_pdf(entry) if entry is not None else None
+            if digest is None:
+                if pdf_bytes is None:
+                    # Entry without a hash, or it could not be copied: read it back
+                    pdf_bytes = compiler.compile(fitted)[0]
+                digest = artifact_store.put_bytes(pdf_bytes, 'pdf')
+            return fitted, entry, warnings, digest, entry['size'] if entry else len(pdf_bytes)
+        
+        tex_string, entry, warnings, pdf_digest, pdf_size = yield from _stage(stage, timings, compile_stage)
+        resume_store.record_pdf(pdf_digest, tex_string, compiler.engine.name, pdf_size)
+        
+        result = {
+            'draftId': draft_id,
+            'resumeId': resume_id,
+            'pdfUrl': _artifact_url(pdf_digest, 'pdf'),
+            'texUrl': _artifact_url(artifact_store.put_text(tex_string, 'tex'), 'tex'),
+            'atsKeywords': optimized_json.get('meta', {}).get('atsKeywords', []),
+            'validationReport': validation_report,
+            'warnings': warnings,
+            'timings': timings,
+            'totalMs': round((time.monotonic() - pipeline_started) * 1000, 1)
+        }
+        if entry is not None:
+            result['thumbnailsUrl'] = url_for('resume.list_pdf_thumbnails', cache_key=entry['key'])
+        yield _sse('complete', result)
+        
+    except CompilationError as e:
+        yield _sse('error', {'stage': stage, 'error': 'PDF compilation failed', 'details': str(e), **e.to_dict()})
+    except CompileQueueTimeout as e:
+        yield _sse('error', {'stage': stage, 'error': 'Compile service busy, retry shortly', 'details': str(e)})
+    except TemplateNotFound:
+        yield _sse('error', {'stage': stage, 'error': f"Unknown template: {options.get('templateName')}"})
+    except Exception as e:
+        yield _sse('error', {'stage': stage, 'error': str(e)})
+    finally:
+        if source_path:
+            if inflight:
+                # The parser may still be reading the upload
+                inflight[0].add_done_callback(lambda _: _remove_upload(source_path))
+            else:
+                _remove_upload(source_path)
+
+def _remove_upload(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+@resume_bp.route('/pipeline', methods=['POST'])
+def run_pipeline():
+    """
+    Upload (or googleDocUrl) to PDF in one request. Runs ingest,
+    optimize, render and compile server-side and streams text/event-stream
+    progress: 'stage' events with per-stage timings, then 'complete' with
+    resumeId and artifact URLs for the PDF and LaTeX, or 'error'.
+    Options (jd, region, seniority, tone, templateName, fitToOnePage,
+    deadlineMs) come as form fields next to the file, or as JSON.
+    """
+    try:
+        source_path = doc_id = None
+        if 'file' in request.files:
+            options = request.form.to_dict()
+        else:
+            options = request.get_json(silent=True) or {}
+        # Checked before the upload is saved or the stream starts
+        owner_id, error_response = _resolve_owner(options)
+        if error_response:
+            return error_response
+        
+        if 'file' in request.files:
+            file = request.files['file']
+            if not (file and file.filename and allowed_file(file.filename)):
+                return jsonify({'error': 'Unsupported file type'}), 400
+            options['fileName'] = secure_filename(file.filename)
+            # Saved now: the upload stream is gone once the response starts
+            suffix = os.path.splitext(secure_filename(file.filename))[1]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+                file.save(temp_file)
+                source_path = temp_file.name
+        else:
+            doc_id = extract_google_doc_id(options.get('googleDocUrl', ''))
+            if not doc_id:
+                return jsonify({'error': 'No file or Google Docs URL provided'}), 400
+        
+        response = Response(stream_with_context(_pipeline_events(source_path, doc_id, owner_id, options)),
+                             mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Keep reverse proxies from holding events back
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@resume_bp.route('/optimized', methods=['GET'])
+def list_optimized_resumes():
+    """
+    An owner's stored resumes, newest first: ?ownerId=&limit=
+    """
+    owner_id = request.args.get('ownerId', type=int)
+    if owner_id is None:
+        return jsonify({'error': 'ownerId is required'}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    return jsonify([resume.to_dict() for resume in resume_store.list_for_owner(owner_id, limit)])
+
+@resume_bp.route('/optimized/<resume_id>', methods=['GET'])
+def get_optimized_resume(resume_id):
+    """
+    Fetch a stored optimized resume
+    """
+    entry = resume_store.get(resume_id)
+    if entry is None:
+        return jsonify({'error': 'Resume not found'}), 404
+    
+    optimized_json, version = entry
+    response = jsonify({
+        'resumeId': resume_id,
+        'version': version,
+        'optimizedJson': optimized_json
+    })
+    response.set_etag(str(version))
+    return response
+
+@resume_bp.route('/optimized/<resume_id>', methods=['PATCH'])
+def patch_optimized_resume(resume_id):
+    """
+    Apply RFC 6902 JSON Patch operations to a stored optimized resume.
+    Only the touched subtrees are re-validated. Send If-Match with the
+    version (ETag) the edit was based on to reject conflicting edits.
+    """
+    try:
+        operations = request.get_json(force=True, silent=True)
+        if not isinstance(operations, list):
+            return jsonify({'error': 'Body must be a JSON Patch array'}), 400
+        
+        entry = resume_store.get(resume_id)
+        if entry is None:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        optimized_json, version = entry
+        if request.if_match and not request.if_match.contains(str(version)):
+            return jsonify({'error': 'Resume was modified', 'version': version}), 412
+        
+        try:
+            patched_json, touched = apply_patch(optimized_json, operations)
+        except JsonPatchTestFailed as e:
+            return jsonify({'error': str(e)}), 409
+        except JsonPatchError as e:
+            return jsonify({'error': str(e)}), 422
+        
+        validation_report = validate_resume_subtrees(patched_json, touched)
+        
+        new_version = resume_store.replace(resume_id, patched_json, version)
+        if new_version is None:
+            return jsonify({'error': 'Resume was modified concurrently'}), 409
+        
+        response = jsonify({
+            'resumeId': resume_id,
+            'version': new_version,
+            'validationReport': validation_report
+        })
+        response.set_etag(str(new_version))
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _resolve_optimized_json(data: dict):
+    """
+    Inline optimizedJson, or the stored resume named by resumeId.
+    Returns (optimized_json, error_response)
+    """
+    optimized_json = data.get('optimizedJson')
+    resume_id = data.get('resumeId')
+    
+    if not optimized_json and resume_id:
+        entry = resume_store.get(resume_id)
+        if entry is None:
+            return None, (jsonify({'error': 'Resume not found'}), 404)
+        optimized_json = entry[0]
+    
+    if not optimized_json:
+        return None, (jsonify({'error': 'Optimized JSON or resumeId is required'}), 400)
+    
+    return optimized_json, None
+
+def _is_stored(data: dict) -> bool:
+    """
+    Whether _resolve_optimized_json took the document from the store.
+    Only LaTeX rendered from stored resumes is recorded, never documents
+    or LaTeX a client sent inline.
+    """
+    return bool(data.get('resumeId')) and not data.get('optimizedJson')
+
 @resume_bp.route('/render', methods=['POST'])
 def render_latex():
     """
@@ -119,17 +469,19 @@ def render_latex():
     """
     try:
         data = request.json
-        optimized_json = data.get('optimizedJson')
         template_name = data.get('templateName', 'default_user_template')
         
-        if not optimized_json:
-            return jsonify({'error': 'Optimized JSON is required'}), 400
+        optimized_json, error_response = _resolve_optimized_json(data)
+        if error_response:
+            return error_response
         
         # Initialize LaTeX renderer
         renderer = LaTeXRenderer()
         
         # Render to LaTeX
         tex_string = renderer.render(optimized_json, template_name)
+        if _is_stored(data):
+            resume_store.record_latex(tex_string, optimized_json, template_name)
         
         # Encode to Base64 for safe transport
         import base64
@@ -137,16 +489,221 @@ def render_latex():
         
         return jsonify({
             'texString': tex_string,  # Keep for preview
-            'base64Tex': base64_tex   # For compilation
+            'base64Tex': base64_tex,  # For compilation
+            'artifactUrl': _artifact_url(artifact_store.put_text(tex_string, 'tex'), 'tex')
         })
         
+    except TemplateNotFound:
+        return jsonify({'error': f'Unknown template: {template_name}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@resume_bp.route('/preview', methods=['POST'])
+def render_preview():
+    """
+    Render optimized JSON to HTML, Markdown or ATS plain text without LaTeX
+    """
+    try:
+        data = request.json
+        output_format = data.get('format', 'html')
+        
+        renderer_class = PREVIEW_RENDERERS.get(output_format)
+        if renderer_class is None:
+            return jsonify({'error': f"Unsupported format: {output_format}. Use one of: {', '.join(PREVIEW_RENDERERS)}"}), 400
+        
+        optimized_json, error_response = _resolve_optimized_json(data)
+        if error_response:
+            return error_response
+        
+        output = renderer_class().render(optimized_json)
+        return Response(output, mimetype=renderer_class.mimetype)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+PDF_DOWNLOAD_NAME = 'optimized_resume.pdf'
+
+# Chunk size when streaming a gzipped cache entry
+PDF_STREAM_CHUNK = 64 * 1024
+
+def _annotate_pdf_response(response: Response, warnings: list, cache_status: str = None) -> Response:
+    """
+    Warning and cache headers shared by every PDF response
+    """
+    # Check for critical warnings
+    critical_warnings = [w for w in warnings if 'Font Warning' in w or 'Overfull' in w]
+    
+    if critical_warnings:
+        # Log warnings but still return PDF
+        print(f"PDF compilation warnings: {critical_warnings}")
+    
+    # Add warnings as header if any
+    if warnings:
+        response.headers['X-Compilation-Warnings'] = str(len(warnings))
+    
+    if cache_status:
+        response.headers['X-Compile-Cache'] = cache_status
+    
+    return response
+
+def _artifact_url(digest: str, ext: str) -> str:
+    return url_for('resume.get_artifact', digest=digest, ext=ext)
+
+def _tex_response(tex_string: str) -> Response:
+    """
+    LaTeX source as a response pointing at its artifact URL
+    """
+    response = Response(tex_string, mimetype='application/x-tex')
+    response.headers['Content-Disposition'] = 'inline; filename=optimized_resume.tex'
+    response.headers['Content-Location'] = _artifact_url(artifact_store.put_text(tex_string, 'tex'), 'tex')
+    return response
+
+def _pdf_response(pdf_bytes: bytes, warnings: list, cache_status: str = None) -> Response:
+    """
+    Wrap compiled PDF bytes in a download response
+    """
+    # Create response with PDF bytes
+    response = Response(pdf_bytes, mimetype='application/pdf')
+    response.headers['Content-Disposition'] = f'attachment; filename={PDF_DOWNLOAD_NAME}'
+    # Compiles are deterministic, so the content hash is a stable validator
+    digest = artifact_store.put_bytes(pdf_bytes, 'pdf')
+    response.set_etag(digest)
+    response.make_conditional(request)
+    response.headers['Content-Location'] = _artifact_url(digest, 'pdf')
+    return _annotate_pdf_response(response, warnings, cache_status)
+
+def _cached_pdf_response(entry: dict, cache_status: str = None) -> Response:
+    """
+    Stream a compile-cache entry from disk. Plain entries go through
+    send_file (sendfile where the server supports it, with ETag, Range and
+    If-None-Match on GET); gzipped ones are decompressed chunk by chunk.
+    Raises FileNotFoundError if the entry was evicted in the meantime.
+    """
+    # ETag is the hash of the PDF bytes, valid across servers and restarts
+    etag = entry.get('sha256') or entry['key']
+    if entry['compressed']:
+        source = gzip.open(entry['path'], 'rb')
+        stream = iter(lambda: source.read(PDF_STREAM_CHUNK), b'')
+        response = Response(stream, mimetype='application/pdf', direct_passthrough=True)
+        # Closed even when the body is never sent (304, client gone)
+        response.call_on_close(source.close)
+        response.headers['Content-Disposition'] = f'attachment; filename={PDF_DOWNLOAD_NAME}'
+        response.headers['Content-Length'] = str(entry['size'])
+        response.set_etag(etag)
+        response.make_conditional(request, accept_ranges=False)
+    else:
+        response = send_file(entry['path'], mimetype='application/pdf', as_attachment=True,
+                             download_name=PDF_DOWNLOAD_NAME, conditional=True, etag=etag,
+                             last_modified=None, max_age=0)
+    
+    # Point at the immutable artifact URL browsers and CDNs can cache
+    digest = artifact_store.put_cached_pdf(entry)
+    if digest:
+        response.headers['Content-Location'] = _artifact_url(digest, 'pdf')
+    else:
+        response.headers['Content-Location'] = url_for('resume.get_compiled_pdf', cache_key=entry['key'])
+    response.headers['Link'] = f'<{url_for("resume.list_pdf_thumbnails", cache_key=entry["key"])}>; rel="preview"'
+    return _annotate_pdf_response(response, entry['warnings'], cache_status)
+
+def _compile_response(compiler: PDFCompiler, tex_string: str, record: bool = False) -> Response:
+    """
+    Compile into the cache and stream the result from disk, falling back
+    to the PDF in memory when the cache is disabled or could not keep it.
+    `record` links the PDF to its LaTeX in the resume store.
+    """
+    entry, pdf_bytes, warnings = compiler.compile_to_cache(tex_string)
+    if entry is not None:
+        try:
+            response = _cached_pdf_response(entry, compiler.last_cache_status)
+            if record and entry.get('sha256'):
+                resume_store.record_pdf(entry['sha256'], tex_string, compiler.engine.name, entry['size'])
+            return response
+        except FileNotFoundError:
+            # Evicted between lookup and open
+            pdf_bytes, _, warnings = compiler.compile(tex_string)
+    if record:
+        resume_store.record_pdf(hashlib.sha256(pdf_bytes).hexdigest(), tex_string, compiler.engine.name,
+                                len(pdf_bytes))
+    return _pdf_response(pdf_bytes, warnings, compiler.last_cache_status)
+
+def _annotate_fit(response: Response, fit: dict = None) -> Response:
+    """
+    Report what fit-to-one-page did, when it was requested
+    """
+    if fit:
+        response.headers['X-Fit-Level'] = str(fit['level'])
+        response.headers['X-Fit-Pages'] = str(fit['pages'])
+        response.headers['X-Fit-Iterations'] = str(fit['iterations'])
+        response.headers['X-Fit-Time-Ms'] = str(fit['timeMs'])
+    return response
+
+def _busy_response(error: Exception):
+    """
+    503 for compiles turned away by the scheduler
+    """
+    response = jsonify({'error': 'Compile service is busy, please retry', 'details': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, int(compile_scheduler.queue_timeout)))
+    return response
+
+@resume_bp.route('/document', methods=['POST'])
+def render_document():
+    """
+    JSON -> LaTeX -> PDF in one request, returning raw PDF bytes.
+    Accepts optimizedJson or a stored resumeId; pass format='tex' to get
+    the LaTeX source instead of the PDF, and fitToOnePage=true to tighten
+    spacing and font size until the resume fits one page.
+    """
+    template_name = None
+    try:
+        data = request.get_json(silent=True) or {}
+        template_name = data.get('templateName', 'default_user_template')
+        output_format = data.get('format', 'pdf')
+        
+        if output_format not in ('pdf', 'tex'):
+            return jsonify({'error': "format must be 'pdf' or 'tex'"}), 400
+        
+        optimized_json, error_response = _resolve_optimized_json(data)
+        if error_response:
+            return error_response
+        
+        tex_string = LaTeXRenderer().render(optimized_json, template_name)
+        
+        compiler = PDFCompiler()
+        try:
+            fit = page_fitter.fit(tex_string, compiler) if data.get('fitToOnePage') else None
+            if fit:
+                tex_string = fit['texString']
+            
+            if output_format == 'tex':
+                response = _tex_response(tex_string)
+            else:
+                response = _compile_response(compiler, tex_string, record=_is_stored(data))
+            return _annotate_fit(response, fit)
+        except CompileQueueTimeout as e:
+            return _busy_response(e)
+        except CompilationError as compile_error:
+            return jsonify({
+                'error': 'PDF compilation failed',
+                'details': str(compile_error),
+                **compile_error.to_dict()
+            }), 422
+        except Exception as compile_error:
+            return jsonify({
+                'error': 'PDF compilation failed',
+                'details': str(compile_error)
+            }), 422
+        
+    except TemplateNotFound:
+        return jsonify({'error': f'Unknown template: {template_name}'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @resume_bp.route('/compile', methods=['POST'])
 def compile_pdf():
     """
-    Compile LaTeX to PDF using Base64 transport
+    Compile LaTeX to PDF using Base64 transport, or a stored resume
+    by resumeId (rendered with templateName)
     """
     try:
         data = request.json
@@ -154,59 +711,268 @@ def compile_pdf():
         tex_string = data.get('texString')  # Fallback for compatibility
         include_log = data.get('includeLog', False)
         
+        rendered = not base64_tex and not tex_string and data.get('resumeId')
+        if rendered:
+            # Stored resume: render it here instead of round-tripping the LaTeX
+            optimized_json, error_response = _resolve_optimized_json(data)
+            if error_response:
+                return error_response
+            template_name = data.get('templateName', 'default_user_template')
+            try:
+                tex_string = LaTeXRenderer().render(optimized_json, template_name)
+            except TemplateNotFound:
+                return jsonify({'error': f'Unknown template: {template_name}'}), 400
+        
         if not base64_tex and not tex_string:
-            return jsonify({'error': 'Base64 LaTeX string is required'}), 400
+            return jsonify({'error': 'Base64 LaTeX string or resumeId is required'}), 400
         
         # Initialize PDF compiler
         compiler = PDFCompiler()
         
+        if base64_tex:
+            # Use Base64 method (preferred)
+            try:
+                tex_string = PDFCompiler.decode_base64(base64_tex)
+            except ValueError as e:
+                return jsonify({'error': 'PDF compilation failed', 'details': str(e)}), 422
+        
+        # includeLog only matters on failure, where the log tail travels with
+        # CompilationError; successful compiles stay cacheable
         try:
-            if base64_tex:
-                # Use Base64 method (preferred)
-                pdf_bytes, log_content, warnings = compiler.compile_from_base64(base64_tex, include_log)
-            else:
-                # Fallback to direct string method
-                pdf_bytes, log_content, warnings = compiler.compile(tex_string, include_log)
-            
-            # Check for critical warnings
-            critical_warnings = [w for w in warnings if 'Font Warning' in w or 'Overfull' in w]
-            
-            if critical_warnings:
-                # Log warnings but still return PDF
-                print(f"PDF compilation warnings: {critical_warnings}")
-            
-            # Create response with PDF bytes
-            from flask import Response
-            response = Response(pdf_bytes, mimetype='application/pdf')
-            response.headers['Content-Disposition'] = 'attachment; filename=optimized_resume.pdf'
-            
-            # Add warnings as header if any
-            if warnings:
-                response.headers['X-Compilation-Warnings'] = str(len(warnings))
-            
-            return response
+            fit = page_fitter.fit(tex_string, compiler) if data.get('fitToOnePage') else None
+            return _annotate_fit(_compile_response(compiler, fit['texString'] if fit else tex_string,
+                                                   record=bool(rendered) and _is_stored(data)), fit)
             
+        except CompileQueueTimeout as e:
+            return _busy_response(e)
+        except CompilationError as compile_error:
+            # Diagnostics come from the failed run itself; no second compile
+            return jsonify({
+                'error': 'PDF compilation failed',
+                'details': str(compile_error),
+                **compile_error.to_dict(include_log)
+            }), 422
         except Exception as compile_error:
-            # Return structured error with log if available
-            error_response = {
+            return jsonify({
                 'error': 'PDF compilation failed',
                 'details': str(compile_error)
-            }
-            
-            # Try to get log for debugging
-            if include_log:
+            }), 422
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _batch_archive(documents: list):
+    """
+    Zip bytes for a batch, written entry by entry as compiles finish,
+    with manifest.json (per-document status and errors) last
+    """
+    started = time.perf_counter()
+    archive = ZipStream()
+    manifest = []
+    for result in batch_compiler.run(documents):
+        record = {key: value for key, value in result.items() if key not in ('entry', 'pdfBytes')}
+        if result['status'] == 'ok':
+            record['file'] = f"{result['name']}.pdf"
+            entry = result.get('entry')
+            if entry is not None:
                 try:
-                    _, log_content, _ = compiler.compile(tex_string or base64.b64decode(base64_tex).decode('utf-8'), True)
-                    if log_content:
-                        error_response['log'] = log_content[-2000:]  # Last 2000 chars
-                except:
-                    pass
-            
-            return jsonify(error_response), 422
+                    with (gzip.open if entry['compressed'] else open)(entry['path'], 'rb') as source:
+                        yield from archive.add_fileobj(record['file'], source)
+                except FileNotFoundError:
+                    # Evicted between compile and copy; rare enough to just report
+                    record.update(status='failed', error='PDF expired before it could be archived')
+                    del record['file']
+            else:
+                yield from archive.add_bytes(record['file'], result['pdfBytes'], compress=False)
+        manifest.append(record)
+    
+    manifest.sort(key=lambda record: record['index'])
+    failed = sum(1 for record in manifest if record['status'] != 'ok')
+    yield from archive.add_bytes('manifest.json', json.dumps({
+        'documents': manifest,
+        'succeeded': len(manifest) - failed,
+        'failed': failed,
+        'timeMs': round((time.perf_counter() - started) * 1000, 1)
+    }, indent=2).encode('utf-8'))
+    yield from archive.close()
+
+@resume_bp.route('/compile/batch', methods=['POST'])
+def compile_batch():
+    """
+    Compile many resumes in one request and stream back a zip of PDFs.
+    Each document gives texString, base64Tex, optimizedJson or resumeId
+    (plus optional name, templateName, fitToOnePage). Entries are added
+    as their compiles finish; manifest.json at the end lists every
+    document's outcome, including failures.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        documents = data.get('documents')
+        
+        error = batch_compiler.validate(documents)
+        if error:
+            return jsonify({'error': error}), 400
+        # Stored resumes are loaded here; compile threads have no app context
+        documents = batch_compiler.attach_stored(documents, lambda resume_id: resume_store.get(resume_id))
+        
+        response = Response(_batch_archive(documents), mimetype='application/zip', direct_passthrough=True)
+        response.headers['Content-Disposition'] = 'attachment; filename=resumes.zip'
+        response.headers['X-Batch-Documents'] = str(len(documents))
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _lookup_pdf(cache_key: str):
+    """
+    (compile-cache entry, None) or (None, error response) for a PDF id
+    """
+    if not re.fullmatch(r'[0-9a-f]{64}', cache_key):
+        return None, (jsonify({'error': 'Invalid PDF id'}), 400)
+    entry = compile_cache.entry(cache_key)
+    if entry is None:
+        return None, (jsonify({'error': 'PDF not found or expired'}), 404)
+    return entry, None
+
+@resume_bp.route('/pdf/<cache_key>', methods=['GET'])
+def get_compiled_pdf(cache_key):
+    """
+    Re-download a compiled PDF by its cache key without recompiling;
+    supports Range for resumed downloads
+    """
+    entry, error = _lookup_pdf(cache_key)
+    if error:
+        return error
+    try:
+        return _cached_pdf_response(entry, 'hit')
+    except FileNotFoundError:
+        return jsonify({'error': 'PDF not found or expired'}), 404
+
+def _restore_latex(digest: str):
+    """
+    Put LaTeX the on-disk store dropped back from the database, where it
+    is kept whole. Returns the restored path or None.
+    """
+    tex_string = resume_store.get_latex(digest)
+    if tex_string is None:
+        return None
+    artifact_store.put_text(tex_string, 'tex')
+    return artifact_store.path(digest, 'tex')
+
+@resume_bp.route('/artifacts/<digest>.<ext>', methods=['GET'])
+def get_artifact(digest, ext):
+    """
+    Rendered LaTeX or a compiled PDF by the SHA-256 of its bytes. The
+    content behind a URL never changes, so it may be cached forever. An
+    expired PDF gets 410 with the texUrl it was compiled from.
+    """
+    if not re.fullmatch(r'[0-9a-f]{64}', digest) or ext not in ARTIFACT_TYPES:
+        return jsonify({'error': 'Invalid artifact id'}), 400
+    
+    # A client holding this hash already has the bytes, stored or not
+    if request.if_none_match.contains(digest):
+        response = Response(status=304)
+        response.set_etag(digest)
+    else:
+        path = artifact_store.path(digest, ext) or (_restore_latex(digest) if ext == 'tex' else None)
+        if path is None:
+            # PDFs are never compiled on a GET; the client recompiles the LaTeX it came from
+            latex_id = resume_store.get_pdf_latex_id(digest) if ext == 'pdf' else None
+            if latex_id:
+                return jsonify({'error': 'PDF expired, compile its LaTeX again',
+                                'texUrl': _artifact_url(latex_id, 'tex')}), 410
+            return jsonify({'error': 'Artifact not found or expired'}), 404
+        response = send_file(path, mimetype=ARTIFACT_TYPES[ext], download_name=f'resume.{ext}',
+                             conditional=True, etag=digest, last_modified=None, max_age=31536000)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+def _thumbnail_options():
+    """
+    (dpi, format) from the query string; raises ValueError on bad input
+    """
+    fmt = request.args.get('format', 'png').lower()
+    if fmt not in THUMBNAIL_FORMATS:
+        raise ValueError(f"Unsupported image format '{fmt}'. Use one of: {', '.join(THUMBNAIL_FORMATS)}")
+    dpi = request.args.get('dpi', type=int)
+    return thumbnail_renderer.normalize_dpi(dpi), fmt
+
+@resume_bp.route('/pdf/<cache_key>/thumbnails', methods=['GET'])
+def list_pdf_thumbnails(cache_key):
+    """
+    Queue every page of a compiled PDF for rasterization and return the
+    image URLs once page 1 is ready; later pages keep rendering in the
+    background and are served from cache when the client asks for them
+    """
+    entry, error = _lookup_pdf(cache_key)
+    if error:
+        return error
+    try:
+        dpi, fmt = _thumbnail_options()
+        pages = thumbnail_renderer.page_count(entry)
+        futures = [thumbnail_renderer.submit(entry, page, dpi, fmt) for page in range(1, pages + 1)]
+        thumbnail_renderer.render(entry, 1, dpi, fmt)
         
+        return jsonify({
+            'pages': pages,
+            'dpi': dpi,
+            'format': fmt,
+            'thumbnails': [{
+                'page': page,
+                'url': url_for('resume.get_pdf_thumbnail', cache_key=cache_key, page=page, fmt=fmt, dpi=dpi),
+                'ready': future.done() and future.exception() is None
+            } for page, future in enumerate(futures, start=1)]
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ThumbnailUnavailable as e:
+        return jsonify({'error': 'Thumbnails are unavailable', 'details': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@resume_bp.route('/pdf/<cache_key>/thumbnails/<int:page>.<fmt>', methods=['GET'])
+def get_pdf_thumbnail(cache_key, page, fmt):
+    """
+    One rasterized page of a compiled PDF; ?dpi= picks the resolution
+    """
+    entry, error = _lookup_pdf(cache_key)
+    if error:
+        return error
+    if fmt not in THUMBNAIL_FORMATS:
+        return jsonify({'error': f"Unsupported image format '{fmt}'"}), 400
+    if page < 1:
+        return jsonify({'error': 'Pages start at 1'}), 400
+    try:
+        dpi = thumbnail_renderer.normalize_dpi(request.args.get('dpi', type=int))
+        path = thumbnail_renderer.render(entry, page, dpi, fmt)
+        # The same PDF, page and DPI always rasterize to the same image
+        return send_file(path, mimetype=THUMBNAIL_FORMATS[fmt][1], conditional=True,
+                         etag=f'{cache_key}-{page}-{dpi}-{fmt}', last_modified=None, max_age=31536000)
+    except ThumbnailUnavailable as e:
+        return jsonify({'error': 'Thumbnails are unavailable', 'details': str(e)}), 503
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except FileNotFoundError:
+        return jsonify({'error': 'PDF not found or expired'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@resume_bp.route('/stats', methods=['GET'])
+def service_stats():
+    """
+    Cache and pipeline statistics
+    """
+    return jsonify({
+        'renderBlocks': block_cache.stats(),
+        'compileCache': compile_cache.stats(),
+        'compileWorkspaces': workspace_manager.stats(),
+        'compileScheduler': compile_scheduler.stats(),
+        'thumbnails': thumbnail_renderer.stats(),
+        'artifacts': artifact_store.stats()
+    })
+
 @resume_bp.route('/health', methods=['GET'])
 def health_check():
     """
@@ -1,12 +1,63 @@
+import base64
+import binascii
+import os
+from urllib.parse import urlencode
 from flask import Blueprint, jsonify, request
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
 
 user_bp = Blueprint('user', __name__)
 
+USERS_PAGE_DEFAULT = 50
+USERS_PAGE_MAX = int(os.getenv('USERS_PAGE_MAX', 200))
+USERS_BULK_MAX = int(os.getenv('USERS_BULK_MAX', 5000))
+# Rows per insert transaction; also bounds the IN (...) lists used to find conflicts
+USERS_BULK_BATCH_SIZE = int(os.getenv('USERS_BULK_BATCH_SIZE', 500))
+
+def _encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode('ascii')).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    """
+    Last id of the previous page, from the opaque cursor
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """
+    Keyset pagination in id order: `cursor` is the X-Next-Cursor of the
+    previous page, so each page is an index range scan on the primary key
+    however deep the client pages. Only the serialized columns are
+    selected and no ORM objects are built.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', USERS_PAGE_DEFAULT)), 1), USERS_PAGE_MAX)
+        after_id = _decode_cursor(request.args['cursor']) if request.args.get('cursor') else 0
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # One extra row tells us whether there is a next page
+    rows = db.session.execute(
+        select(User.id, User.username, User.email)
+        .where(User.id > after_id)
+        .order_by(User.id)
+        .limit(limit + 1)
+    ).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    response = jsonify([{'id': row.id, 'username': row.username, 'email': row.email} for row in rows])
+    if has_next:
+        next_cursor = _encode_cursor(rows[-1].id)
+        response.headers['X-Next-Cursor'] = next_cursor
+        next_url = f"{request.base_url}?{urlencode({'limit': limit, 'cursor': next_cursor})}"
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
@@ -17,6 +68,95 @@ def create_user():
     db.session.commit()
     return jsonify(user.to_dict()), 201
 
+def _existing(column, values):
+    """
+    Values of a unique column already taken, looked up in index-sized chunks
+    """
+    values, taken = list(values), set()
+    for start in range(0, len(values), USERS_BULK_BATCH_SIZE):
+        chunk = values[start:start + USERS_BULK_BATCH_SIZE]
+        taken.update(db.session.execute(select(column).where(column.in_(chunk))).scalars())
+    return taken
+
+@user_bp.route('/users/bulk', methods=['POST'])
+def create_users_bulk():
+    """
+    Create many users in batched transactions. Entries that are invalid or
+    clash with an existing user (or an earlier entry in the request) are
+    reported by index and skipped; the rest are created.
+    """
+    data = request.get_json(silent=True) or {}
+    entries = data.get('users')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'users must be a non-empty list'}), 400
+    if len(entries) > USERS_BULK_MAX:
+        return jsonify({'error': f'At most {USERS_BULK_MAX} users per request'}), 400
+
+    errors, conflicts, candidates = [], [], []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append({'index': index, 'error': 'Each user must be an object'})
+            continue
+        username, email = entry.get('username'), entry.get('email')
+        if not isinstance(username, str) or not 0 < len(username) <= 80:
+            errors.append({'index': index, 'error': 'username must be 1-80 characters'})
+        elif not isinstance(email, str) or not 0 < len(email) <= 120:
+            errors.append({'index': index, 'error': 'email must be 1-120 characters'})
+        else:
+            candidates.append((index, username, email))
+
+    taken = {
+        'username': _existing(User.username, {username for _, username, _ in candidates}),
+        'email': _existing(User.email, {email for _, _, email in candidates})
+    }
+    pending = []
+    for index, username, email in candidates:
+        clash = next((field for field, value in (('username', username), ('email', email))
+                      if value in taken[field]), None)
+        if clash:
+            conflicts.append({'index': index, 'field': clash, 'value': username if clash == 'username' else email})
+            continue
+        # Later duplicates inside the same request conflict with the first
+        taken['username'].add(username)
+        taken['email'].add(email)
+        pending.append((index, {'username': username, 'email': email}))
+
+    # Core INSERT ... RETURNING: one multi-row VALUES statement per batch,
+    # and the created rows come back from it, so no ORM objects need
+    # refreshing. RETURNING order is not guaranteed for a multi-row insert,
+    # so rows are matched back to entries by their unique username.
+    statement = insert(User).returning(User.id, User.username, User.email)
+    created = []
+    for start in range(0, len(pending), USERS_BULK_BATCH_SIZE):
+        batch = pending[start:start + USERS_BULK_BATCH_SIZE]
+        try:
+            inserted = {row.username: row for row in db.session.execute(statement, [row for _, row in batch])}
+            db.session.commit()
+            created.extend((index, inserted[row['username']]) for index, row in batch)
+            continue
+        except IntegrityError:
+            db.session.rollback()
+        # A concurrent insert took one of these names: retry the batch row
+        # by row so only the clashing rows are dropped
+        for index, row in batch:
+            try:
+                inserted = db.session.execute(statement, [row]).one()
+                db.session.commit()
+                created.append((index, inserted))
+            except IntegrityError:
+                db.session.rollback()
+                conflicts.append({'index': index, 'field': None, 'value': row['username']})
+
+    created.sort(key=lambda item: item[0])
+    conflicts.sort(key=lambda item: item['index'])
+    status = 201 if created else (409 if conflicts else 400)
+    return jsonify({
+        'created': [{'index': index, 'id': row.id, 'username': row.username, 'email': row.email}
+                    for index, row in created],
+        'conflicts': conflicts,
+        'errors': errors
+    }), status
+
 @user_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
@@ -0,0 +1,145 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+ARTIFACT_STORE_DIR = os.getenv('ARTIFACT_STORE_DIR', os.path.join(tempfile.gettempdir(), 'resume-artifacts'))
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv('ARTIFACT_STORE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Extension -> mimetype of what the store serves
+ARTIFACT_TYPES = {
+    'tex': 'application/x-tex',
+    'pdf': 'application/pdf',
+}
+
+
+class ArtifactStore:
+    """
+    Rendered LaTeX and compiled PDFs stored under the SHA-256 of their
+    bytes, so a URL names exactly one immutable file. PDFs are hard-linked
+    from the compile cache where possible instead of copied. The least
+    recently served artifacts are dropped past the size cap; a dropped
+    artifact simply reappears when its source is rendered again.
+    """
+
+    def __init__(self, directory: str = ARTIFACT_STORE_DIR, max_bytes: int = ARTIFACT_STORE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = self._scan()
+
+    def _scan(self) -> int:
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(self.directory)
+                       if entry.is_file() and not entry.name.endswith('.tmp'))
+        except OSError:
+            return 0
+
+    def _path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.directory, f'{digest}.{ext}')
+
+    def path(self, digest: str, ext: str) -> Optional[str]:
+        """
+        Path of a stored artifact, or None; serving it counts as a use
+        """
+        path = self._path(digest, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put_bytes(self, data: bytes, ext: str) -> str:
+        """
+        Store bytes and return their hash
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if self.path(digest, ext):
+            return digest
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._publish(tmp_path, digest, ext)
+        except OSError:
+            self._unlink(tmp_path)
+        return digest
+
+    def put_text(self, text: str, ext: str) -> str:
+        return self.put_bytes(text.encode('utf-8'), ext)
+
+    def put_cached_pdf(self, entry: Dict[str, Any]) -> Optional[str]:
+        """
+        Store a compile-cache entry as a PDF artifact and return its hash,
+        or None for entries written before the cache recorded hashes
+        """
+        digest = entry.get('sha256')
+        if not digest:
+            return None
+        if self.path(digest, 'pdf'):
+            return digest
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f'{digest}.{threading.get_ident()}.tmp')
+        try:
+            if entry['compressed']:
+                with gzip.open(entry['path'], 'rb') as source, open(tmp_path, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+            else:
+                try:
+                    # Same bytes either way; a link costs no space while both exist
+                    os.link(entry['path'], tmp_path)
+                except OSError:
+                    shutil.copyfile(entry['path'], tmp_path)
+            self._publish(tmp_path, digest, 'pdf')
+        except OSError:
+            self._unlink(tmp_path)
+            return None
+        return digest
+
+    def _publish(self, tmp_path: str, digest: str, ext: str):
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, self._path(digest, ext))
+        with self._lock:
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+        try:
+            entries = sorted((entry for entry in os.scandir(self.directory)
+                              if entry.is_file() and not entry.name.endswith('.tmp')),
+                             key=lambda entry: entry.stat().st_mtime)
+        except OSError:
+            return
+        for entry in entries:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes:
+                    return
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+            except OSError:
+                continue
+            with self._lock:
+                self._total_bytes -= size
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'bytes': self._total_bytes, 'maxBytes': self.max_bytes}
+
+
+# Shared so every route links to the same store
+artifact_store = ArtifactStore()
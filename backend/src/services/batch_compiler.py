@@ -0,0 +1,142 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from src.services.latex_renderer import LaTeXRenderer
+from src.services.page_fitter import page_fitter
+from src.services.pdf_compiler import PDFCompiler, CompilationError
+from src.services.compile_scheduler import COMPILE_MAX_CONCURRENCY, CompileQueueTimeout
+from src.services.template_registry import TemplateNotFound
+
+BATCH_MAX_DOCUMENTS = int(os.getenv('BATCH_MAX_DOCUMENTS', 500))
+# Documents compiled at once per batch. The compile scheduler still caps
+# engine processes overall; half its slots by default leaves room for
+# interactive compiles while a batch runs.
+BATCH_COMPILE_CONCURRENCY = int(os.getenv('BATCH_COMPILE_CONCURRENCY', max(1, COMPILE_MAX_CONCURRENCY // 2)))
+
+
+class BatchCompiler:
+    """
+    Compiles many resumes in parallel with a per-batch concurrency cap and
+    hands back results as they finish. A document failing (bad source,
+    unknown template, LaTeX error) is reported in its result, never
+    raised, so one bad resume cannot sink the batch.
+    """
+
+    def __init__(self, concurrency: int = BATCH_COMPILE_CONCURRENCY, max_documents: int = BATCH_MAX_DOCUMENTS):
+        self.concurrency = max(1, concurrency)
+        self.max_documents = max_documents
+
+    def validate(self, documents: Any) -> Optional[str]:
+        """
+        Error message for an unusable request, None if it can run
+        """
+        if not isinstance(documents, list) or not documents:
+            return 'documents must be a non-empty list'
+        if len(documents) > self.max_documents:
+            return f'At most {self.max_documents} documents per batch'
+        if not all(isinstance(document, dict) for document in documents):
+            return 'Each document must be an object'
+        return None
+
+    @staticmethod
+    def file_names(documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        Unique, filesystem-safe archive names: the document's name,
+        resumeId or position, made unique with a numeric suffix
+        """
+        names, seen = [], set()
+        for index, document in enumerate(documents, start=1):
+            base = str(document.get('name') or document.get('resumeId') or f'resume-{index}')
+            base = re.sub(r'[^A-Za-z0-9._-]+', '_', base).strip('._') or f'resume-{index}'
+            name, suffix = base, 2
+            while name in seen:
+                name, suffix = f'{base}-{suffix}', suffix + 1
+            seen.add(name)
+            names.append(name)
+        return names
+
+    @staticmethod
+    def attach_stored(documents: List[Dict[str, Any]],
+                      lookup: Callable[[str], Optional[Tuple[Dict[str, Any], int]]]) -> List[Dict[str, Any]]:
+        """
+        Copies of the documents with stored resumes (resumeId) loaded
+        inline through `lookup`, which may need the caller's app context
+        """
+        attached = []
+        for document in documents:
+            if document.get('resumeId') and not any(document.get(key) for key in ('texString', 'base64Tex', 'optimizedJson')):
+                entry = lookup(document['resumeId'])
+                if entry is not None:
+                    document = {**document, 'optimizedJson': entry[0]}
+            attached.append(document)
+        return attached
+
+    @staticmethod
+    def resolve_tex(document: Dict[str, Any]) -> str:
+        """
+        LaTeX for one document: texString, base64Tex, or optimizedJson
+        (inline or attached from a resumeId) rendered with its templateName
+        """
+        if document.get('texString'):
+            return document['texString']
+        if document.get('base64Tex'):
+            return PDFCompiler.decode_base64(document['base64Tex'])
+
+        optimized_json = document.get('optimizedJson')
+        if not optimized_json and document.get('resumeId'):
+            raise LookupError('Resume not found')
+        if not optimized_json:
+            raise ValueError('texString, base64Tex, optimizedJson or resumeId is required')
+        return LaTeXRenderer().render(optimized_json, document.get('templateName', 'default_user_template'))
+
+    def compile_one(self, index: int, name: str, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        {index, name, status, timeMs, ...}: status 'ok' adds cache status,
+        warnings and either a compile-cache `entry` or `pdfBytes`; 'failed'
+        adds the error and any LaTeX diagnostics
+        """
+        started = time.perf_counter()
+        result: Dict[str, Any] = {'index': index, 'name': name}
+        try:
+            tex_string = self.resolve_tex(document)
+            compiler = PDFCompiler()
+            if document.get('fitToOnePage'):
+                tex_string = page_fitter.fit(tex_string, compiler)['texString']
+            entry, pdf_bytes, warnings = compiler.compile_to_cache(tex_string)
+            if entry is not None:
+                result.update(entry=entry, warnings=warnings)
+            else:
+                result.update(pdfBytes=pdf_bytes, warnings=warnings)
+            result.update(status='ok', cache=compiler.last_cache_status)
+        except CompilationError as e:
+            result.update(status='failed', error=str(e), **e.to_dict())
+        except CompileQueueTimeout as e:
+            result.update(status='failed', error=f'Compile service busy: {e}')
+        except TemplateNotFound:
+            result.update(status='failed', error=f"Unknown template: {document.get('templateName')}")
+        except Exception as e:
+            result.update(status='failed', error=str(e))
+        result['timeMs'] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def run(self, documents: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Compile every document, yielding results in completion order.
+        Closing the iterator early cancels the documents not yet started.
+        """
+        names = self.file_names(documents)
+        executor = ThreadPoolExecutor(max_workers=min(self.concurrency, len(documents)),
+                                      thread_name_prefix='batch-compile')
+        try:
+            futures = [executor.submit(self.compile_one, index, names[index], document)
+                       for index, document in enumerate(documents)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared; holds configuration only
+batch_compiler = BatchCompiler()
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import marshal
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Callable
+from cachetools import LRUCache
+
+class BlockCache:
+    """
+    Bounded LRU of rendered resume blocks. Entries are keyed by block name,
+    a namespace (template digest or output format) and a hash of the JSON
+    subtree the block is built from, so a re-render after a small edit
+    rebuilds only the blocks whose input changed.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def subtree_hash(subtree: Any) -> str:
+        """
+        Hash of a JSON subtree. marshal format 2 (no back-references) is a
+        lossless, deterministic encoding roughly 10x cheaper than json.dumps;
+        key order is not normalized, so a reordered dict is just a miss.
+        """
+        try:
+            encoded = marshal.dumps(subtree, 2)
+        except ValueError:
+            encoded = json.dumps(subtree, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def get_or_build(self, block: str, namespace: str, subtree: Any, build: Callable[[Any], str]) -> str:
+        """
+        Return the cached output for this block input, building it on a miss
+        """
+        key = (block, namespace, self.subtree_hash(subtree))
+        with self._lock:
+            output = self._cache.get(key)
+            if output is not None:
+                self._hits[block] += 1
+                return output
+            self._misses[block] += 1
+
+        output = build(subtree)
+        with self._lock:
+            self._cache[key] = output
+        return output
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-block hit/miss counts and hit rates
+        """
+        with self._lock:
+            blocks = {}
+            for block in sorted(set(self._hits) | set(self._misses)):
+                hits, misses = self._hits[block], self._misses[block]
+                blocks[block] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hitRate': round(hits / (hits + misses), 4) if hits + misses else 0.0
+                }
+            return {'entries': len(self._cache), 'maxEntries': self._cache.maxsize, 'blocks': blocks}
+
+
+# Shared by all renderer instances in this process
+block_cache = BlockCache(int(os.getenv('LATEX_BLOCK_CACHE_SIZE', 2048)))
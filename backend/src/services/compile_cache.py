@@ -0,0 +1,280 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+COMPILE_CACHE_ENABLED = os.getenv('COMPILE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+COMPILE_CACHE_DIR = os.getenv('COMPILE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'resume-compile-cache'))
+COMPILE_CACHE_MAX_BYTES = int(os.getenv('COMPILE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+COMPILE_CACHE_COMPRESS = os.getenv('COMPILE_CACHE_COMPRESS', 'false').lower() in ('1', 'true', 'yes')
+
+PDF_SUFFIX = '.pdf'
+GZIP_SUFFIX = '.pdf.gz'
+META_SUFFIX = '.json'
+
+
+def normalize_tex(tex_string: str) -> str:
+    """
+    Canonical form for hashing: Unix newlines, no trailing whitespace on
+    any line (TeX discards it when reading a line) and one final newline
+    """
+    tex_string = tex_string.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [line.rstrip(' \t') for line in tex_string.split('\n')]
+    return '\n'.join(lines).rstrip('\n') + '\n'
+
+
+def _copy_hashed(source, target, digest, chunk_size: int = 1024 * 1024):
+    """
+    Copy a file object in chunks, feeding the bytes to `digest` on the way
+    """
+    for chunk in iter(lambda: source.read(chunk_size), b''):
+        digest.update(chunk)
+        target.write(chunk)
+
+
+class CompileCache:
+    """
+    Size-capped on-disk LRU of compiled PDFs keyed by a content hash of
+    the LaTeX source, engine and engine version. Each entry is the PDF
+    (optionally gzipped) plus a small JSON file with the parsed warnings.
+    Recency is kept in memory and mirrored to file mtimes, so the order
+    survives a restart.
+    """
+
+    def __init__(self, directory: str = COMPILE_CACHE_DIR, max_bytes: int = COMPILE_CACHE_MAX_BYTES,
+                 compress: bool = COMPILE_CACHE_COMPRESS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._index: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._load_index()
+
+    @staticmethod
+    def key_for(tex_string: str, engine: str, version: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(engine.encode('utf-8') + b'\0')
+        digest.update(version.encode('utf-8') + b'\0')
+        digest.update(normalize_tex(tex_string).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str, str]:
+        base = os.path.join(self.directory, key)
+        return base + PDF_SUFFIX, base + GZIP_SUFFIX, base + META_SUFFIX
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += os.stat(path).st_size
+            except OSError:
+                pass
+        return size
+
+    def _load_index(self):
+        """
+        Rebuild the LRU order from what is already on disk
+        """
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(META_SUFFIX):
+                key = filename[:-len(META_SUFFIX)]
+                try:
+                    mtime = os.stat(os.path.join(self.directory, filename)).st_mtime
+                except OSError:
+                    continue
+                entries.append((mtime, key))
+        for _, key in sorted(entries):
+            size = self._entry_size(key)
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached compile without reading the PDF. Returns
+        {key, path, compressed, size, sha256, warnings} or None; `size`
+        and `sha256` describe the uncompressed PDF.
+        """
+        pdf_path, gzip_path, meta_path = self._paths(key)
+        with self._lock:
+            if key not in self._index:
+                self._counters['misses'] += 1
+                return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            path = gzip_path if meta.get('compressed') else pdf_path
+            if not os.path.exists(path):
+                raise OSError(path)
+        except (OSError, ValueError):
+            # Removed or truncated underneath us; treat as a miss
+            self._discard(key)
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+            self._counters['hits'] += 1
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return {
+            'key': key,
+            'path': path,
+            'compressed': bool(meta.get('compressed')),
+            'size': meta.get('size'),
+            # Entries written before content hashing have none
+            'sha256': meta.get('sha256'),
+            'warnings': meta.get('warnings', [])
+        }
+
+    def get(self, key: str) -> Optional[Tuple[bytes, List[str]]]:
+        """
+        Return (pdf_bytes, warnings) for a cached compile, or None
+        """
+        entry = self.entry(key)
+        if entry is None:
+            return None
+        try:
+            if entry['compressed']:
+                with gzip.open(entry['path'], 'rb') as f:
+                    pdf_bytes = f.read()
+            else:
+                with open(entry['path'], 'rb') as f:
+                    pdf_bytes = f.read()
+        except (OSError, EOFError):
+            self._discard(key)
+            return None
+        return pdf_bytes, entry['warnings']
+
+    def put(self, key: str, pdf_bytes: bytes, warnings: List[str]):
+        """
+        Store a compiled PDF, evicting least recently used entries past the cap
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        pdf_path, gzip_path, _ = self._paths(key)
+        if self.compress:
+            payload, data_path = gzip.compress(pdf_bytes, compresslevel=6), gzip_path
+        else:
+            payload, data_path = pdf_bytes, pdf_path
+        try:
+            self._write_atomic(data_path, payload)
+        except OSError:
+            return
+        self._commit(key, len(payload), len(pdf_bytes), hashlib.sha256(pdf_bytes).hexdigest(), warnings)
+
+    def put_file(self, key: str, source_path: str, warnings: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Store a compiled PDF straight from the engine's output file, copying
+        in chunks (or via sendfile) so the PDF never sits in memory whole.
+        Returns the new entry, or None if it could not be written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        pdf_path, gzip_path, _ = self._paths(key)
+        data_path = gzip_path if self.compress else pdf_path
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        digest = hashlib.sha256()
+        try:
+            with open(source_path, 'rb') as source, os.fdopen(fd, 'wb') as target:
+                if self.compress:
+                    with gzip.GzipFile(fileobj=target, mode='wb', compresslevel=6) as compressed:
+                        _copy_hashed(source, compressed, digest)
+                else:
+                    _copy_hashed(source, target, digest)
+            os.replace(tmp_path, data_path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return None
+        pdf_size = os.path.getsize(source_path)
+        self._commit(key, os.path.getsize(data_path), pdf_size, digest.hexdigest(), warnings)
+        return {'key': key, 'path': data_path, 'compressed': self.compress, 'size': pdf_size,
+                'sha256': digest.hexdigest(), 'warnings': warnings}
+
+    def _commit(self, key: str, stored_bytes: int, pdf_size: int, sha256: str, warnings: List[str]):
+        """
+        Write the metadata that makes a stored PDF visible, then account for it
+        """
+        _, _, meta_path = self._paths(key)
+        meta = json.dumps({'compressed': self.compress, 'size': pdf_size, 'sha256': sha256,
+                           'warnings': warnings}).encode('utf-8')
+        try:
+            # Data first, metadata last: an entry only counts once its JSON exists
+            self._write_atomic(meta_path, meta)
+        except OSError:
+            return
+
+        size = stored_bytes + len(meta)
+        with self._lock:
+            self._total_bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._counters['writes'] += 1
+        self._evict()
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes or not self._index:
+                    return
+                key, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                self._counters['evictions'] += 1
+            self._remove_files(key)
+
+    def _discard(self, key: str):
+        with self._lock:
+            self._total_bytes -= self._index.pop(key, 0)
+        self._remove_files(key)
+
+    def _remove_files(self, key: str):
+        # Metadata first so a concurrent reader sees a clean miss
+        pdf_path, gzip_path, meta_path = self._paths(key)
+        for path in (meta_path, pdf_path, gzip_path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'hitRate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': len(self._index),
+                'bytes': self._total_bytes,
+                'maxBytes': self.max_bytes,
+                'compressed': self.compress
+            }
+
+
+# Shared by all compiler instances in this process
+compile_cache = CompileCache()
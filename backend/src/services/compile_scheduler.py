@@ -0,0 +1,209 @@
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+COMPILE_MAX_CONCURRENCY = int(os.getenv('COMPILE_MAX_CONCURRENCY', os.cpu_count() or 2))
+COMPILE_MAX_QUEUE = int(os.getenv('COMPILE_MAX_QUEUE', 32))
+COMPILE_QUEUE_TIMEOUT = float(os.getenv('COMPILE_QUEUE_TIMEOUT', 10))
+LATEX_TIMEOUT = float(os.getenv('LATEX_TIMEOUT', 60))
+COMPILE_RLIMIT_CPU = int(os.getenv('COMPILE_RLIMIT_CPU', LATEX_TIMEOUT))
+COMPILE_RLIMIT_MEMORY_MB = int(os.getenv('COMPILE_RLIMIT_MEMORY_MB', 1024))
+COMPILE_RLIMIT_FILE_MB = int(os.getenv('COMPILE_RLIMIT_FILE_MB', 64))
+
+# util-linux prlimit sets the limits and execs the engine in place; where
+# it is missing (macOS, Windows) jobs run without rlimits
+PRLIMIT = shutil.which('prlimit')
+
+# Recent samples kept for percentile metrics
+METRIC_WINDOW = 512
+
+
+class CompileQueueTimeout(Exception):
+    """
+    Raised when a job cannot get a compile slot before its deadline,
+    or the wait queue is already full
+    """
+
+
+class CompileTimeout(RuntimeError):
+    """
+    Raised when a compile ran past its time limit and was killed
+    """
+
+
+class _Timings:
+    """
+    Count, max and recent-window percentiles for one duration metric
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=METRIC_WINDOW)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 1) if ordered else 0.0
+
+        return {
+            'count': self.count,
+            'meanMs': round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            'p50Ms': percentile(50),
+            'p95Ms': percentile(95),
+            'maxMs': round(self.max * 1000, 1)
+        }
+
+
+def _limit_prefix(cpu_seconds: int, memory_mb: int, file_mb: int) -> List[str]:
+    """
+    prlimit command prefix applying the rlimits. Limits are not set with
+    preexec_fn: running Python between fork and exec can deadlock the
+    child while other threads (request handlers, batch and pipeline pools,
+    format builds) start processes at the same time.
+    """
+    if PRLIMIT is None:
+        return []
+    limits = []
+    if cpu_seconds > 0:
+        limits.append(f'--cpu={cpu_seconds}:{cpu_seconds + 1}')
+    if memory_mb > 0:
+        limits.append(f'--as={memory_mb * 1024 * 1024}')
+    if file_mb > 0:
+        limits.append(f'--fsize={file_mb * 1024 * 1024}')
+    return [PRLIMIT, *limits, '--'] if limits else []
+
+
+class CompileScheduler:
+    """
+    Caps how many engine processes run at once. Jobs wait in a bounded
+    queue for at most their deadline, each process gets CPU, memory and
+    output-size rlimits in its own process group, and anything that
+    outlives its timeout is killed along with its children.
+    """
+
+    def __init__(self, max_concurrency: int = COMPILE_MAX_CONCURRENCY, max_queue: int = COMPILE_MAX_QUEUE,
+                 queue_timeout: float = COMPILE_QUEUE_TIMEOUT, timeout: float = LATEX_TIMEOUT):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._queue_wait = _Timings()
+        self._compile_time = _Timings()
+        self._counters = {'completed': 0, 'rejected': 0, 'queueTimeouts': 0, 'kills': 0}
+
+    @contextmanager
+    def slot(self, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold one compile slot for the duration of the block. `deadline`
+        is a time.monotonic() value that can only shorten the queue wait.
+        """
+        enqueued = time.monotonic()
+        wait = self.queue_timeout
+        if deadline is not None:
+            wait = min(wait, deadline - enqueued)
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self._counters['rejected'] += 1
+                raise CompileQueueTimeout("Compile queue is full")
+            self._waiting += 1
+
+        acquired = wait > 0 and self._slots.acquire(timeout=wait)
+        waited = time.monotonic() - enqueued
+        with self._lock:
+            self._waiting -= 1
+            self._queue_wait.add(waited)
+            if not acquired:
+                self._counters['queueTimeouts'] += 1
+            else:
+                self._running += 1
+        if not acquired:
+            raise CompileQueueTimeout(f"No compile slot free within {wait:.1f}s")
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._slots.release()
+
+    def run(self, command: List[str], cwd: str, env: Dict[str, str],
+            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run one engine process under rlimits, killing its whole process
+        group if it exceeds `timeout` seconds. Call inside slot().
+        """
+        timeout = self.timeout if timeout is None else timeout
+        limited = _limit_prefix(COMPILE_RLIMIT_CPU, COMPILE_RLIMIT_MEMORY_MB, COMPILE_RLIMIT_FILE_MB) + command
+
+        started = time.monotonic()
+        process = subprocess.Popen(
+            limited,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors='replace',
+            start_new_session=True
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill_group(process)
+            process.communicate()
+            with self._lock:
+                self._counters['kills'] += 1
+                self._compile_time.add(time.monotonic() - started)
+            raise CompileTimeout(f"Compilation exceeded {timeout:g}s and was killed")
+        except BaseException:
+            self._kill_group(process)
+            process.wait()
+            raise
+
+        with self._lock:
+            self._counters['completed'] += 1
+            self._compile_time.add(time.monotonic() - started)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    @staticmethod
+    def _kill_group(process: subprocess.Popen):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                'maxConcurrency': self.max_concurrency,
+                'running': self._running,
+                'waiting': self._waiting,
+                'queueWait': self._queue_wait.summary(),
+                'compileTime': self._compile_time.summary()
+            }
+
+
+# One scheduler per process so the cap holds across all requests
+compile_scheduler = CompileScheduler()
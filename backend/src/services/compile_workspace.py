@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+WORKSPACE_PREFIX = 'job-'
+
+COMPILE_WORKSPACE_MAX_AGE = float(os.getenv('COMPILE_WORKSPACE_MAX_AGE', 3600))
+COMPILE_WORKSPACE_SWEEP_INTERVAL = float(os.getenv('COMPILE_WORKSPACE_SWEEP_INTERVAL', 300))
+
+
+def default_workspace_root() -> str:
+    """
+    COMPILE_WORKSPACE_ROOT if set, else a directory on the /dev/shm tmpfs
+    when it is writable, else one under the system temp dir
+    """
+    configured = os.getenv('COMPILE_WORKSPACE_ROOT')
+    if configured:
+        return configured
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK | os.X_OK):
+        return os.path.join('/dev/shm', 'resume-compile')
+    return os.path.join(tempfile.gettempdir(), 'resume-compile')
+
+
+class WorkspaceManager:
+    """
+    Hands each compile a private directory and removes it, with every
+    artifact the engine wrote (.aux, .out, ...), when the job ends.
+    A janitor pass, run at most every `sweep_interval` seconds from
+    workspace creation, deletes job directories older than `max_age`
+    left behind by crashed or killed workers.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_age: float = COMPILE_WORKSPACE_MAX_AGE,
+                 sweep_interval: float = COMPILE_WORKSPACE_SWEEP_INTERVAL):
+        self.root = root or default_workspace_root()
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._counters = {'created': 0, 'removed': 0, 'swept': 0}
+
+    @contextmanager
+    def workspace(self) -> Iterator[str]:
+        """
+        Yield a fresh directory that is deleted wholesale on exit
+        """
+        self.maybe_sweep()
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=self.root)
+        with self._lock:
+            self._counters['created'] += 1
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self._counters['removed'] += 1
+
+    def maybe_sweep(self):
+        """
+        Run the janitor if the last sweep is older than the interval
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+        self.sweep()
+
+    def sweep(self) -> int:
+        """
+        Remove stale job directories; returns how many were removed
+        """
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return 0
+        for entry in entries:
+            if not entry.name.startswith(WORKSPACE_PREFIX):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._counters['swept'] += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, 'active': self._counters['created'] - self._counters['removed'], 'root': self.root}
+
+
+# Shared by all compiler instances in this process
+workspace_manager = WorkspaceManager()
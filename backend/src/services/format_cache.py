@@ -0,0 +1,252 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from src.services.compile_scheduler import compile_scheduler, CompileTimeout
+from src.services.latex_engines import ENGINES
+from src.services.template_registry import CompiledTemplate
+
+# Everything before this marker is dumped into the format; templates place
+# it after the static packages and before anything that must run per job
+# (hyperref, \pdfglyphtounicode tables, \AtBeginDocument content).
+DUMP_MARKER = r'\csname endofdump\endcsname'
+
+BEGIN_DOCUMENT = r'\begin{document}'
+
+FORMAT_CACHE_ENABLED = os.getenv('LATEX_FORMAT_CACHE', 'true').lower() in ('1', 'true', 'yes')
+FORMAT_CACHE_DIR = os.getenv('LATEX_FORMAT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'resume-latex-formats'))
+FORMAT_BUILD_TIMEOUT = float(os.getenv('LATEX_FORMAT_BUILD_TIMEOUT', 60))
+# Formats are several MB each; least recently used ones go past this size
+FORMAT_CACHE_MAX_BYTES = int(os.getenv('LATEX_FORMAT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# Template preambles remembered for format lookup (one per template version)
+FORMAT_CACHE_MAX_TEMPLATES = 64
+
+# Log lines meaning pdflatex could not use the format at all, as opposed
+# to an error in the document itself
+FORMAT_LOAD_ERRORS = ("I can't find the format file", 'Fatal format file error', "can't open the format file")
+
+
+def split_preamble(tex_string: str) -> Optional[Tuple[str, str]]:
+    """
+    Split source at the dump marker into (static preamble, rest).
+    Returns None when the source has no marker in its preamble.
+    """
+    marker = tex_string.find(DUMP_MARKER)
+    if marker < 0:
+        return None
+    begin = tex_string.find(BEGIN_DOCUMENT)
+    if 0 <= begin < marker:
+        return None
+    return tex_string[:marker], tex_string[marker:]
+
+
+class FormatCache:
+    """
+    On-disk cache of pdflatex format files built from registry template
+    preambles with mylatexformat. Only templates registered by
+    LaTeXRenderer get a format: a source whose preamble is not exactly a
+    registered template's (raw texString uploads included) compiles
+    normally, so clients cannot make the server dump arbitrary TeX.
+    Formats are keyed by the template digest and the TeX version, so a
+    template edit or a TeX upgrade yields a new format instead of a stale
+    one, and the least recently used formats are evicted past
+    FORMAT_CACHE_MAX_BYTES. A failed build is remembered and callers fall
+    back to a plain compile.
+    """
+
+    def __init__(self, directory: str = FORMAT_CACHE_DIR, engine: str = 'pdflatex',
+                 build_timeout: float = FORMAT_BUILD_TIMEOUT, max_bytes: int = FORMAT_CACHE_MAX_BYTES,
+                 max_templates: int = FORMAT_CACHE_MAX_TEMPLATES):
+        self.directory = directory
+        self.engine = engine
+        self.build_timeout = build_timeout
+        self.max_bytes = max_bytes
+        self.max_templates = max_templates
+        # sha256 of a template's static preamble -> template digest
+        self._templates: 'OrderedDict[str, str]' = OrderedDict()
+        self._failed: 'OrderedDict[str, str]' = OrderedDict()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def tex_version(self) -> str:
+        return ENGINES[self.engine].version()
+
+    def key_for(self, template_digest: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.engine.encode('utf-8') + b'\0')
+        digest.update(self.tex_version().encode('utf-8') + b'\0')
+        digest.update(template_digest.encode('ascii'))
+        return 'resume-' + digest.hexdigest()[:32]
+
+    def register_template(self, template: CompiledTemplate):
+        """
+        Allow a format for this registry template's preamble. Called by
+        LaTeXRenderer for every template it renders; templates without a
+        dump marker are ignored.
+        """
+        split = split_preamble(template.source)
+        if split is None:
+            return
+        preamble_hash = self._preamble_hash(split[0])
+        with self._lock:
+            self._templates[preamble_hash] = template.digest
+            self._templates.move_to_end(preamble_hash)
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+
+    def env(self, base_env: Dict[str, str]) -> Dict[str, str]:
+        """
+        Environment that lets the engine find cached formats by name;
+        the trailing separator keeps the default search path
+        """
+        env = dict(base_env)
+        env['TEXFORMATS'] = self.directory + os.pathsep + base_env.get('TEXFORMATS', '')
+        return env
+
+    def format_for(self, tex_string: str, base_env: Dict[str, str]) -> Optional[str]:
+        """
+        Name of a ready format for this source's preamble, building it on
+        first use. Returns None if the preamble is not a registered
+        template's or the format cannot be built.
+        """
+        split = split_preamble(tex_string)
+        if split is None:
+            return None
+        preamble = split[0]
+        with self._lock:
+            template_digest = self._templates.get(self._preamble_hash(preamble))
+        if template_digest is None:
+            return None
+        name = self.key_for(template_digest)
+
+        if self._touch(name):
+            return name
+        if name in self._failed:
+            return None
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            # Another request may have built it while we waited
+            if os.path.exists(self._path(name)):
+                return name
+            if name in self._failed:
+                return None
+            error = self._build(name, preamble, base_env)
+            if error:
+                self._remember_failure(name, error)
+                return None
+        with self._lock:
+            self._build_locks.pop(name, None)
+        self._evict(keep=name)
+        return name
+
+    def forget(self, name: str, reason: str):
+        """
+        Drop a format that pdflatex refused to load so it is not used again.
+        A format evicted after it was handed out was not at fault and may
+        be rebuilt.
+        """
+        try:
+            os.unlink(self._path(name))
+        except FileNotFoundError:
+            return
+        except OSError:
+            pass
+        self._remember_failure(name, reason)
+
+    def is_format_load_error(self, log_content: str) -> bool:
+        return any(marker in log_content for marker in FORMAT_LOAD_ERRORS)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + '.fmt')
+
+    @staticmethod
+    def _preamble_hash(preamble: str) -> str:
+        return hashlib.sha256(preamble.encode('utf-8')).hexdigest()
+
+    def _touch(self, name: str) -> bool:
+        """
+        Mark a format as just used; False if it is not on disk
+        """
+        try:
+            os.utime(self._path(name))
+            return True
+        except OSError:
+            return False
+
+    def _remember_failure(self, name: str, reason: str):
+        with self._lock:
+            self._failed[name] = reason
+            self._build_locks.pop(name, None)
+            while len(self._failed) > self.max_templates:
+                self._failed.popitem(last=False)
+
+    def _evict(self, keep: str):
+        """
+        Delete least recently used formats until the directory fits
+        max_bytes; `keep` (the format just built) always stays
+        """
+        try:
+            formats = sorted((entry for entry in os.scandir(self.directory)
+                              if entry.is_file() and entry.name.endswith('.fmt')),
+                             key=lambda entry: entry.stat().st_mtime)
+            total = sum(entry.stat().st_size for entry in formats)
+        except OSError:
+            return
+        for entry in formats:
+            if total <= self.max_bytes:
+                return
+            if entry.name == keep + '.fmt':
+                continue
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+            except OSError:
+                continue
+            total -= size
+
+    def _build(self, name: str, preamble: str, base_env: Dict[str, str]) -> Optional[str]:
+        """
+        Dump the preamble into <directory>/<name>.fmt. Returns an error
+        message on failure, None on success.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=name + '-', dir=self.directory)
+        try:
+            source_path = os.path.join(build_dir, name + '.tex')
+            with open(source_path, 'w', encoding='utf-8') as f:
+                f.write(preamble + DUMP_MARKER + '\n' + BEGIN_DOCUMENT + '\n\\end{document}\n')
+
+            command = [
+                self.engine, '-ini', '-interaction=nonstopmode',
+                f'-jobname={name}', f'&{self.engine}', 'mylatexformat.ltx', source_path
+            ]
+            try:
+                # Same rlimits and kill-on-timeout as a compile; the caller holds the slot
+                result = compile_scheduler.run(command, cwd=build_dir, env=base_env, timeout=self.build_timeout)
+            except (OSError, CompileTimeout) as e:
+                return f"format build failed: {e}"
+
+            built = os.path.join(build_dir, name + '.fmt')
+            if result.returncode != 0 or not os.path.exists(built):
+                return f"format build failed (return code: {result.returncode})"
+            # Atomic publish so concurrent readers never see a partial file
+            os.replace(built, self._path(name))
+            return None
+        finally:
+            for filename in os.listdir(build_dir):
+                try:
+                    os.unlink(os.path.join(build_dir, filename))
+                except OSError:
+                    pass
+            try:
+                os.rmdir(build_dir)
+            except OSError:
+                pass
+
+
+# Shared across compiler instances so each preamble is dumped once per host
+format_cache = FormatCache()
@@ -1,7 +1,90 @@
 import json
 import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import google.generativeai as genai
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from src.utils.resume_schema import RESUME_SCHEMA
+
+# Hard ceiling (seconds) for one optimization, whatever deadline the client asks for
+GEMINI_TIMEOUT_BUDGET = float(os.getenv('GEMINI_TIMEOUT_BUDGET', 90))
+
+# Hedged requests: fire a second identical call once the first outlives the observed p95
+GEMINI_HEDGE_ENABLED = os.getenv('GEMINI_HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+GEMINI_HEDGE_PERCENTILE = float(os.getenv('GEMINI_HEDGE_PERCENTILE', 95))
+GEMINI_HEDGE_MIN_SAMPLES = int(os.getenv('GEMINI_HEDGE_MIN_SAMPLES', 20))
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed generate_content latencies (seconds)
+    """
+    
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Nearest-rank percentile, or None until enough samples were seen
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples or len(samples) < min_samples:
+            return None
+        rank = max(int(round(pct / 100.0 * len(samples))) - 1, 0)
+        return samples[min(rank, len(samples) - 1)]
+
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', 8))
+
+
+class GeminiBusy(TimeoutError):
+    """
+    Raised when the deadline passes before any Gemini worker picked the
+    call up: the time went to the local queue, not to Gemini
+    """
+
+
+# Shared across requests so the hedging threshold reflects recent upstream behaviour
+_latency_tracker = LatencyTracker()
+_gemini_executor = ThreadPoolExecutor(
+    max_workers=GEMINI_MAX_CONCURRENCY,
+    thread_name_prefix='gemini'
+)
+# Calls submitted to the executor and not finished yet (queued or running)
+_gemini_outstanding = 0
+_gemini_outstanding_lock = threading.Lock()
+
+
+def _submit(fn, *args):
+    """
+    Submit to the shared executor, keeping count of outstanding calls
+    """
+    global _gemini_outstanding
+    with _gemini_outstanding_lock:
+        _gemini_outstanding += 1
+    future = _gemini_executor.submit(fn, *args)
+    future.add_done_callback(_release)
+    return future
+
+
+def _release(future):
+    global _gemini_outstanding
+    with _gemini_outstanding_lock:
+        _gemini_outstanding -= 1
+
+
+def _has_idle_worker() -> bool:
+    with _gemini_outstanding_lock:
+        return _gemini_outstanding < GEMINI_MAX_CONCURRENCY
+
 
 class GeminiOptimizer:
     """
@@ -19,9 +102,12 @@ class GeminiOptimizer:
         self.resume_schema = self._get_resume_schema()
     
     def optimize_resume(self, resume_draft: Dict[str, Any], job_description: str = "", 
-                      region: str = "US", seniority: str = "mid", tone: str = "standard") -> Dict[str, Any]:
+                      region: str = "US", seniority: str = "mid", tone: str = "standard",
+                      deadline: Optional[float] = None) -> Dict[str, Any]:
         """
-        Optimize resume using Gemini AI with strict JSON schema
+        Optimize resume using Gemini AI with strict JSON schema.
+        `deadline` is an absolute time.monotonic() value; it defaults to
+        GEMINI_TIMEOUT_BUDGET seconds from now.
         """
         
         # Build the optimization prompt
@@ -29,31 +115,19 @@ class GeminiOptimizer:
             resume_draft, job_description, region, seniority, tone
         )
         
-        # Generate optimized resume with retries
+        if deadline is None:
+            deadline = time.monotonic() + GEMINI_TIMEOUT_BUDGET
+        
+        # Generate optimized resume with retries, all within the same deadline
         max_retries = 3
         for attempt in range(max_retries):
+            if deadline - time.monotonic() <= 0:
+                raise TimeoutError("Gemini optimization exceeded its deadline")
+            
             try:
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.2,
-                        top_p=0.9,
-                        max_output_tokens=8192,
-                    )
-                )
-                
-                # Extract JSON from response
-                optimized_json = self._extract_json_from_response(response.text)
-                
-                # Validate against schema
-                if self._validate_json_structure(optimized_json):
-                    return optimized_json
-                else:
-                    if attempt < max_retries - 1:
-                        continue
-                    else:
-                        raise Exception("Failed to generate valid JSON after multiple attempts")
-                        
+                return self._generate_with_hedging(prompt, deadline)
+            except TimeoutError:
+                raise
             except Exception as e:
                 if attempt < max_retries - 1:
                     continue
@@ -62,6 +136,87 @@ class GeminiOptimizer:
         
         raise Exception("Failed to optimize resume after multiple attempts")
     
+    def _generate_with_hedging(self, prompt: str, deadline: float) -> Dict[str, Any]:
+        """
+        Run one generation attempt bounded by the deadline.
+        If hedging is enabled and the call outlives the observed p95 latency,
+        a second identical call is fired, but only onto an idle worker: a
+        call already in flight cannot be cancelled and holds its worker
+        until its own request timeout, so hedging on a full pool would only
+        queue other requests behind the losers. The first valid response
+        wins; a hedge still queued is cancelled.
+        """
+        hedge_after = None
+        if GEMINI_HEDGE_ENABLED:
+            hedge_after = _latency_tracker.percentile(GEMINI_HEDGE_PERCENTILE, GEMINI_HEDGE_MIN_SAMPLES)
+        
+        started = time.monotonic()
+        pending = {_submit(self._generate_json, prompt, deadline)}
+        hedged = False
+        last_error = None
+        
+        try:
+            while pending:
+                now = time.monotonic()
+                remaining = deadline - now
+                if remaining <= 0:
+                    if not any(future.running() or future.done() for future in pending):
+                        raise GeminiBusy("Gemini workers busy: the request waited its whole deadline in the queue")
+                    raise TimeoutError("Gemini optimization exceeded its deadline")
+                
+                wait_for = remaining
+                if hedge_after is not None and not hedged:
+                    wait_for = min(remaining, max(started + hedge_after - now, 0))
+                
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+                
+                if not done:
+                    if hedge_after is not None and not hedged:
+                        if _has_idle_worker():
+                            pending.add(_submit(self._generate_json, prompt, deadline))
+                        hedged = True
+                    continue
+                
+                for future in done:
+                    try:
+                        optimized_json = future.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    
+                    # Validate against schema
+                    if self._validate_json_structure(optimized_json):
+                        return optimized_json
+                    last_error = Exception("Failed to generate valid JSON")
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        raise last_error or Exception("Failed to generate valid JSON")
+    
+    def _generate_json(self, prompt: str, deadline: float) -> Dict[str, Any]:
+        """
+        Single generate_content call with the remaining budget as its timeout.
+        Latency is timed from when a worker starts the call, so time spent
+        queued for a worker never feeds the hedging percentile.
+        """
+        started = time.monotonic()
+        if deadline - started <= 0:
+            raise GeminiBusy("Gemini workers busy: the call was queued past its deadline")
+        response = self.model.generate_content(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.2,
+                top_p=0.9,
+                max_output_tokens=8192,
+            ),
+            request_options={'timeout': max(deadline - started, 1.0)}
+        )
+        _latency_tracker.record(time.monotonic() - started)
+        
+        # Extract JSON from response
+        return self._extract_json_from_response(response.text)
+    
     def _build_optimization_prompt(self, resume_draft: Dict[str, Any], job_description: str,
                                  region: str, seniority: str, tone: str) -> str:
         """
@@ -163,143 +318,4 @@ IMPORTANT: Return ONLY the JSON object, no additional text or formatting."""
         """
         Get the strict JSON schema for resume optimization
         """
-        return {
-            "$schema": "http://json-schema.org/draft-07/schema#",
-            "title": "ResumeOptimizedSchema",
-            "type": "object",
-            "required": ["meta", "contact", "summary", "experience", "skills"],
-            "properties": {
-                "meta": {
-                    "type": "object",
-                    "required": ["region", "seniority", "tone", "atsKeywords"],
-                    "properties": {
-                        "region": {"type": "string", "enum": ["US", "UK", "EU", "Other"]},
-                        "seniority": {"type": "string", "enum": ["entry", "mid", "senior", "exec"]},
-                        "tone": {"type": "string", "enum": ["concise", "standard", "detailed"]},
-                        "atsKeywords": {"type": "array", "items": {"type": "string"}}
-                    }
-                },
-                "contact": {
-                    "type": "object",
-                    "required": ["name"],
-                    "properties": {
-                        "name": {"type": "string"},
-                        "title": {"type": "string"},
-                        "email": {"type": "string"},
-                        "phone": {"type": "string"},
-                        "location": {"type": "string"},
-                        "links": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "required": ["label", "url"],
-                                "properties": {
-                                    "label": {"type": "string"},
-                                    "url": {"type": "string"}
-                                }
-                            }
-                        }
-                    }
-                },
-                "summary": {"type": "string"},
-                "experience": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "required": ["company", "role", "startDate"],
-                        "properties": {
-                            "company": {"type": "string"},
-                            "role": {"type": "string"},
-                            "location": {"type": "string"},
-                            "startDate": {"type": "string"},
-                            "endDate": {"type": ["string", "null"]},
-                            "bullets": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "required": ["text"],
-                                    "properties": {
-                                        "text": {"type": "string"},
-                                        "skills": {"type": "array", "items": {"type": "string"}},
-                                        "metric": {"type": "string"}
-                                    }
-                                }
-                            }
-                        }
-                    }
-                },
-                "projects": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "required": ["name"],
-                        "properties": {
-                            "name": {"type": "string"},
-                            "link": {"type": "string"},
-                            "description": {"type": "string"},
-                            "bullets": {"type": "array", "items": {"type": "string"}}
-                        }
-                    }
-                },
-                "education": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "required": ["institution", "degree"],
-                        "properties": {
-                            "institution": {"type": "string"},
-                            "degree": {"type": "string"},
-                            "location": {"type": "string"},
-                            "startDate": {"type": "string"},
-                            "endDate": {"type": "string"},
-                            "gpa": {"type": "string"}
-                        }
-                    }
-                },
-                "skills": {
-                    "type": "object",
-                    "properties": {
-                        "languages": {"type": "array", "items": {"type": "string"}},
-                        "frameworks": {"type": "array", "items": {"type": "string"}},
-                        "tools": {"type": "array", "items": {"type": "string"}},
-                        "other": {"type": "array", "items": {"type": "string"}}
-                    }
-                },
-                "certifications": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                            "issuer": {"type": "string"},
-                            "year": {"type": "string"}
-                        }
-                    }
-                },
-                "awards": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                            "issuer": {"type": "string"},
-                            "year": {"type": "string"}
-                        }
-                    }
-                },
-                "publications": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "title": {"type": "string"},
-                            "venue": {"type": "string"},
-                            "year": {"type": "string"},
-                            "link": {"type": "string"}
-                        }
-                    }
-                },
-                "extras": {"type": "string"}
-            }
-        }
-
+        return RESUME_SCHEMA
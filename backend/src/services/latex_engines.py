@@ -0,0 +1,165 @@
+import os
+import shutil
+import subprocess
+import threading
+from typing import Dict, List, Optional
+
+LATEX_ENGINE = os.getenv('LATEX_ENGINE', 'auto')
+
+# Tectonic runs fully offline from this cache; seed it once with network
+# access (see TectonicEngine) and ship it with the deployment
+TECTONIC_CACHE_DIR = os.getenv('TECTONIC_CACHE_DIR', '/tmp/.tectonic-cache')
+TECTONIC_BUNDLE = os.getenv('TECTONIC_BUNDLE', '')
+
+# Timestamp written into every PDF in place of the wall clock, so the same
+# source always compiles to the same bytes (2000-01-01 by default)
+SOURCE_DATE_EPOCH = os.getenv('SOURCE_DATE_EPOCH', '946684800')
+
+BEGIN_DOCUMENT = r'\begin{document}'
+
+# Preference order when LATEX_ENGINE=auto
+AUTO_ORDER = ('pdflatex', 'tectonic', 'latexmk')
+
+
+class LatexEngine:
+    """
+    One way of turning a .tex file into a PDF. Engines differ only in
+    the command line they run and the environment they need; the compiler
+    owns the workspace, scheduling and log handling.
+    """
+
+    name = ''
+    executable = ''
+    # Whether the engine can start from a mylatexformat dump (-fmt)
+    supports_formats = False
+    # Whether the engine can typeset without writing a PDF (-draftmode)
+    supports_draft = False
+    # Primitives that remove the remaining per-run data from the output
+    deterministic_setup = ''
+
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return shutil.which(self.executable) is not None
+
+    def version(self) -> str:
+        """
+        First line of `<executable> --version`, read once per process
+        """
+        with self._lock:
+            if self._version is None:
+                try:
+                    result = subprocess.run([self.executable, '--version'], capture_output=True, text=True, timeout=10)
+                    self._version = (result.stdout or '').split('\n', 1)[0].strip() or 'unknown'
+                except (OSError, subprocess.TimeoutExpired):
+                    self._version = 'unknown'
+            return self._version
+
+    def env(self, base_env: Dict[str, str]) -> Dict[str, str]:
+        """
+        Environment for every run; dates (including \\today) come from
+        SOURCE_DATE_EPOCH instead of the clock
+        """
+        env = dict(base_env)
+        env['SOURCE_DATE_EPOCH'] = SOURCE_DATE_EPOCH
+        env['FORCE_SOURCE_DATE'] = '1'
+        return env
+
+    def deterministic_source(self, tex_string: str) -> str:
+        """
+        Source with `deterministic_setup` right after \\begin{document},
+        leaving the preamble (and its cached format) untouched
+        """
+        position = tex_string.find(BEGIN_DOCUMENT)
+        if not self.deterministic_setup or position < 0:
+            return tex_string
+        position += len(BEGIN_DOCUMENT)
+        return tex_string[:position] + '\n' + self.deterministic_setup + '\n' + tex_string[position:]
+
+    def command(self, tex_path: str, output_dir: str, format_name: Optional[str] = None,
+                draft: bool = False) -> List[str]:
+        """
+        Command line for one run; `draft` is ignored by engines without draft support
+        """
+        raise NotImplementedError
+
+
+class PdflatexEngine(LatexEngine):
+    """
+    Single pdflatex pass; the default and the only engine using cached formats
+    """
+
+    name = 'pdflatex'
+    executable = 'pdflatex'
+    supports_formats = True
+    supports_draft = True
+    # No trailer /ID (pdfTeX derives it from the output path, which is a
+    # fresh workspace per job) and no PTEX.* banner/file-name entries
+    deterministic_setup = r'\ifdefined\pdftrailerid\pdftrailerid{}\pdfsuppressptexinfo=-1\fi'
+
+    def command(self, tex_path, output_dir, format_name=None, draft=False):
+        command = [self.executable, '-interaction=nonstopmode']
+        if format_name:
+            command.append(f'-fmt={format_name}')
+        if draft:
+            command.append('-draftmode')
+        return command + ['-output-directory', output_dir, tex_path]
+
+
+class TectonicEngine(LatexEngine):
+    """
+    Tectonic restricted to its local bundle cache (--only-cached), so a
+    compile never touches the network. Seed the cache once with
+    `TECTONIC_CACHE_DIR=... tectonic <any template>.tex` on a networked host,
+    or point TECTONIC_BUNDLE at a local bundle file.
+    """
+
+    name = 'tectonic'
+    executable = 'tectonic'
+
+    def env(self, base_env):
+        env = super().env(base_env)
+        env['TECTONIC_CACHE_DIR'] = TECTONIC_CACHE_DIR
+        env['TECTONIC_UNTRUSTED_MODE'] = '1'
+        return env
+
+    def command(self, tex_path, output_dir, format_name=None, draft=False):
+        command = [self.executable, '--only-cached', '--keep-logs', '--chatter', 'minimal',
+                   '-Z', 'deterministic-mode', '--outdir', output_dir]
+        if TECTONIC_BUNDLE:
+            command += ['--bundle', TECTONIC_BUNDLE]
+        return command + [tex_path]
+
+
+class LatexmkEngine(LatexEngine):
+    """
+    latexmk driving pdflatex; reruns until cross-references settle
+    """
+
+    name = 'latexmk'
+    executable = 'latexmk'
+    deterministic_setup = PdflatexEngine.deterministic_setup
+
+    def command(self, tex_path, output_dir, format_name=None, draft=False):
+        return [self.executable, '-pdf', '-interaction=nonstopmode', '-halt-on-error',
+                f'-outdir={output_dir}', tex_path]
+
+
+ENGINES: Dict[str, LatexEngine] = {engine.name: engine for engine in (PdflatexEngine(), TectonicEngine(), LatexmkEngine())}
+
+
+def select_engine(name: str = LATEX_ENGINE) -> LatexEngine:
+    """
+    The configured engine, or with 'auto' the first one installed
+    """
+    if name and name != 'auto':
+        try:
+            return ENGINES[name]
+        except KeyError:
+            raise ValueError(f"Unknown LATEX_ENGINE '{name}'. Use one of: auto, {', '.join(ENGINES)}")
+    for candidate in AUTO_ORDER:
+        if ENGINES[candidate].available():
+            return ENGINES[candidate]
+    return ENGINES['pdflatex']
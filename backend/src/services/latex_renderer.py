@@ -1,32 +1,76 @@
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from src.services.template_registry import CompiledTemplate, TemplateRegistry, template_registry
+from src.services.block_cache import BlockCache, block_cache
+from src.services.format_cache import format_cache
+from src.utils.latex_escape import escape_latex, escape_latex_many
+
+# Body sections in the order every renderer emits them, after the name and contact line
+SECTION_ORDER = ('skills', 'experience', 'projects', 'education')
+
+# Skill categories and their display names, in template order
+SKILL_CATEGORIES = {
+    'languages': 'Programming Languages',
+    'frameworks': 'Frameworks', 
+    'tools': 'Tools',
+    'other': 'Analysis',  # Changed to match template style
+    'cad': 'CAD'  # Add CAD category to match template
+}
+
+CAD_TERMS = ['nx', 'catia', 'solidworks', 'autocad', 'fusion', 'inventor']
+
+def consolidate_skills(skills: Dict[str, List[str]]) -> List[Tuple[str, List[str]]]:
+    """
+    Map raw skill categories onto the template's categories, splitting CAD
+    packages out of tools. Returns (display_name, skills) pairs in order.
+    """
+    # Consolidate skills into appropriate categories for the template format
+    consolidated_skills = {}
+    
+    # Map existing skills to template categories
+    if skills.get('tools'):
+        # Split tools into CAD and other tools
+        cad_tools = []
+        other_tools = []
+        for tool in skills['tools']:
+            if any(cad_term in str(tool or '').lower() for cad_term in CAD_TERMS):
+                cad_tools.append(tool)
+            else:
+                other_tools.append(tool)
+        
+        if cad_tools:
+            consolidated_skills['cad'] = cad_tools
+        if other_tools:
+            consolidated_skills['tools'] = other_tools
+    
+    # Add other categories as they are
+    for category in ['languages', 'frameworks', 'other']:
+        if skills.get(category):
+            consolidated_skills[category] = skills[category]
+    
+    return [
+        (display_name, consolidated_skills[category])
+        for category, display_name in SKILL_CATEGORIES.items()
+        if consolidated_skills.get(category)
+    ]
 
 class LaTeXRenderer:
     """
     Service for rendering optimized resume JSON to LaTeX
     """
     
-    def __init__(self):
-        self.latex_escape_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-            '\\': r'\textbackslash{}'
-        }
+    def __init__(self, registry: Optional[TemplateRegistry] = None, cache: Optional[BlockCache] = None):
+        self.registry = registry or template_registry
+        self.block_cache = cache or block_cache
     
     def render(self, optimized_json: Dict[str, Any], template_name: str = "default_user_template") -> str:
         """
         Render optimized JSON to LaTeX using the specified template
         """
         
-        # Get the LaTeX template
+        # Get the LaTeX template; only registry templates get a precompiled preamble format
         template = self._get_template(template_name)
+        format_cache.register_template(template)
         
         # Extract data from JSON
         contact = optimized_json.get('contact', {})
@@ -35,55 +79,27 @@ class LaTeXRenderer:
         education = optimized_json.get('education', [])
         skills = optimized_json.get('skills', {})
         
-        # Build template variables
+        # Build template variables; each block is memoized on its input subtree
+        cached = self.block_cache.get_or_build
+        namespace = template.digest
         template_vars = {
             'NAME': self._escape_latex(contact.get('name', '')),
-            'CONTACT_LINE': self._build_contact_line(contact),
-            'SKILLS_BLOCK': self._build_skills_block(skills),
-            'EXPERIENCE_BLOCK': self._build_experience_block(experience),
-            'PROJECTS_BLOCK': self._build_projects_block(projects),
-            'EDUCATION_BLOCK': self._build_education_block(education)
+            'CONTACT_LINE': cached('contact', namespace, contact, self._build_contact_line),
+            'SKILLS_BLOCK': cached('skills', namespace, skills, self._build_skills_block),
+            'EXPERIENCE_BLOCK': cached('experience', namespace, experience, self._build_experience_block),
+            'PROJECTS_BLOCK': cached('projects', namespace, projects, self._build_projects_block),
+            'EDUCATION_BLOCK': cached('education', namespace, education, self._build_education_block)
         }
         
-        # Replace placeholders in template
-        rendered_latex = template
-        for var_name, var_value in template_vars.items():
-            placeholder = '{{' + var_name + '}}'
-            rendered_latex = rendered_latex.replace(placeholder, var_value)
-        
-        return rendered_latex
+        # Fill placeholders in a single join over the precompiled segments
+        return template.render(template_vars)
     
     def _escape_latex(self, text: str) -> str:
         """
         Escape special LaTeX characters in user data only.
         Does NOT escape LaTeX control sequences - only user-provided text.
         """
-        if not text:
-            return ""
-        
-        # Convert to string if not already
-        text = str(text)
-        
-        # Normalize unicode characters to LaTeX-safe sequences
-        # Handle smart quotes and dashes
-        text = text.replace('"', '``').replace('"', "''")  # Smart quotes to LaTeX
-        text = text.replace(''', "'").replace(''', "'")    # Smart single quotes
-        text = text.replace('—', '---').replace('–', '--')  # Em/en dashes
-        
-        # Escape LaTeX special characters in correct order
-        # Do backslash first to avoid double-escaping
-        text = text.replace('\\', r'\textbackslash{}')
-        text = text.replace('&', r'\&')
-        text = text.replace('%', r'\%')
-        text = text.replace('$', r'\$')
-        text = text.replace('#', r'\#')
-        text = text.replace('_', r'\_')
-        text = text.replace('{', r'\{')
-        text = text.replace('}', r'\}')
-        text = text.replace('~', r'\textasciitilde{}')
-        text = text.replace('^', r'\textasciicircum{}')
-        
-        return text
+        return escape_latex(text)
     
     def _escape_latex_url(self, url: str) -> str:
         """
@@ -103,6 +119,20 @@ class LaTeXRenderer:
         
         return url
     
+    def _bullet_texts(self, bullets: List[Any]) -> List[str]:
+        """
+        Handle both string and dictionary bullet formats
+        """
+        texts = []
+        for bullet in bullets:
+            if isinstance(bullet, dict):
+                texts.append(bullet.get('text', str(bullet)))
+            elif isinstance(bullet, str):
+                texts.append(bullet)
+            else:
+                texts.append(str(bullet))
+        return texts
+    
     def _build_contact_line(self, contact: Dict[str, Any]) -> str:
         """
         Build the contact line with email, phone, and links
@@ -149,46 +179,11 @@ class LaTeXRenderer:
         skills_lines.append("% skills section")
         skills_lines.append("\\section*{Skills}")
         
-        # Define skill categories and their display names to match template
-        skill_categories = {
-            'languages': 'Programming Languages',
-            'frameworks': 'Frameworks', 
-            'tools': 'Tools',
-            'other': 'Analysis',  # Changed to match template style
-            'cad': 'CAD'  # Add CAD category to match template
-        }
-        
-        # Consolidate skills into appropriate categories for the template format
-        consolidated_skills = {}
-        
-        # Map existing skills to template categories
-        if skills.get('tools'):
-            # Split tools into CAD and other tools
-            cad_tools = []
-            other_tools = []
-            for tool in skills['tools']:
-                if any(cad_term in tool.lower() for cad_term in ['nx', 'catia', 'solidworks', 'autocad', 'fusion', 'inventor']):
-                    cad_tools.append(tool)
-                else:
-                    other_tools.append(tool)
-            
-            if cad_tools:
-                consolidated_skills['cad'] = cad_tools
-            if other_tools:
-                consolidated_skills['tools'] = other_tools
-        
-        # Add other categories as they are
-        for category in ['languages', 'frameworks', 'other']:
-            if skills.get(category):
-                consolidated_skills[category] = skills[category]
-        
         # Build skills lines in template format
-        for category, display_name in skill_categories.items():
-            skill_list = consolidated_skills.get(category, [])
-            if skill_list:
-                escaped_skills = [self._escape_latex(skill) for skill in skill_list]
-                skills_line = f"\\textbf{{{display_name}:}} {', '.join(escaped_skills)} \\\\"
-                skills_lines.append(skills_line)
+        for display_name, skill_list in consolidate_skills(skills):
+            escaped_skills = escape_latex_many(skill_list)
+            skills_line = f"\\textbf{{{display_name}:}} {', '.join(escaped_skills)} \\\\"
+            skills_lines.append(skills_line)
         
         return "\n".join(skills_lines)
     
@@ -242,16 +237,7 @@ class LaTeXRenderer:
             bullets = exp.get('bullets', [])
             if bullets:
                 experience_blocks.append("\\begin{itemize}")
-                for bullet in bullets:
-                    # Handle both string and dictionary bullet formats
-                    if isinstance(bullet, dict):
-                        bullet_text = bullet.get('text', str(bullet))
-                    elif isinstance(bullet, str):
-                        bullet_text = bullet
-                    else:
-                        bullet_text = str(bullet)
-                    
-                    escaped_bullet = self._escape_latex(bullet_text)
+                for escaped_bullet in escape_latex_many(self._bullet_texts(bullets)):
                     experience_blocks.append(f"  \\item {escaped_bullet}")
                 experience_blocks.append("\\end{itemize}")
             
@@ -305,16 +291,7 @@ class LaTeXRenderer:
             bullets = project.get('bullets', [])
             if bullets:
                 projects_blocks.append("\\begin{itemize}")
-                for bullet in bullets:
-                    # Handle both string and dictionary bullet formats
-                    if isinstance(bullet, dict):
-                        bullet_text = bullet.get('text', str(bullet))
-                    elif isinstance(bullet, str):
-                        bullet_text = bullet
-                    else:
-                        bullet_text = str(bullet)
-                    
-                    escaped_bullet = self._escape_latex(bullet_text)
+                for escaped_bullet in escape_latex_many(self._bullet_texts(bullets)):
                     projects_blocks.append(f"  \\item {escaped_bullet}")
                 projects_blocks.append("\\end{itemize}")
             elif description:
@@ -377,60 +354,8 @@ class LaTeXRenderer:
         
         return "\n".join(education_blocks)
     
-    def _get_template(self, template_name: str) -> str:
+    def _get_template(self, template_name: str) -> CompiledTemplate:
         """
-        Get the LaTeX template - using the exact custom template provided by user
+        Get the precompiled LaTeX template from the template registry
         """
-        # Custom template matching the exact format and styling requested
-        return r"""\documentclass[11pt]{article}       % set main text size
-\usepackage[letterpaper,                % set paper size to letterpaper. change to a4paper for resumes outside of North America
-top=0.5in,                          % specify top page margin
-bottom=0.5in,                       % specify bottom page margin
-left=0.5in,                         % specify left page margin
-right=0.5in]{geometry}              % specify right page margin
-                       
-\usepackage{XCharter}               % set font. comment this line out if you want to use the default LaTeX font Computer Modern
-\usepackage[T1]{fontenc}            % output encoding
-\usepackage[utf8]{inputenc}         % input encoding
-\usepackage{enumitem}               % enable lists for bullet points: itemize and \item
-\usepackage[hidelinks]{hyperref}    % format hyperlinks
-\usepackage{titlesec}               % enable section title customization
-\raggedright                        % disable text justification
-\pagestyle{empty}                   % disable page numbering
-
-% ensure PDF output will be all-Unicode and machine-readable
-\input{glyphtounicode}
-\pdfgentounicode=1
-
-% format section headings: bolding, size, white space above and below
-\titleformat{\section}{\bfseries\large}{}{0pt}{}[\vspace{1pt}\titlerule\vspace{-6.5pt}]
-
-% format bullet points: size, white space above and below, white space between bullets
-\renewcommand\labelitemi{$\vcenter{\hbox{\small$\bullet$}}$}
-\setlist[itemize]{itemsep=-2pt, leftmargin=12pt, topsep=7pt}
-
-% resume starts here
-\begin{document}
-
-% name
-\centerline{\Huge {{NAME}}}
-
-\vspace{5pt}
-
-% contact information
-\centerline{{{CONTACT_LINE}}}
-
-\vspace{-10pt}
-
-{{SKILLS_BLOCK}}
-
-\vspace{-6.5pt}
-
-{{EXPERIENCE_BLOCK}}
-
-{{PROJECTS_BLOCK}}
-
-{{EDUCATION_BLOCK}}
-
-\end{document}"""
-
+        return self.registry.get(template_name)
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from cachetools import LRUCache
+from src.services.compile_cache import normalize_tex
+from src.services.pdf_compiler import PDFCompiler
+
+BEGIN_DOCUMENT = r'\begin{document}'
+
+# Logs the final page count; \AtEndDocument runs before the last page is
+# shipped, so clear it first. Works in -draftmode, unlike pdfTeX's summary.
+PAGE_PROBE = r'\AtEndDocument{\clearpage\typeout{RRPAGES:\the\numexpr\value{page}-1\relax}}'
+
+# Tightness levels from the template as-is (0) to the densest layout we
+# still consider readable: (font size pt, margins in, itemsep pt, topsep pt)
+FIT_LEVELS: Tuple[Optional[Tuple[float, float, float, float]], ...] = (
+    None,
+    (11.0, 0.45, -2.5, 6.0),
+    (10.5, 0.45, -3.0, 5.0),
+    (10.5, 0.40, -3.0, 4.0),
+    (10.0, 0.40, -3.5, 3.0),
+    (10.0, 0.35, -4.0, 2.0),
+    (9.5, 0.30, -4.0, 2.0),
+    (9.0, 0.30, -4.5, 1.0),
+)
+
+PAGE_FIT_CACHE_SIZE = int(os.getenv('PAGE_FIT_CACHE_SIZE', 512))
+
+
+def level_overrides(level: int) -> str:
+    """
+    LaTeX applying one tightness level. Everything is set after
+    \\begin{document}, so the preamble (and its cached format) is untouched.
+    """
+    params = FIT_LEVELS[level]
+    if params is None:
+        return ''
+    font_size, margin, itemsep, topsep = params
+    return '\n'.join((
+        f'% fit-to-page level {level}',
+        rf'\ifdefined\newgeometry\newgeometry{{top={margin}in,bottom={margin}in,left={margin}in,right={margin}in}}\fi',
+        rf'\fontsize{{{font_size:g}pt}}{{{font_size * 1.2:g}pt}}\selectfont',
+        rf'\ifdefined\setlist\setlist[itemize]{{itemsep={itemsep:g}pt,topsep={topsep:g}pt}}\fi',
+    ))
+
+
+def apply_level(tex_string: str, level: int, probe: bool = False) -> str:
+    """
+    Source with the level's overrides (and optionally the page probe)
+    inserted right after \\begin{document}
+    """
+    insert = '\n'.join(part for part in (level_overrides(level), PAGE_PROBE if probe else '') if part)
+    if not insert:
+        return tex_string
+    position = tex_string.find(BEGIN_DOCUMENT)
+    if position < 0:
+        raise ValueError('Cannot fit a document without \\begin{document}')
+    position += len(BEGIN_DOCUMENT)
+    return tex_string[:position] + '\n' + insert + '\n' + tex_string[position:]
+
+
+class PageFitter:
+    """
+    Finds the loosest tightness level that fits a document on one page.
+    Levels are ordered, so it probes the template as-is and then binary
+    searches the rest with draft runs (page count only, no PDF). Results
+    are remembered per source so repeat requests skip the search.
+    """
+
+    def __init__(self, cache_size: int = PAGE_FIT_CACHE_SIZE):
+        self._results = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+
+    def fit(self, tex_string: str, compiler: PDFCompiler, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns {texString, level, pages, fits, iterations, timeMs}; the
+        source is ready for a single final compile with `compiler`
+        """
+        started = time.perf_counter()
+        # Same source and engine always fit the same way
+        source_hash = hashlib.sha256(normalize_tex(tex_string).encode('utf-8')).hexdigest()
+        key = (compiler.engine.name, compiler.engine.version(), source_hash)
+        with self._lock:
+            known = self._results.get(key)
+
+        iterations = 0
+        if known is not None:
+            level, pages = known
+        else:
+            probed: Dict[int, int] = {}
+
+            def pages_at(level: int) -> int:
+                nonlocal iterations
+                if level not in probed:
+                    iterations += 1
+                    probed[level] = compiler.count_pages(apply_level(tex_string, level, probe=True), deadline)
+                return probed[level]
+
+            level = 0
+            if pages_at(0) > 1:
+                low, high = 1, len(FIT_LEVELS) - 1
+                if pages_at(high) > 1:
+                    # Even the densest layout overflows; use it anyway
+                    level = high
+                else:
+                    while low < high:
+                        middle = (low + high) // 2
+                        if pages_at(middle) <= 1:
+                            high = middle
+                        else:
+                            low = middle + 1
+                    level = low
+            pages = pages_at(level)
+            with self._lock:
+                self._results[key] = (level, pages)
+
+        return {
+            'texString': apply_level(tex_string, level),
+            'level': level,
+            'pages': pages,
+            'fits': pages <= 1,
+            'iterations': iterations,
+            'timeMs': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+
+# Shared so fit results are reused across requests
+page_fitter = PageFitter()
@@ -1,152 +1,225 @@
 import os
-import tempfile
 import subprocess
-import os
 import base64
 import json
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Callable, Optional, Tuple, List
+from src.services.format_cache import format_cache, FORMAT_CACHE_ENABLED
+from src.services.compile_cache import compile_cache, COMPILE_CACHE_ENABLED
+from src.services.compile_workspace import workspace_manager
+from src.services.compile_scheduler import compile_scheduler
+from src.services.latex_engines import LatexEngine, select_engine
+from src.utils.latex_log import scan_log_file, scan_log_text
+
+class CompilationError(RuntimeError):
+    """
+    Raised when the engine produced no PDF. Carries the diagnostics from
+    that run, so callers never need a second compile to explain a failure.
+    """
+    
+    def __init__(self, engine: str, returncode: int, errors: List[Dict[str, Any]],
+                 warnings: List[str], log_tail: str):
+        message = f"{engine} compilation failed (return code: {returncode})"
+        if errors:
+            message += f"\nKey errors: {'; '.join(self._describe(error) for error in errors[:3])}"
+        super().__init__(message)
+        self.engine = engine
+        self.returncode = returncode
+        self.errors = errors
+        self.warnings = warnings
+        self.log_tail = log_tail
+    
+    @staticmethod
+    def _describe(error: Dict[str, Any]) -> str:
+        return f"{error['message']} (line {error['line']})" if error.get('line') else error['message']
+    
+    def to_dict(self, include_log: bool = False) -> Dict[str, Any]:
+        result = {'errors': self.errors, 'warnings': self.warnings}
+        if include_log:
+            result['log'] = self.log_tail
+        return result
 
 class PDFCompiler:
     """
-    Service for compiling LaTeX to PDF using Tectonic engine
+    Service for compiling LaTeX to PDF with the configured engine
+    (pdflatex, Tectonic or latexmk; see latex_engines)
     """
     
-    def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
-        # Set environment for reproducibility
-        self.env = os.environ.copy()
-        self.env.update({
-            'TECTONIC_UNTRUSTED_MODE': '1',
-            'TECTONIC_CACHE_DIR': '/tmp/.tectonic-cache',
-            'TECTONIC_BUNDLE_URL': 'https://data1.fullyjustified.net/tlextras-2023.2r0.tar'
-        })
+    job_name = 'resume'
+    
+    def __init__(self, use_format_cache: bool = FORMAT_CACHE_ENABLED, use_compile_cache: bool = COMPILE_CACHE_ENABLED,
+                 engine: Optional[LatexEngine] = None):
+        self.engine = engine or select_engine()
+        self.workspace_manager = workspace_manager
+        self.scheduler = compile_scheduler
+        self.format_cache = format_cache if use_format_cache and self.engine.supports_formats else None
+        self.compile_cache = compile_cache if use_compile_cache else None
+        # 'hit', 'miss' or None (cache disabled or bypassed) for the last compile
+        self.last_cache_status: Optional[str] = None
+        # Engine-specific environment (Tectonic's offline cache, ...)
+        self.env = self.engine.env(os.environ.copy())
     
-    def compile_from_base64(self, base64_tex: str, include_log: bool = False) -> Tuple[bytes, Optional[str], List[str]]:
+    @staticmethod
+    def decode_base64(base64_tex: str) -> str:
         """
-        Compile LaTeX from Base64 encoded string to PDF
-        Returns (pdf_bytes, log_content, warnings)
+        Decode Base64 transport to LaTeX with Unix newlines
         """
         try:
             # Decode Base64 to UTF-8
             tex_string = base64.b64decode(base64_tex).decode('utf-8')
             # Normalize to Unix newlines
-            tex_string = tex_string.replace('\r\n', '\n').replace('\r', '\n')
-            
-            return self.compile(tex_string, include_log)
+            return tex_string.replace('\r\n', '\n').replace('\r', '\n')
         except Exception as e:
             raise ValueError(f"Failed to decode Base64 LaTeX: {str(e)}")
     
-    def compile(self, tex_string: str, include_log: bool = False) -> Tuple[bytes, Optional[str], List[str]]:
+    def compile_from_base64(self, base64_tex: str, include_log: bool = False,
+                            deadline: Optional[float] = None) -> Tuple[bytes, Optional[str], List[str]]:
         """
-        Compile LaTeX string to PDF - simplified and stable version
+        Compile LaTeX from Base64 encoded string to PDF
         Returns (pdf_bytes, log_content, warnings)
         """
+        return self.compile(self.decode_base64(base64_tex), include_log, deadline)
+    
+    def compile(self, tex_string: str, include_log: bool = False,
+                deadline: Optional[float] = None) -> Tuple[bytes, Optional[str], List[str]]:
+        """
+        Compile LaTeX string to PDF - simplified and stable version
+        Returns (pdf_bytes, log_content, warnings). Raises
+        CompileQueueTimeout if no compile slot frees up before `deadline`
+        (a time.monotonic() value) or the scheduler's queue timeout.
+        """
+        # Identical source compiles to an identical PDF; a cached entry has
+        # no log, so requests that want one always run the engine
+        cache_key = None
+        self.last_cache_status = None
+        if self.compile_cache and not include_log:
+            cache_key = self.compile_cache.key_for(tex_string, self.engine.name, self.engine.version())
+            cached = self.compile_cache.get(cache_key)
+            if cached is not None:
+                self.last_cache_status = 'hit'
+                return cached[0], None, cached[1]
+            self.last_cache_status = 'miss'
         
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.tex', delete=False, encoding='utf-8') as tex_file:
-            tex_file.write(tex_string)
-            tex_file_path = tex_file.name
+        pdf_bytes, log_content, warnings = self._run_job(tex_string, include_log, deadline, self._read_pdf)
         
-        try:
-            # Get the directory and base name
-            tex_dir = os.path.dirname(tex_file_path)
-            tex_basename = os.path.splitext(os.path.basename(tex_file_path))[0]
-            pdf_path = os.path.join(tex_dir, f"{tex_basename}.pdf")
-            log_path = os.path.join(tex_dir, f"{tex_basename}.log")
-            
-            # Use pdflatex for reliable compilation
-            compile_command = [
-                'pdflatex',
-                '-interaction=nonstopmode',
-                '-output-directory', tex_dir,
-                tex_file_path
-            ]
-            
-            # Run compilation
-            result = subprocess.run(
-                compile_command,
-                capture_output=True,
-                text=True,
-                cwd=tex_dir
-            )
-            
-            # Read log file if it exists
-            log_content = None
-            if os.path.exists(log_path):
-                with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    log_content = f.read()
-            elif result.stdout:
-                log_content = result.stdout
-            
-            # Parse warnings from log
-            warnings = self._parse_warnings(log_content or "")
-            
-            # Check if PDF was created
-            if not os.path.exists(pdf_path):
-                error_msg = f"pdflatex compilation failed (return code: {result.returncode})"
-                if log_content:
-                    # Extract key error information
-                    error_lines = []
-                    for line in log_content.split('\n'):
-                        if 'error' in line.lower() or line.startswith('!') or 'undefined' in line.lower():
-                            error_lines.append(line.strip())
-                    if error_lines:
-                        error_msg += f"\nKey errors: {'; '.join(error_lines[:3])}"
-                raise RuntimeError(error_msg)
-            
-            # Read PDF bytes
-            with open(pdf_path, 'rb') as pdf_file:
-                pdf_bytes = pdf_file.read()
-            
-            # Clean up temporary files
-            self._cleanup_files([tex_file_path, pdf_path, log_path])
-            
-            return pdf_bytes, log_content if include_log else None, warnings
-            
-        except Exception as e:
-            # Clean up on error
-            self._cleanup_files([tex_file_path])
-            raise e
-    
-    def _check_tectonic(self) -> bool:
-        """Check if Tectonic is available"""
-        try:
-            result = subprocess.run(['tectonic', '--version'], capture_output=True, text=True)
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        if cache_key:
+            self.compile_cache.put(cache_key, pdf_bytes, warnings)
+        
+        return pdf_bytes, log_content, warnings
     
-    def _parse_warnings(self, log_content: str) -> List[str]:
-        """Parse warnings from compilation log"""
-        warnings = []
+    def compile_to_cache(self, tex_string: str, deadline: Optional[float] = None
+                         ) -> Tuple[Optional[Dict[str, Any]], Optional[bytes], List[str]]:
+        """
+        Compile (or find) the PDF and return (entry, None, warnings) with its
+        compile-cache entry ({key, path, compressed, size, sha256, warnings})
+        instead of its bytes, so callers can stream it from disk. When the
+        cache is disabled or the entry could not be written, returns
+        (None, pdf_bytes, warnings) from the same run.
+        """
+        if not self.compile_cache:
+            pdf_bytes, _, warnings = self.compile(tex_string, deadline=deadline)
+            return None, pdf_bytes, warnings
+        self.last_cache_status = None
+        cache_key = self.compile_cache.key_for(tex_string, self.engine.name, self.engine.version())
+        entry = self.compile_cache.entry(cache_key)
+        if entry is not None:
+            self.last_cache_status = 'hit'
+            return entry, None, entry['warnings']
+        self.last_cache_status = 'miss'
         
-        if not log_content:
-            return warnings
+        def deliver(pdf_path: str, warnings: List[str]) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+            entry = self.compile_cache.put_file(cache_key, pdf_path, warnings)
+            # A failed cache write still has the PDF on disk; never compile twice
+            return entry, None if entry is not None else self._read_pdf(pdf_path, warnings)
         
-        lines = log_content.split('\n')
-        for line in lines:
-            line = line.strip()
+        (entry, pdf_bytes), _, warnings = self._run_job(tex_string, False, deadline, deliver)
+        return entry, pdf_bytes, warnings
+    
+    def _read_pdf(self, pdf_path: str, warnings: List[str]) -> bytes:
+        with open(pdf_path, 'rb') as pdf_file:
+            return pdf_file.read()
+    
+    def count_pages(self, tex_string: str, deadline: Optional[float] = None) -> int:
+        """
+        Page count of a document without writing a PDF (pdflatex -draftmode;
+        other engines do a full run). The source must report its page count
+        in the log, see page_fitter.PAGE_PROBE.
+        """
+        pages, _, _ = self._run_job(tex_string, False, deadline, None, draft=True)
+        return pages
+    
+    def _run_job(self, tex_string: str, include_log: bool, deadline: Optional[float],
+                 deliver: Optional[Callable[[str, List[str]], Any]],
+                 draft: bool = False) -> Tuple[Any, Optional[str], List[str]]:
+        """
+        Run one compile in a scheduled, private workspace. `deliver` gets the
+        PDF path and warnings before the workspace is removed; returns
+        (what deliver returned, log_content, warnings). Draft runs return
+        the page count from the log in place of a delivered PDF.
+        """
+        # Bounded concurrency; cache hits above never wait for a slot
+        with self.scheduler.slot(deadline):
+            # Every job gets a private directory; all engine artifacts go with it
+            with self.workspace_manager.workspace() as tex_dir:
+                tex_file_path = os.path.join(tex_dir, f"{self.job_name}.tex")
+                pdf_path = os.path.join(tex_dir, f"{self.job_name}.pdf")
+                log_path = os.path.join(tex_dir, f"{self.job_name}.log")
+            
+                with open(tex_file_path, 'w', encoding='utf-8') as tex_file:
+                    # Same source, same bytes: no timestamps or run-specific IDs
+                    tex_file.write(self.engine.deterministic_source(tex_string))
             
-            # Look for common warning patterns
-            if 'LaTeX Font Warning' in line:
-                warnings.append(f"Font Warning: {line}")
-            elif 'Overfull \\hbox' in line:
-                warnings.append(f"Layout Warning: {line}")
-            elif 'Token not allowed in a PDF string' in line:
-                warnings.append(f"PDF String Warning: {line}")
-            elif 'Package hyperref Warning' in line:
-                warnings.append(f"Hyperref Warning: {line}")
-            elif line.startswith('Warning:'):
-                warnings.append(line)
+                # Start from the template's precompiled preamble when possible
+                format_name = self.format_cache.format_for(tex_string, self.env) if self.format_cache else None
+                result = self._run_engine(tex_file_path, tex_dir, format_name, draft)
+            
+                if format_name and result.returncode != 0:
+                    log_text = ""
+                    if os.path.exists(log_path):
+                        # Format load failures are reported at the very start
+                        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+                            log_text = f.read(4096)
+                    if self.format_cache.is_format_load_error(log_text + (result.stdout or '')):
+                        # Unusable format file; drop it and compile the whole preamble
+                        self.format_cache.forget(format_name, 'format failed to load')
+                        result = self._run_engine(tex_file_path, tex_dir, None, draft)
+            
+                # One streaming pass over the log for warnings, errors and its tail
+                if os.path.exists(log_path):
+                    scanner = scan_log_file(log_path)
+                else:
+                    scanner = scan_log_text(result.stdout or '')
+                warnings = scanner.warnings
+                
+                # Check if PDF was created (draft runs only need a page count)
+                if draft:
+                    missing = scanner.pages is None
+                else:
+                    missing = not os.path.exists(pdf_path)
+                if missing:
+                    if not scanner.errors and result.stderr:
+                        # Tectonic and latexmk report some failures only on stderr
+                        scanner.feed_lines(result.stderr.splitlines())
+                    raise CompilationError(self.engine.name, result.returncode, scanner.errors,
+                                           scanner.warnings, scanner.tail)
+                
+                log_content = None
+                if include_log:
+                    if os.path.exists(log_path):
+                        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+                            log_content = f.read()
+                    else:
+                        log_content = result.stdout
+                
+                delivered = scanner.pages if draft else deliver(pdf_path, warnings)
         
-        return warnings
+        return delivered, log_content, warnings
     
-    def _cleanup_files(self, file_paths: List[str]):
-        """Clean up temporary files"""
-        for file_path in file_paths:
-            try:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-            except OSError:
-                pass  # Ignore cleanup errors
-
+    def _run_engine(self, tex_file_path: str, tex_dir: str, format_name: Optional[str],
+                    draft: bool = False) -> subprocess.CompletedProcess:
+        """
+        Run the engine once under the scheduler's limits, optionally
+        starting from a cached format
+        """
+        env = self.format_cache.env(self.env) if format_name else self.env
+        compile_command = self.engine.command(tex_file_path, tex_dir, format_name, draft)
+        return self.scheduler.run(compile_command, cwd=tex_dir, env=env)
@@ -0,0 +1,336 @@
+import html
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from src.services.block_cache import BlockCache, block_cache
+from src.services.latex_renderer import SECTION_ORDER, consolidate_skills
+
+SECTION_TITLES = {
+    'skills': 'Skills',
+    'experience': 'Experience',
+    'projects': 'Projects',
+    'education': 'Education',
+}
+
+# One entry of a resume section, independent of output format
+Entry = Dict[str, Any]
+
+# Link schemes the HTML and Markdown previews make clickable; anything
+# else (javascript:, data:, scheme-less) is shown as plain text
+SAFE_URL_SCHEMES = frozenset({'http', 'https', 'mailto'})
+_URL_SCHEME = re.compile(r'^([A-Za-z][A-Za-z0-9+.-]*):')
+
+
+class PreviewRenderer:
+    """
+    Base for instant, LaTeX-free previews of optimized resume JSON.
+    Sections, ordering and field selection mirror LaTeXRenderer's builders;
+    subclasses only decide how each piece is written out.
+    """
+
+    format_name = ''
+    mimetype = 'text/plain'
+
+    def __init__(self, cache: Optional[BlockCache] = None):
+        self.block_cache = cache or block_cache
+
+    def render(self, optimized_json: Dict[str, Any]) -> str:
+        # Blocks share the LaTeX block cache, namespaced by output format
+        cached = self.block_cache.get_or_build
+        namespace = f'preview:{self.format_name}'
+        contact = optimized_json.get('contact', {}) or {}
+        parts = [cached(f'{self.format_name}.contact', namespace, contact, self._build_header)]
+
+        for section in SECTION_ORDER:
+            subtree = optimized_json.get(section) or ({} if section == 'skills' else [])
+            builder = self._build_skills if section == 'skills' else self._section_builder(section)
+            parts.append(cached(f'{self.format_name}.{section}', namespace, subtree, builder))
+
+        return self._document([part for part in parts if part])
+
+    def _build_header(self, contact: Dict[str, Any]) -> str:
+        return self._header(str(contact.get('name', '') or ''), self._contact_items(contact))
+
+    def _build_skills(self, skills: Dict[str, List[str]]) -> str:
+        consolidated = [(display, [self._text(item) for item in items])
+                        for display, items in consolidate_skills(skills)]
+        return self._skills(SECTION_TITLES['skills'], consolidated) if consolidated else ""
+
+    def _section_builder(self, section: str):
+        extract = getattr(self, f'_{section}_entries')
+
+        def build(items: List[Dict[str, Any]]) -> str:
+            entries = extract(items)
+            return self._section(SECTION_TITLES[section], entries) if entries else ""
+        return build
+
+    # Format-independent extraction, matching LaTeXRenderer's builders.
+    # Every value is coerced to a string here, so null fields render empty
+    # as they do in LaTeX instead of reaching the format writers as None.
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        return str(value or '')
+
+    @staticmethod
+    def _is_safe_href(href: Optional[str]) -> bool:
+        """
+        True for http(s) and mailto URLs without whitespace or control
+        characters (browsers strip those, so they could hide a scheme) and
+        without angle brackets, which would end a Markdown <...> link
+        destination. Valid URLs carry all of these percent-encoded.
+        """
+        if not href or any(char.isspace() or ord(char) < 32 or ord(char) == 127 or char in '<>' for char in href):
+            return False
+        match = _URL_SCHEME.match(href)
+        return bool(match) and match.group(1).lower() in SAFE_URL_SCHEMES
+
+    def _contact_items(self, contact: Dict[str, Any]) -> List[Tuple[str, Optional[str]]]:
+        """
+        (text, href) pairs in contact-line order
+        """
+        items = []
+        if contact.get('email'):
+            items.append((self._text(contact['email']), f"mailto:{contact['email']}"))
+        if contact.get('phone'):
+            items.append((self._text(contact['phone']), None))
+        if contact.get('location'):
+            items.append((self._text(contact['location']), None))
+        for link in contact.get('links') or []:
+            if not isinstance(link, dict):
+                continue
+            url = self._text(link.get('url')).strip()
+            if url:
+                items.append((self._text(link.get('label') or url), url))
+        return items
+
+    def _bullet_texts(self, bullets: List[Any]) -> List[str]:
+        texts = []
+        for bullet in bullets or []:
+            if isinstance(bullet, dict):
+                texts.append(self._text(bullet.get('text', bullet)))
+            else:
+                texts.append(self._text(bullet))
+        return texts
+
+    def _experience_entries(self, experience: List[Dict[str, Any]]) -> List[Entry]:
+        entries = []
+        for exp in experience:
+            role, company = self._text(exp.get('role')), self._text(exp.get('company'))
+            start_date, end_date = self._text(exp.get('startDate')), self._text(exp.get('endDate')) or 'Present'
+            entries.append({
+                'title': role or company,
+                'subtitle': company if role else '',
+                'location': self._text(exp.get('location')),
+                'date': f"{start_date} – {end_date}" if start_date else end_date,
+                'url': None,
+                'bullets': self._bullet_texts(exp.get('bullets', [])),
+            })
+        return entries
+
+    def _projects_entries(self, projects: List[Dict[str, Any]]) -> List[Entry]:
+        entries = []
+        for project in projects:
+            bullets = self._bullet_texts(project.get('bullets', []))
+            if not bullets and project.get('description'):
+                bullets = [self._text(project['description'])]
+            entries.append({
+                'title': self._text(project.get('name')),
+                'subtitle': '',
+                'location': '',
+                'date': '',
+                'url': self._text(project.get('url')).strip() or None,
+                'bullets': bullets,
+            })
+        return entries
+
+    def _education_entries(self, education: List[Dict[str, Any]]) -> List[Entry]:
+        entries = []
+        for edu in education:
+            institution, degree = self._text(edu.get('institution')), self._text(edu.get('degree'))
+            end_date = self._text(edu.get('endDate'))
+            details = []
+            if edu.get('gpa'):
+                details.append(f"GPA: {edu['gpa']}")
+            entries.append({
+                'title': institution or degree,
+                'subtitle': degree if institution else '',
+                'separator': ' – ',
+                # Location only shows when there is no date, as in the LaTeX template
+                'location': self._text(edu.get('location')) if not end_date else '',
+                'date': end_date,
+                'url': None,
+                'bullets': [],
+                'details': details,
+            })
+        return entries
+
+    # Format-specific output
+
+    def _header(self, name: str, contact_items: List[Tuple[str, Optional[str]]]) -> str:
+        raise NotImplementedError
+
+    def _skills(self, title: str, skills: List[Tuple[str, List[str]]]) -> str:
+        raise NotImplementedError
+
+    def _section(self, title: str, entries: List[Entry]) -> str:
+        raise NotImplementedError
+
+    def _document(self, parts: List[str]) -> str:
+        return "\n\n".join(parts) + "\n"
+
+
+class HTMLRenderer(PreviewRenderer):
+    """
+    Self-contained HTML page for live preview in the editor
+    """
+
+    format_name = 'html'
+    mimetype = 'text/html'
+
+    STYLE = (
+        "body{font-family:Charter,Georgia,serif;max-width:8.5in;margin:0 auto;padding:0.5in;line-height:1.3}"
+        "h1{text-align:center;font-size:2em;margin:0}"
+        ".contact{text-align:center;margin:0.3em 0 0.8em}"
+        "h2{font-size:1.15em;border-bottom:1px solid #000;margin:0.8em 0 0.3em}"
+        ".entry-head{display:flex;justify-content:space-between}"
+        "ul{margin:0.2em 0 0.5em;padding-left:1.2em}"
+        "p{margin:0.1em 0}"
+    )
+
+    def _e(self, text: Any) -> str:
+        return html.escape(str(text or ''))
+
+    def _link(self, text: str, href: Optional[str]) -> str:
+        if not self._is_safe_href(href):
+            return self._e(text)
+        return f'<a href="{self._e(href)}">{self._e(text)}</a>'
+
+    def _header(self, name, contact_items):
+        contact = ' | '.join(self._link(text, href) for text, href in contact_items)
+        return f'<header><h1>{self._e(name)}</h1><p class="contact">{contact}</p></header>'
+
+    def _skills(self, title, skills):
+        lines = ''.join(
+            f'<p><strong>{self._e(display)}:</strong> {self._e(", ".join(items))}</p>'
+            for display, items in skills
+        )
+        return f'<section><h2>{self._e(title)}</h2>{lines}</section>'
+
+    def _section(self, title, entries):
+        blocks = []
+        for entry in entries:
+            head = f"<strong>{self._e(entry['title'])}</strong>"
+            if entry['subtitle']:
+                head += f"{entry.get('separator', ', ')}{self._e(entry['subtitle'])}"
+            if entry['location']:
+                head += f" – {self._e(entry['location'])}"
+            for detail in entry.get('details', []):
+                head += f" ({self._e(detail)})"
+            right = self._link(entry['url'], entry['url']) if entry['url'] else self._e(entry['date'])
+            block = f'<div class="entry-head"><span>{head}</span><span>{right}</span></div>'
+            if entry['bullets']:
+                block += '<ul>' + ''.join(f'<li>{self._e(b)}</li>' for b in entry['bullets']) + '</ul>'
+            blocks.append(f'<div class="entry">{block}</div>')
+        return f'<section><h2>{self._e(title)}</h2>{"".join(blocks)}</section>'
+
+    def _document(self, parts):
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<style>{self.STYLE}</style></head><body>{"".join(parts)}</body></html>\n'
+        )
+
+
+class MarkdownRenderer(PreviewRenderer):
+    """
+    Markdown preview (also handy for pasting into job boards)
+    """
+
+    format_name = 'markdown'
+    mimetype = 'text/markdown'
+
+    _SPECIALS = re.compile(r'([\\`*_\[\]<>#|])')
+
+    def _e(self, text: Any) -> str:
+        return self._SPECIALS.sub(r'\\\1', str(text or ''))
+
+    def _link(self, text: str, href: Optional[str]) -> str:
+        if not self._is_safe_href(href):
+            return self._e(text)
+        return f"[{self._e(text)}](<{href}>)"
+
+    def _header(self, name, contact_items):
+        lines = [f"# {self._e(name)}"]
+        if contact_items:
+            lines.append(' | '.join(self._link(text, href) for text, href in contact_items))
+        return "\n\n".join(lines)
+
+    def _skills(self, title, skills):
+        lines = [f"## {title}", ""]
+        lines.extend(f"- **{self._e(display)}:** {self._e(', '.join(items))}" for display, items in skills)
+        return "\n".join(lines)
+
+    def _section(self, title, entries):
+        lines = [f"## {title}"]
+        for entry in entries:
+            head = f"### {self._e(entry['title'])}"
+            if entry['subtitle']:
+                head += f"{entry.get('separator', ', ')}{self._e(entry['subtitle'])}"
+            if entry['location']:
+                head += f" – {self._e(entry['location'])}"
+            for detail in entry.get('details', []):
+                head += f" ({self._e(detail)})"
+            lines.extend(["", head])
+            if entry['url']:
+                lines.append(self._link(entry['url'], entry['url']))
+            elif entry['date']:
+                lines.append(f"*{self._e(entry['date'])}*")
+            if entry['bullets']:
+                lines.append("")
+                lines.extend(f"- {self._e(b)}" for b in entry['bullets'])
+        return "\n".join(lines)
+
+
+class PlainTextRenderer(PreviewRenderer):
+    """
+    ATS-friendly plain text: no markup, one fact per line
+    """
+
+    format_name = 'text'
+    mimetype = 'text/plain'
+
+    def _header(self, name, contact_items):
+        contact = ' | '.join(href[len('mailto:'):] if href and href.startswith('mailto:') else
+                             (f"{text}: {href}" if href and text != href else text)
+                             for text, href in contact_items)
+        return "\n".join(line for line in (name, contact) if line)
+
+    def _skills(self, title, skills):
+        lines = [title.upper()]
+        lines.extend(f"{display}: {', '.join(items)}" for display, items in skills)
+        return "\n".join(lines)
+
+    def _section(self, title, entries):
+        lines = [title.upper()]
+        for index, entry in enumerate(entries):
+            if index:
+                lines.append("")
+            head = entry['title']
+            if entry['subtitle']:
+                head += f"{entry.get('separator', ', ')}{entry['subtitle']}"
+            if entry['location']:
+                head += f" - {entry['location']}"
+            for detail in entry.get('details', []):
+                head += f" ({detail})"
+            lines.append(head)
+            if entry['url']:
+                lines.append(entry['url'])
+            elif entry['date']:
+                lines.append(entry['date'])
+            lines.extend(f"- {b}" for b in entry['bullets'])
+        return "\n".join(lines)
+
+
+PREVIEW_RENDERERS = {
+    renderer.format_name: renderer
+    for renderer in (HTMLRenderer, MarkdownRenderer, PlainTextRenderer)
+}
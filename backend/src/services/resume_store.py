@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
+from src.models.resume import ResumeDraft, OptimizedResume, RenderedLatex, PdfArtifact, content_hash
+
+# Larger rendered LaTeX is not kept; its artifacts just expire with the disk store
+RENDERED_LATEX_MAX_BYTES = int(os.getenv('RENDERED_LATEX_MAX_BYTES', 256 * 1024))
+# Days LaTeX (and the PDF rows compiled from it) are kept; 0 keeps them forever
+RENDERED_LATEX_RETENTION_DAYS = int(os.getenv('RENDERED_LATEX_RETENTION_DAYS', 30))
+
+# Expired rows are pruned once every this many recordings
+PRUNE_EVERY = 256
+
+class ResumeStore:
+    """
+    Database-backed store of drafts, optimized resumes and the LaTeX and
+    PDFs rendered from them, so clients pass ids instead of documents and
+    outputs survive restarts. Optimized documents are treated as
+    immutable: edits produce a new document and bump the version, so
+    readers never see a half-applied change. Needs an app context.
+    Recording rendered LaTeX and PDFs is bookkeeping for restoring
+    expired artifacts, so it happens on a writer thread, not the request.
+    """
+
+    def __init__(self):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-store')
+        self._lock = threading.Lock()
+        self._recorded = 0
+
+    def put_draft(self, document: Dict[str, Any], owner_id: Optional[int] = None,
+                  source: Optional[str] = None) -> str:
+        """
+        Store an ingested draft and return its id
+        """
+        draft = ResumeDraft(owner_id=owner_id, source=(source or '')[:255] or None,
+                            content_hash=content_hash(document), document=document)
+        db.session.add(draft)
+        db.session.commit()
+        return draft.id
+
+    def get_draft(self, draft_id: str) -> Optional[Dict[str, Any]]:
+        draft = db.session.get(ResumeDraft, draft_id)
+        return draft.document if draft is not None else None
+
+    def put(self, document: Dict[str, Any], owner_id: Optional[int] = None,
+            draft_id: Optional[str] = None) -> str:
+        """
+        Store a new optimized document and return its id
+        """
+        resume = OptimizedResume(owner_id=owner_id, draft_id=draft_id,
+                                 content_hash=content_hash(document), document=document, version=1)
+        db.session.add(resume)
+        db.session.commit()
+        return resume.id
+
+    def get(self, resume_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Return (document, version), or None if unknown
+        """
+        resume = db.session.get(OptimizedResume, resume_id)
+        return (resume.document, resume.version) if resume is not None else None
+
+    def replace(self, resume_id: str, document: Dict[str, Any], expected_version: int) -> Optional[int]:
+        """
+        Compare-and-swap update. Returns the new version, or None if the
+        stored version no longer matches (a concurrent edit won).
+        """
+        version = expected_version + 1
+        result = db.session.execute(
+            update(OptimizedResume)
+            .where(OptimizedResume.id == resume_id, OptimizedResume.version == expected_version)
+            .values(document=document, content_hash=content_hash(document), version=version,
+                    updated_at=db.func.now())
+        )
+        db.session.commit()
+        return version if result.rowcount == 1 else None
+
+    def list_for_owner(self, owner_id: int, limit: int = 50) -> List[OptimizedResume]:
+        """
+        An owner's optimized resumes, newest first (served by the owner/created_at index)
+        """
+        return (OptimizedResume.query
+                .filter_by(owner_id=owner_id)
+                .order_by(OptimizedResume.created_at.desc(), OptimizedResume.id.desc())
+                .limit(limit)
+                .all())
+
+    def record_latex(self, tex_string: str, source_document: Optional[Dict[str, Any]] = None,
+                     template_name: Optional[str] = None) -> Optional[str]:
+        """
+        Remember LaTeX rendered from a stored resume under its hash, in
+        the background. Returns the hash, or None if it is too large to keep.
+        """
+        tex_bytes = tex_string.encode('utf-8')
+        if len(tex_bytes) > RENDERED_LATEX_MAX_BYTES:
+            return None
+        latex_id = hashlib.sha256(tex_bytes).hexdigest()
+        source_hash = content_hash(source_document) if source_document is not None else None
+        self._in_background(self._write_latex, latex_id, tex_string, source_hash, template_name)
+        return latex_id
+
+    def get_latex(self, latex_id: str) -> Optional[str]:
+        latex = db.session.get(RenderedLatex, latex_id)
+        return latex.tex if latex is not None else None
+
+    def record_pdf(self, pdf_hash: str, tex_string: str, engine: str, size: Optional[int] = None):
+        """
+        Link a compiled PDF to the LaTeX it was compiled from, in the background
+        """
+        tex_bytes = tex_string.encode('utf-8')
+        if len(tex_bytes) > RENDERED_LATEX_MAX_BYTES:
+            return
+        latex_id = hashlib.sha256(tex_bytes).hexdigest()
+        self._in_background(self._write_pdf, pdf_hash, latex_id, tex_string, engine, size)
+
+    def get_pdf_latex_id(self, pdf_hash: str) -> Optional[str]:
+        """
+        Hash of the LaTeX a stored PDF was compiled from, or None
+        """
+        pdf = db.session.get(PdfArtifact, pdf_hash)
+        return pdf.latex_id if pdf is not None else None
+
+    def prune(self, retention_days: int = RENDERED_LATEX_RETENTION_DAYS) -> int:
+        """
+        Delete LaTeX recorded more than `retention_days` ago along with the
+        PDF rows compiled from it. Returns the number of LaTeX rows deleted.
+        """
+        if retention_days <= 0:
+            return 0
+        # created_at comes from SQLite's CURRENT_TIMESTAMP, which is naive UTC
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=retention_days)
+        expired = select(RenderedLatex.id).where(RenderedLatex.created_at < cutoff)
+        db.session.execute(delete(PdfArtifact).where(PdfArtifact.latex_id.in_(expired)))
+        result = db.session.execute(delete(RenderedLatex).where(RenderedLatex.created_at < cutoff))
+        db.session.commit()
+        return result.rowcount
+
+    def _in_background(self, fn, *args):
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    fn(*args)
+                    with self._lock:
+                        self._recorded += 1
+                        due = self._recorded % PRUNE_EVERY == 1
+                    if due:
+                        self.prune()
+                except Exception:
+                    # Bookkeeping only; the response has already gone out
+                    db.session.rollback()
+
+        self._writer.submit(run)
+
+    def _write_latex(self, latex_id: str, tex_string: str, source_hash: Optional[str] = None,
+                     template_name: Optional[str] = None):
+        if db.session.get(RenderedLatex, latex_id) is None:
+            self._insert(RenderedLatex(id=latex_id, source_hash=source_hash,
+                                       template_name=template_name, tex=tex_string))
+
+    def _write_pdf(self, pdf_hash: str, latex_id: str, tex_string: str, engine: str, size: Optional[int]):
+        self._write_latex(latex_id, tex_string)
+        if db.session.get(PdfArtifact, pdf_hash) is None:
+            self._insert(PdfArtifact(id=pdf_hash, latex_id=latex_id, engine=engine, size=size))
+
+    def _insert(self, row):
+        # Content-addressed rows: losing a race to an identical insert is fine
+        db.session.add(row)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
+
+# Shared by all requests in this process
+resume_store = ResumeStore()
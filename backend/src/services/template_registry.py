@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Placeholders look like {{NAME}}; anything else is literal LaTeX
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+TEMPLATE_EXTENSION = '.tex'
+
+
+class TemplateNotFound(LookupError):
+    """
+    Raised when no template with the requested name exists
+    """
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal segments and placeholder slots,
+    so rendering is a single join instead of one replace pass per placeholder
+    """
+
+    def __init__(self, name: str, source: str, mtime: float = 0.0):
+        self.name = name
+        self.source = source
+        self.mtime = mtime
+        self.digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        self._segments: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self._segments.append(source[position:match.start()])
+            self._slots.append((len(self._segments), match.group(1)))
+            self._segments.append(match.group(0))
+            position = match.end()
+        self._segments.append(source[position:])
+
+    @property
+    def placeholders(self) -> List[str]:
+        return [name for _, name in self._slots]
+
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Fill placeholders; unknown placeholders are left as-is
+        """
+        parts = list(self._segments)
+        for index, name in self._slots:
+            if name in values:
+                parts[index] = values[name]
+        return ''.join(parts)
+
+
+class TemplateRegistry:
+    """
+    Loads and precompiles every template in a directory at startup.
+    Files are re-checked by mtime at most every `check_interval` seconds,
+    so edited or newly added templates are picked up without a restart.
+    """
+
+    def __init__(self, directory: str, check_interval: float = 2.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.load_all()
+
+    def _path_for(self, name: str) -> str:
+        return os.path.join(self.directory, name + TEMPLATE_EXTENSION)
+
+    def _load(self, name: str) -> Optional[CompiledTemplate]:
+        path = self._path_for(name)
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+        except OSError:
+            return None
+        return CompiledTemplate(name, source, mtime)
+
+    def load_all(self):
+        """
+        Compile every template in the directory
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(TEMPLATE_EXTENSION):
+                name = filename[:-len(TEMPLATE_EXTENSION)]
+                template = self._load(name)
+                if template is not None:
+                    with self._lock:
+                        self._templates[name] = template
+                        self._checked_at[name] = time.monotonic()
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._templates)
+
+    def get(self, name: str) -> CompiledTemplate:
+        """
+        Return the compiled template, reloading it if the file changed
+        """
+        # Names map straight to files, so refuse anything path-like
+        if not name or os.path.basename(name) != name or name.startswith('.'):
+            raise TemplateNotFound(name)
+
+        now = time.monotonic()
+        with self._lock:
+            template = self._templates.get(name)
+            if template is not None and now - self._checked_at[name] < self.check_interval:
+                return template
+
+        try:
+            mtime = os.stat(self._path_for(name)).st_mtime
+        except OSError:
+            with self._lock:
+                self._templates.pop(name, None)
+                self._checked_at.pop(name, None)
+            raise TemplateNotFound(name)
+
+        if template is None or mtime != template.mtime:
+            template = self._load(name)
+            if template is None:
+                raise TemplateNotFound(name)
+
+        with self._lock:
+            self._templates[name] = template
+            self._checked_at[name] = now
+        return template
+
+
+# Shared registry; templates live next to the services package by default
+template_registry = TemplateRegistry(
+    os.getenv('LATEX_TEMPLATE_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'latex_templates')),
+    float(os.getenv('LATEX_TEMPLATE_RELOAD_INTERVAL', 2))
+)
@@ -0,0 +1,219 @@
+import gzip
+import itertools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+try:
+    from pdf2image import convert_from_path, pdfinfo_from_path
+    from pdf2image.exceptions import PDFInfoNotInstalledError
+except ImportError:  # optional; thumbnail endpoints then answer 503
+    convert_from_path = pdfinfo_from_path = None
+    PDFInfoNotInstalledError = OSError
+
+THUMBNAIL_CACHE_DIR = os.getenv('THUMBNAIL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'resume-thumbnails'))
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', 2))
+THUMBNAIL_TIMEOUT = float(os.getenv('THUMBNAIL_TIMEOUT', 30))
+THUMBNAIL_DEFAULT_DPI = int(os.getenv('THUMBNAIL_DEFAULT_DPI', 72))
+THUMBNAIL_MAX_DPI = int(os.getenv('THUMBNAIL_MAX_DPI', 200))
+# PDFs whose thumbnails are kept on disk; the least recently rendered go first
+THUMBNAIL_CACHE_MAX_PDFS = int(os.getenv('THUMBNAIL_CACHE_MAX_PDFS', 256))
+
+MIN_DPI = 24
+
+# Output format -> (Pillow format name, mimetype)
+THUMBNAIL_FORMATS = {
+    'png': ('PNG', 'image/png'),
+    'webp': ('WEBP', 'image/webp'),
+}
+
+
+class ThumbnailUnavailable(RuntimeError):
+    """
+    Raised when pdf2image or poppler is not installed
+    """
+
+
+class ThumbnailRenderer:
+    """
+    Rasterizes pages of compile-cache PDFs to PNG or WebP. Images are
+    cached on disk by PDF key, page, DPI and format, and rendered by a
+    fixed pool of workers pulling from a priority queue ordered by page
+    number, so page 1 of every PDF is rendered before any later page.
+    Concurrent requests for the same image share one render.
+    """
+
+    def __init__(self, directory: str = THUMBNAIL_CACHE_DIR, workers: int = THUMBNAIL_WORKERS,
+                 timeout: float = THUMBNAIL_TIMEOUT, max_pdfs: int = THUMBNAIL_CACHE_MAX_PDFS):
+        self.directory = directory
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_pdfs = max_pdfs
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._pending: Dict[str, Future] = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'renders': 0, 'failures': 0}
+
+    @staticmethod
+    def available() -> bool:
+        return convert_from_path is not None
+
+    @staticmethod
+    def normalize_dpi(dpi: Optional[int]) -> int:
+        if dpi is None:
+            return THUMBNAIL_DEFAULT_DPI
+        return max(MIN_DPI, min(THUMBNAIL_MAX_DPI, dpi))
+
+    def page_count(self, entry: Dict[str, Any]) -> int:
+        """
+        Number of pages in a compile-cache entry
+        """
+        self._require()
+        try:
+            with self._readable(entry) as path:
+                return int(pdfinfo_from_path(path, timeout=self.timeout)['Pages'])
+        except PDFInfoNotInstalledError as e:
+            raise ThumbnailUnavailable(f"poppler is not installed: {e}")
+
+    def path_for(self, key: str, page: int, dpi: int, fmt: str) -> str:
+        return os.path.join(self.directory, key, f'p{page}-{dpi}.{fmt}')
+
+    def submit(self, entry: Dict[str, Any], page: int, dpi: int, fmt: str) -> Future:
+        """
+        Future resolving to the image path; already rendered images resolve at once
+        """
+        path = self.path_for(entry['key'], page, dpi, fmt)
+        with self._lock:
+            if os.path.exists(path):
+                self._counters['hits'] += 1
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._pending.get(path)
+            if future is not None:
+                return future
+            future = Future()
+            self._pending[path] = future
+            self._start_workers()
+        self._queue.put((page, next(self._sequence), path, entry, dpi, fmt, future))
+        return future
+
+    def render(self, entry: Dict[str, Any], page: int, dpi: int, fmt: str) -> str:
+        """
+        Path of the rendered image, waiting for a worker if needed
+        """
+        self._require()
+        return self.submit(entry, page, dpi, fmt).result(timeout=self.timeout * 2)
+
+    def _require(self):
+        if not self.available():
+            raise ThumbnailUnavailable("pdf2image is not installed")
+
+    def _start_workers(self):
+        # Called with the lock held; threads start on first use
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'thumbnail-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            page, _, path, entry, dpi, fmt, future = self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        self._render(path, entry, page, dpi, fmt)
+                        with self._lock:
+                            self._counters['renders'] += 1
+                        future.set_result(path)
+                    except PDFInfoNotInstalledError as e:
+                        future.set_exception(ThumbnailUnavailable(f"poppler is not installed: {e}"))
+                    except Exception as e:
+                        with self._lock:
+                            self._counters['failures'] += 1
+                        future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending.pop(path, None)
+                self._queue.task_done()
+
+    def _render(self, path: str, entry: Dict[str, Any], page: int, dpi: int, fmt: str):
+        """
+        Rasterize one page and publish it atomically
+        """
+        pdf_dir = os.path.dirname(path)
+        new_pdf = not os.path.isdir(pdf_dir)
+        os.makedirs(pdf_dir, exist_ok=True)
+        with self._readable(entry) as source:
+            images = convert_from_path(source, dpi=dpi, first_page=page, last_page=page,
+                                       thread_count=1, timeout=self.timeout)
+        if not images:
+            raise ValueError(f"PDF has no page {page}")
+
+        fd, tmp_path = tempfile.mkstemp(dir=pdf_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                images[0].save(f, format=THUMBNAIL_FORMATS[fmt][0])
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        os.utime(pdf_dir)
+        if new_pdf:
+            self._evict()
+
+    @contextmanager
+    def _readable(self, entry: Dict[str, Any]) -> Iterator[str]:
+        """
+        Plain PDF path for poppler; gzipped cache entries are inflated
+        into a temporary file for the duration of the block
+        """
+        if not entry['compressed']:
+            yield entry['path']
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix='.pdf')
+        try:
+            with gzip.open(entry['path'], 'rb') as source, os.fdopen(fd, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            yield tmp_path
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        """
+        Drop the thumbnails of the least recently rendered PDFs past the cap
+        """
+        try:
+            pdf_dirs = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+            pdf_dirs = sorted((d for d in pdf_dirs if os.path.isdir(d)), key=os.path.getmtime)
+        except OSError:
+            return
+        for pdf_dir in pdf_dirs[:max(0, len(pdf_dirs) - self.max_pdfs)]:
+            shutil.rmtree(pdf_dir, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'available': self.available(),
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'pending': len(self._pending),
+                **self._counters
+            }
+
+
+# Shared so the worker pool and in-flight renders are per process
+thumbnail_renderer = ThumbnailRenderer()
@@ -0,0 +1,217 @@
+import copy
+from typing import Dict, Any, List, Tuple, Union
+
+Token = Union[str, int]
+
+
+class JsonPatchError(ValueError):
+    """
+    Raised for malformed operations or pointers that do not resolve
+    """
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """
+    Raised when a `test` operation does not match
+    """
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Split an RFC 6901 JSON pointer into unescaped reference tokens
+    """
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f"JSON pointer must start with '/': {pointer}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """
+    JSON equality: unlike Python ==, booleans never equal numbers
+    """
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+class _PatchApplier:
+    """
+    Applies operations with path copying: only the containers on the path
+    to each edit are shallow-copied, so the input document is never
+    mutated and the cost scales with the edit, not the document.
+
+    Every edit is recorded in `touched` as ('value', path) for a subtree
+    that must be re-validated, or ('container', path) for a parent whose
+    own constraints (required keys, item counts) may have changed. Paths
+    are kept in final-document coordinates as array elements shift.
+    """
+
+    def __init__(self, document: Any):
+        self.root = document
+        self._owned: Dict[int, Any] = {}
+        self.touched: List[Tuple[str, List[Token]]] = []
+
+    def _clone(self, container: Any) -> Any:
+        clone = dict(container) if isinstance(container, dict) else list(container)
+        self._owned[id(clone)] = clone
+        return clone
+
+    def _array_index(self, array: list, token: str, pointer: str, allow_end: bool) -> int:
+        if allow_end and token == '-':
+            return len(array)
+        if not token.isdigit() or (token != '0' and token.startswith('0')):
+            raise JsonPatchError(f"Invalid array index '{token}' in {pointer}")
+        index = int(token)
+        limit = len(array) if allow_end else len(array) - 1
+        if index > limit:
+            raise JsonPatchError(f"Array index out of range in {pointer}")
+        return index
+
+    def _child_key(self, node: Any, token: str, pointer: str, allow_end: bool = False) -> Token:
+        if isinstance(node, dict):
+            return token
+        if isinstance(node, list):
+            return self._array_index(node, token, pointer, allow_end)
+        raise JsonPatchError(f"Path does not resolve: {pointer}")
+
+    def get(self, pointer: str) -> Any:
+        node = self.root
+        for token in parse_pointer(pointer):
+            key = self._child_key(node, token, pointer)
+            if isinstance(node, dict) and key not in node:
+                raise JsonPatchError(f"Path does not exist: {pointer}")
+            node = node[key]
+        return node
+
+    def _writable_parent(self, tokens: List[str], pointer: str) -> Tuple[Any, List[Token]]:
+        """
+        Copy containers down to the parent of the target, returning it with
+        its resolved path
+        """
+        if id(self.root) not in self._owned:
+            self.root = self._clone(self.root)
+        node, resolved = self.root, []
+        for token in tokens[:-1]:
+            key = self._child_key(node, token, pointer)
+            if isinstance(node, dict) and key not in node:
+                raise JsonPatchError(f"Path does not exist: {pointer}")
+            child = node[key]
+            if not isinstance(child, (dict, list)):
+                raise JsonPatchError(f"Path does not resolve: {pointer}")
+            if id(child) not in self._owned:
+                child = self._clone(child)
+                node[key] = child
+            node = child
+            resolved.append(key)
+        return node, resolved
+
+    def _shift(self, array_path: List[Token], index: int, delta: int):
+        """
+        Keep recorded paths under an array pointing at the same elements
+        after an insert (delta=1) or removal (delta=-1) at `index`
+        """
+        depth = len(array_path)
+        kept = []
+        for kind, path in self.touched:
+            if len(path) > depth and path[:depth] == array_path:
+                position = path[depth]
+                if delta < 0 and position == index:
+                    continue
+                if position > index or (delta > 0 and position == index):
+                    path = path[:depth] + [position + delta] + path[depth + 1:]
+            kept.append((kind, path))
+        self.touched = kept
+
+    def add(self, pointer: str, value: Any):
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            self.root = value
+            self.touched.append(('value', []))
+            return
+        parent, parent_path = self._writable_parent(tokens, pointer)
+        key = self._child_key(parent, tokens[-1], pointer, allow_end=True)
+        if isinstance(parent, list):
+            self._shift(parent_path, key, 1)
+            parent.insert(key, value)
+        else:
+            parent[key] = value
+        self.touched.append(('value', parent_path + [key]))
+        self.touched.append(('container', parent_path))
+
+    def remove(self, pointer: str) -> Any:
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            raise JsonPatchError("Cannot remove the document root")
+        parent, parent_path = self._writable_parent(tokens, pointer)
+        key = self._child_key(parent, tokens[-1], pointer)
+        if isinstance(parent, dict) and key not in parent:
+            raise JsonPatchError(f"Path does not exist: {pointer}")
+        value = parent.pop(key)
+        if isinstance(parent, list):
+            self._shift(parent_path, key, -1)
+        self.touched.append(('container', parent_path))
+        return value
+
+    def replace(self, pointer: str, value: Any):
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            self.root = value
+            self.touched.append(('value', []))
+            return
+        parent, parent_path = self._writable_parent(tokens, pointer)
+        key = self._child_key(parent, tokens[-1], pointer)
+        if isinstance(parent, dict) and key not in parent:
+            raise JsonPatchError(f"Path does not exist: {pointer}")
+        parent[key] = value
+        self.touched.append(('value', parent_path + [key]))
+
+    def apply(self, operation: Dict[str, Any]):
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise JsonPatchError(f"Invalid patch operation: {operation!r}")
+        op, path = operation['op'], operation['path']
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JsonPatchError(f"'{op}' operation requires a value")
+        if op in ('move', 'copy') and 'from' not in operation:
+            raise JsonPatchError(f"'{op}' operation requires 'from'")
+
+        if op == 'add':
+            self.add(path, operation['value'])
+        elif op == 'remove':
+            self.remove(path)
+        elif op == 'replace':
+            self.replace(path, operation['value'])
+        elif op == 'move':
+            source = operation['from']
+            if path.startswith(source + '/'):
+                raise JsonPatchError(f"Cannot move {source} into one of its children")
+            if path != source:
+                self.add(path, self.remove(source))
+        elif op == 'copy':
+            self.add(path, copy.deepcopy(self.get(operation['from'])))
+        elif op == 'test':
+            if not _json_equal(self.get(path), operation['value']):
+                raise JsonPatchTestFailed(f"Test failed at {path}")
+        else:
+            raise JsonPatchError(f"Unknown patch operation: {op}")
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Tuple[Any, List[Tuple[str, List[Token]]]]:
+    """
+    Apply RFC 6902 operations atomically without mutating `document`.
+    Returns the patched document and the touched paths to re-validate.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+    applier = _PatchApplier(document)
+    for operation in operations:
+        applier.apply(operation)
+    return applier.root, applier.touched
@@ -0,0 +1,126 @@
+import re
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+# LaTeX special characters in user text
+LATEX_SPECIALS: Dict[str, str] = {
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+}
+
+# Unicode punctuation and spacing normalized to LaTeX-safe sequences
+UNICODE_NORMALIZATION: Dict[str, str] = {
+    '\u201c': '``',              # left double quotation mark
+    '\u201d': "''",              # right double quotation mark
+    '\u201e': ',,',              # double low-9 quotation mark
+    '\u2018': '`',               # left single quotation mark
+    '\u2019': "'",               # right single quotation mark
+    '\u201a': ',',               # single low-9 quotation mark
+    '\u2014': '---',             # em dash
+    '\u2013': '--',              # en dash
+    '\u2012': '--',              # figure dash
+    '\u2010': '-',               # hyphen
+    '\u2011': '-',               # non-breaking hyphen
+    '\u2212': '-',               # minus sign
+    '\u2026': r'\ldots{}',       # horizontal ellipsis
+    '\u2022': r'\textbullet{}',  # bullet
+    '\u00a0': '~',               # no-break space
+    '\u2009': r'\,',             # thin space
+    '\u202f': r'\,',             # narrow no-break space
+    '\u00ad': '',                # soft hyphen
+    '\u200b': '',                # zero width space
+    '\u200c': '',                # zero width non-joiner
+    '\u200d': '',                # zero width joiner
+    '\ufeff': '',                # byte order mark
+}
+
+ESCAPE_MAP: Dict[str, str] = {**LATEX_SPECIALS, **UNICODE_NORMALIZATION}
+
+# One character class covering every mapped character. Splitting on a
+# capturing group yields [text, special, text, special, ...], so a single
+# scan finds everything and only the odd slots need a lookup.
+_ESCAPE_SPLIT = re.compile('([' + re.escape(''.join(ESCAPE_MAP)) + '])')
+
+# Joins fields for batch escaping; never produced by the escape map
+_FIELD_SEPARATOR = '\x1e'
+
+# Fields holding URLs get URL escaping at render time, not text escaping
+URL_FIELDS = frozenset({'url', 'link'})
+
+
+def escape_latex(text: Any) -> str:
+    """
+    Escape LaTeX specials and normalize Unicode punctuation in one pass
+    """
+    if not text:
+        return ""
+    text = str(text)
+    parts = _ESCAPE_SPLIT.split(text)
+    if len(parts) == 1:
+        return text
+    parts[1::2] = map(ESCAPE_MAP.__getitem__, parts[1::2])
+    return ''.join(parts)
+
+
+def escape_latex_many(texts: Iterable[Any]) -> List[str]:
+    """
+    Escape many fields with a single regex pass over their concatenation
+    """
+    fields = ["" if not text else str(text) for text in texts]
+    joined = _FIELD_SEPARATOR.join(fields)
+    if joined.count(_FIELD_SEPARATOR) != max(len(fields) - 1, 0):
+        # A field contains the separator itself; escape one by one
+        return [escape_latex(field) for field in fields]
+    escaped = escape_latex(joined)
+    return escaped.split(_FIELD_SEPARATOR) if fields else []
+
+
+class _Leaf:
+    """
+    Placeholder for a string leaf while the batch is escaped
+    """
+    __slots__ = ('index',)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+def escape_resume_fields(data: Any, skip_keys: Optional[Set[str]] = None) -> Any:
+    """
+    Return a copy of a resume (or any JSON subtree) with every string
+    leaf escaped, using one batch pass. Keys in `skip_keys` (URL fields
+    by default) are copied unescaped.
+    """
+    skip_keys = URL_FIELDS if skip_keys is None else skip_keys
+    leaves: List[str] = []
+
+    def collect(node: Any, key: Optional[str] = None) -> Any:
+        if isinstance(node, dict):
+            return {k: collect(v, k) for k, v in node.items()}
+        if isinstance(node, list):
+            return [collect(item, key) for item in node]
+        if isinstance(node, str) and key not in skip_keys:
+            leaves.append(node)
+            return _Leaf(len(leaves) - 1)
+        return node
+
+    skeleton = collect(data)
+    escaped = escape_latex_many(leaves)
+
+    def fill(node: Any) -> Any:
+        if isinstance(node, _Leaf):
+            return escaped[node.index]
+        if isinstance(node, dict):
+            return {k: fill(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [fill(item) for item in node]
+        return node
+
+    return fill(skeleton)
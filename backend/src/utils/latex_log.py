@@ -0,0 +1,111 @@
+import re
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional
+
+# (substring, label) pairs; the first match classifies a warning line
+WARNING_PATTERNS = (
+    ('LaTeX Font Warning', 'Font Warning: '),
+    ('Overfull \\hbox', 'Layout Warning: '),
+    ('Token not allowed in a PDF string', 'PDF String Warning: '),
+    ('Package hyperref Warning', 'Hyperref Warning: '),
+)
+
+# TeX shows where an error happened as "l.<line> <source text>"
+ERROR_LOCATION = re.compile(r'^l\.(\d+)\s?(.*)$')
+# -file-line-error style, also what Tectonic prints: "resume.tex:42: message"
+FILE_LINE_ERROR = re.compile(r'^(?:error: )?\S+\.tex:(\d+): (.*)$')
+# Page count, from an injected probe (works in -draftmode) or pdfTeX's summary
+PAGE_COUNT = re.compile(r'^RRPAGES:(\d+)|^Output written on .*\((\d+) pages?')
+
+MAX_ERRORS = 10
+TAIL_CHARS = 2000
+
+
+class LogScanner:
+    """
+    Single pass over an engine log, one line at a time. Keeps only the
+    parsed errors (with source line numbers), classified warnings and a
+    bounded tail, so the log never has to be held in memory whole.
+    """
+
+    def __init__(self, max_errors: int = MAX_ERRORS, tail_chars: int = TAIL_CHARS):
+        self.max_errors = max_errors
+        self.tail_chars = tail_chars
+        self.errors: List[Dict[str, Any]] = []
+        self.warnings: List[str] = []
+        self._tail = deque()
+        self._tail_size = 0
+        self._open_error: Optional[Dict[str, Any]] = None
+        self.pages: Optional[int] = None
+
+    def feed(self, raw_line: str):
+        self._keep_tail(raw_line)
+        line = raw_line.strip()
+        if not line:
+            return
+
+        if line[0] in 'RO':
+            match = PAGE_COUNT.match(line)
+            if match:
+                self.pages = int(match.group(1) or match.group(2))
+                return
+
+        if line.startswith('!'):
+            self._add_error({'message': line[1:].strip(), 'line': None, 'context': None}, open_error=True)
+            return
+
+        match = FILE_LINE_ERROR.match(line)
+        if match:
+            self._add_error({'message': match.group(2), 'line': int(match.group(1)), 'context': None})
+            return
+
+        if self._open_error is not None:
+            match = ERROR_LOCATION.match(line)
+            if match:
+                self._open_error['line'] = int(match.group(1))
+                self._open_error['context'] = match.group(2) or None
+                self._open_error = None
+                return
+
+        for pattern, label in WARNING_PATTERNS:
+            if pattern in line:
+                self.warnings.append(label + line)
+                return
+        if line.startswith('Warning:'):
+            self.warnings.append(line)
+
+    def feed_lines(self, lines: Iterable[str]) -> 'LogScanner':
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def _add_error(self, error: Dict[str, Any], open_error: bool = False):
+        if len(self.errors) >= self.max_errors:
+            self._open_error = None
+            return
+        self.errors.append(error)
+        self._open_error = error if open_error else None
+
+    def _keep_tail(self, raw_line: str):
+        if not raw_line.endswith('\n'):
+            raw_line += '\n'
+        self._tail.append(raw_line)
+        self._tail_size += len(raw_line)
+        while len(self._tail) > 1 and self._tail_size - len(self._tail[0]) >= self.tail_chars:
+            self._tail_size -= len(self._tail.popleft())
+
+    @property
+    def tail(self) -> str:
+        return ''.join(self._tail)[-self.tail_chars:]
+
+
+def scan_log_file(path: str, **kwargs) -> LogScanner:
+    """
+    Scan a log file without reading it into memory
+    """
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return LogScanner(**kwargs).feed_lines(f)
+
+
+def scan_log_text(text: str, **kwargs) -> LogScanner:
+    return LogScanner(**kwargs).feed_lines(text.splitlines())
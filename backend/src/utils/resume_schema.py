@@ -0,0 +1,204 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple, Union
+from jsonschema import Draft7Validator
+from src.utils.schema_codegen import compile_schema
+
+# Strict JSON schema for optimized resumes. Shared by the Gemini prompt
+# and by validation so the two can never drift apart.
+RESUME_SCHEMA: Dict[str, Any] = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "ResumeOptimizedSchema",
+    "type": "object",
+    "required": ["meta", "contact", "summary", "experience", "skills"],
+    "properties": {
+        "meta": {
+            "type": "object",
+            "required": ["region", "seniority", "tone", "atsKeywords"],
+            "properties": {
+                "region": {"type": "string", "enum": ["US", "UK", "EU", "Other"]},
+                "seniority": {"type": "string", "enum": ["entry", "mid", "senior", "exec"]},
+                "tone": {"type": "string", "enum": ["concise", "standard", "detailed"]},
+                "atsKeywords": {"type": "array", "items": {"type": "string"}}
+            }
+        },
+        "contact": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {
+                "name": {"type": "string"},
+                "title": {"type": "string"},
+                "email": {"type": "string"},
+                "phone": {"type": "string"},
+                "location": {"type": "string"},
+                "links": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["label", "url"],
+                        "properties": {
+                            "label": {"type": "string"},
+                            "url": {"type": "string"}
+                        }
+                    }
+                }
+            }
+        },
+        "summary": {"type": "string"},
+        "experience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["company", "role", "startDate"],
+                "properties": {
+                    "company": {"type": "string"},
+                    "role": {"type": "string"},
+                    "location": {"type": "string"},
+                    "startDate": {"type": "string"},
+                    "endDate": {"type": ["string", "null"]},
+                    "bullets": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": ["text"],
+                            "properties": {
+                                "text": {"type": "string"},
+                                "skills": {"type": "array", "items": {"type": "string"}},
+                                "metric": {"type": "string"}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        "projects": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "link": {"type": "string"},
+                    "description": {"type": "string"},
+                    "bullets": {"type": "array", "items": {"type": "string"}}
+                }
+            }
+        },
+        "education": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["institution", "degree"],
+                "properties": {
+                    "institution": {"type": "string"},
+                    "degree": {"type": "string"},
+                    "location": {"type": "string"},
+                    "startDate": {"type": "string"},
+                    "endDate": {"type": "string"},
+                    "gpa": {"type": "string"}
+                }
+            }
+        },
+        "skills": {
+            "type": "object",
+            "properties": {
+                "languages": {"type": "array", "items": {"type": "string"}},
+                "frameworks": {"type": "array", "items": {"type": "string"}},
+                "tools": {"type": "array", "items": {"type": "string"}},
+                "other": {"type": "array", "items": {"type": "string"}}
+            }
+        },
+        "certifications": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "issuer": {"type": "string"},
+                    "year": {"type": "string"}
+                }
+            }
+        },
+        "awards": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "issuer": {"type": "string"},
+                    "year": {"type": "string"}
+                }
+            }
+        },
+        "publications": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "venue": {"type": "string"},
+                    "year": {"type": "string"},
+                    "link": {"type": "string"}
+                }
+            }
+        },
+        "extras": {"type": "string"}
+    }
+}
+
+# Checked and compiled once at import; validators are safe to share across threads
+Draft7Validator.check_schema(RESUME_SCHEMA)
+RESUME_VALIDATOR = Draft7Validator(RESUME_SCHEMA)
+
+_fast_validator: Optional[Callable[[Any], bool]] = None
+
+def is_valid_resume(data: Any) -> bool:
+    """
+    Fast yes/no check using a validator generated from RESUME_SCHEMA on first use.
+    RESUME_VALIDATOR stays the reference and is used for error reporting.
+    """
+    global _fast_validator
+    if _fast_validator is None:
+        try:
+            _fast_validator = compile_schema(RESUME_SCHEMA)
+        except NotImplementedError:
+            _fast_validator = RESUME_VALIDATOR.is_valid
+    return _fast_validator(data)
+
+
+# Stand-in for locations the schema does not constrain
+_ANY_SCHEMA: Dict[str, Any] = {}
+
+_subschema_validators: Dict[Tuple[int, bool], Tuple[Callable[[Any], bool], Draft7Validator]] = {}
+
+def resolve_subschema(path: List[Union[str, int]]) -> Any:
+    """
+    Sub-schema governing the value at `path` (ints are array indices)
+    """
+    schema = RESUME_SCHEMA
+    for token in path:
+        if not isinstance(schema, dict):
+            return schema
+        if isinstance(token, int):
+            schema = schema.get('items', _ANY_SCHEMA)
+        else:
+            schema = schema.get('properties', {}).get(token, _ANY_SCHEMA)
+    return schema
+
+def subschema_validators(path: List[Union[str, int]], shallow: bool = False) -> Tuple[Callable[[Any], bool], Draft7Validator]:
+    """
+    (fast is_valid, reference validator) for the sub-schema at `path`.
+    A shallow validator checks only the node itself (type, required keys),
+    not its children. Compiled once per schema node.
+    """
+    schema = resolve_subschema(path)
+    key = (id(schema), shallow)
+    cached = _subschema_validators.get(key)
+    if cached is None:
+        if shallow and isinstance(schema, dict):
+            schema = {k: v for k, v in schema.items() if k not in ('properties', 'items')}
+        validator = Draft7Validator(schema)
+        try:
+            fast = compile_schema(schema)
+        except NotImplementedError:
+            fast = validator.is_valid
+        cached = _subschema_validators[key] = (fast, validator)
+    return cached
@@ -0,0 +1,159 @@
+from typing import Dict, Any, Callable, List, Optional
+
+# Keywords that carry no validation semantics
+_ANNOTATION_KEYWORDS = {'$schema', '$id', '$comment', 'title', 'description', 'default', 'examples'}
+
+# Keywords the generator knows how to emit; anything else is rejected
+_SUPPORTED_KEYWORDS = {'type', 'required', 'properties', 'items', 'enum'}
+
+# Draft 7 type semantics, matching jsonschema's default type checker
+_TYPE_CHECKS = {
+    'string': 'isinstance({v}, str)',
+    'object': 'isinstance({v}, dict)',
+    'array': 'isinstance({v}, list)',
+    'null': '{v} is None',
+    'boolean': 'isinstance({v}, bool)',
+    'integer': '((isinstance({v}, int) and not isinstance({v}, bool))'
+               ' or (isinstance({v}, float) and {v}.is_integer()))',
+    'number': '(isinstance({v}, (int, float)) and not isinstance({v}, bool))',
+}
+
+
+class _ValidatorGenerator:
+    """
+    Emits one plain-Python predicate per schema node.
+    Leaf nodes (type/enum only) are inlined into their parent.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self._counter = 0
+
+    def _next_name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _constant(self, value: Any) -> str:
+        name = self._next_name('_c')
+        self.constants[name] = value
+        return name
+
+    def _check_keywords(self, schema: Dict[str, Any]):
+        for keyword in schema:
+            if keyword not in _SUPPORTED_KEYWORDS and keyword not in _ANNOTATION_KEYWORDS:
+                raise NotImplementedError(f"Unsupported schema keyword: {keyword}")
+
+    def _type_expr(self, schema: Dict[str, Any], var: str) -> Optional[str]:
+        types = schema.get('type')
+        if types is None:
+            return None
+        if isinstance(types, str):
+            types = [types]
+        for name in types:
+            if name not in _TYPE_CHECKS:
+                raise NotImplementedError(f"Unsupported schema type: {name}")
+        return ' or '.join(_TYPE_CHECKS[name].format(v=var) for name in types)
+
+    def _enum_expr(self, schema: Dict[str, Any], var: str) -> Optional[str]:
+        if 'enum' not in schema:
+            return None
+        values = schema['enum']
+        # Set membership only matches jsonschema equality for strings and null
+        if not all(value is None or isinstance(value, str) for value in values):
+            raise NotImplementedError("Only string/null enums are supported")
+        # Guard keeps unhashable instances away from the set lookup
+        return f"({var} is None or isinstance({var}, str)) and {var} in {self._constant(frozenset(values))}"
+
+    def _is_leaf(self, schema: Any) -> bool:
+        return isinstance(schema, dict) and not ({'required', 'properties', 'items'} & schema.keys())
+
+    def _leaf_expr(self, schema: Dict[str, Any], var: str) -> Optional[str]:
+        self._check_keywords(schema)
+        parts = [expr for expr in (self._type_expr(schema, var), self._enum_expr(schema, var)) if expr]
+        if not parts:
+            return None
+        return ' and '.join(f"({expr})" for expr in parts)
+
+    def expr_for(self, schema: Any, var: str) -> Optional[str]:
+        """
+        Boolean expression validating `var` against `schema` (None means always valid)
+        """
+        if schema is True or schema == {}:
+            return None
+        if schema is False:
+            return 'False'
+        if not isinstance(schema, dict):
+            raise NotImplementedError("Schemas must be objects or booleans")
+        if self._is_leaf(schema):
+            return self._leaf_expr(schema, var)
+        return f"{self.function_for(schema)}({var})"
+
+    def function_for(self, schema: Dict[str, Any]) -> str:
+        self._check_keywords(schema)
+        name = self._next_name('_v')
+        body: List[str] = []
+
+        leaf = self._leaf_expr({k: v for k, v in schema.items() if k in ('type', 'enum')}, 'x')
+        if leaf:
+            body.append(f"if not ({leaf}): return False")
+
+        types = schema.get('type')
+        types = [types] if isinstance(types, str) else types
+
+        object_checks: List[str] = []
+        required = schema.get('required', [])
+        if required:
+            missing = ' or '.join(f"{key!r} not in x" for key in required)
+            object_checks.append(f"if {missing}: return False")
+        for key, subschema in schema.get('properties', {}).items():
+            expr = self.expr_for(subschema, f"x[{key!r}]")
+            if expr:
+                object_checks.append(f"if {key!r} in x and not ({expr}): return False")
+        if object_checks:
+            if types == ['object']:
+                body.extend(object_checks)
+            else:
+                body.append("if isinstance(x, dict):")
+                body.extend('    ' + line for line in object_checks)
+
+        if 'items' in schema:
+            if not isinstance(schema['items'], (dict, bool)):
+                raise NotImplementedError("Tuple-style items are not supported")
+            expr = self.expr_for(schema['items'], 'item')
+            if expr:
+                array_checks = [
+                    "for item in x:",
+                    f"    if not ({expr}): return False",
+                ]
+                if types == ['array']:
+                    body.extend(array_checks)
+                else:
+                    body.append("if isinstance(x, list):")
+                    body.extend('    ' + line for line in array_checks)
+
+        body.append("return True")
+        self.lines.append(f"def {name}(x):")
+        self.lines.extend('    ' + line for line in body)
+        self.lines.append("")
+        return name
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], bool]:
+    """
+    Generate a plain-Python `is_valid` predicate for a Draft 7 schema.
+    Supports the subset of keywords our schemas use and raises
+    NotImplementedError otherwise, so callers can fall back to jsonschema.
+    The emitted source is kept on the function as `__source__`.
+    """
+    generator = _ValidatorGenerator()
+    expr = generator.expr_for(schema, 'x')
+    generator.lines.append("def is_valid(x):")
+    generator.lines.append(f"    return {expr or 'True'}")
+    source = '\n'.join(generator.lines) + '\n'
+
+    namespace: Dict[str, Any] = dict(generator.constants)
+    exec(compile(source, '<resume-schema-validator>', 'exec'), namespace)
+    is_valid = namespace['is_valid']
+    is_valid.__source__ = source
+    return is_valid
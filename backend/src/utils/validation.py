@@ -1,168 +1,98 @@
-import jsonschema
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable, Tuple, Union
+from jsonschema import Draft7Validator
+from src.utils.resume_schema import RESUME_VALIDATOR, is_valid_resume, subschema_validators
+
+def json_pointer(path: Iterable[Any]) -> str:
+    """
+    Build an RFC 6901 JSON pointer from a jsonschema error path
+    """
+    return ''.join('/' + str(token).replace('~', '~0').replace('/', '~1') for token in path)
+
+def collect_schema_errors(data: Any, validator: Draft7Validator = RESUME_VALIDATOR,
+                          base_pointer: str = '') -> List[Dict[str, str]]:
+    """
+    Collect every schema violation (not just the first) with its JSON pointer
+    """
+    return [
+        {
+            'path': base_pointer + json_pointer(error.absolute_path),
+            'message': error.message
+        }
+        for error in validator.iter_errors(data)
+    ]
 
 def validate_resume_schema(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate resume data against the strict JSON schema
     """
     
-    schema = {
-        "$schema": "http://json-schema.org/draft-07/schema#",
-        "title": "ResumeOptimizedSchema",
-        "type": "object",
-        "required": ["meta", "contact", "summary", "experience", "skills"],
-        "properties": {
-            "meta": {
-                "type": "object",
-                "required": ["region", "seniority", "tone", "atsKeywords"],
-                "properties": {
-                    "region": {"type": "string", "enum": ["US", "UK", "EU", "Other"]},
-                    "seniority": {"type": "string", "enum": ["entry", "mid", "senior", "exec"]},
-                    "tone": {"type": "string", "enum": ["concise", "standard", "detailed"]},
-                    "atsKeywords": {"type": "array", "items": {"type": "string"}}
-                }
-            },
-            "contact": {
-                "type": "object",
-                "required": ["name"],
-                "properties": {
-                    "name": {"type": "string"},
-                    "title": {"type": "string"},
-                    "email": {"type": "string"},
-                    "phone": {"type": "string"},
-                    "location": {"type": "string"},
-                    "links": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "required": ["label", "url"],
-                            "properties": {
-                                "label": {"type": "string"},
-                                "url": {"type": "string"}
-                            }
-                        }
-                    }
-                }
-            },
-            "summary": {"type": "string"},
-            "experience": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "required": ["company", "role", "startDate"],
-                    "properties": {
-                        "company": {"type": "string"},
-                        "role": {"type": "string"},
-                        "location": {"type": "string"},
-                        "startDate": {"type": "string"},
-                        "endDate": {"type": ["string", "null"]},
-                        "bullets": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "required": ["text"],
-                                "properties": {
-                                    "text": {"type": "string"},
-                                    "skills": {"type": "array", "items": {"type": "string"}},
-                                    "metric": {"type": "string"}
-                                }
-                            }
-                        }
-                    }
-                }
-            },
-            "projects": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "required": ["name"],
-                    "properties": {
-                        "name": {"type": "string"},
-                        "link": {"type": "string"},
-                        "description": {"type": "string"},
-                        "bullets": {"type": "array", "items": {"type": "string"}}
-                    }
-                }
-            },
-            "education": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "required": ["institution", "degree"],
-                    "properties": {
-                        "institution": {"type": "string"},
-                        "degree": {"type": "string"},
-                        "location": {"type": "string"},
-                        "startDate": {"type": "string"},
-                        "endDate": {"type": "string"},
-                        "gpa": {"type": "string"}
-                    }
-                }
-            },
-            "skills": {
-                "type": "object",
-                "properties": {
-                    "languages": {"type": "array", "items": {"type": "string"}},
-                    "frameworks": {"type": "array", "items": {"type": "string"}},
-                    "tools": {"type": "array", "items": {"type": "string"}},
-                    "other": {"type": "array", "items": {"type": "string"}}
-                }
-            },
-            "certifications": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "issuer": {"type": "string"},
-                        "year": {"type": "string"}
-                    }
-                }
-            },
-            "awards": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "issuer": {"type": "string"},
-                        "year": {"type": "string"}
-                    }
-                }
-            },
-            "publications": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "title": {"type": "string"},
-                        "venue": {"type": "string"},
-                        "year": {"type": "string"},
-                        "link": {"type": "string"}
-                    }
-                }
-            },
-            "extras": {"type": "string"}
-        }
-    }
-    
     try:
-        jsonschema.validate(data, schema)
-        return {
-            "valid": True,
-            "errors": [],
-            "warnings": []
-        }
-    except jsonschema.ValidationError as e:
+        # Generated fast path for the common valid case; jsonschema explains failures
+        if is_valid_resume(data):
+            return {
+                "valid": True,
+                "errors": [],
+                "warnings": []
+            }
+        
+        errors = collect_schema_errors(data)
         return {
-            "valid": False,
-            "errors": [str(e)],
+            "valid": not errors,
+            "errors": errors,
             "warnings": []
         }
     except Exception as e:
         return {
             "valid": False,
-            "errors": [f"Validation error: {str(e)}"],
+            "errors": [{"path": "", "message": f"Validation error: {str(e)}"}],
             "warnings": []
         }
 
+def _resolve_path(document: Any, path: Tuple[Union[str, int], ...]) -> Tuple[bool, Any]:
+    node = document
+    for token in path:
+        if isinstance(token, int):
+            if not isinstance(node, list) or token >= len(node):
+                return False, None
+        elif not isinstance(node, dict) or token not in node:
+            return False, None
+        node = node[token]
+    return True, node
+
+def validate_resume_subtrees(data: Dict[str, Any], touched: List[Tuple[str, List[Union[str, int]]]]) -> Dict[str, Any]:
+    """
+    Re-validate only the parts of a resume touched by an edit.
+    `touched` holds ('value', path) entries, whose whole subtree is checked,
+    and ('container', path) entries, where only the node itself is checked
+    (e.g. required keys after a removal). Untouched parts are assumed to
+    be as valid as they were before the edit.
+    """
+    value_roots: List[Tuple] = []
+    for path in sorted({tuple(path) for kind, path in touched if kind == 'value'}, key=len):
+        if not any(path[:len(root)] == root for root in value_roots):
+            value_roots.append(path)
+    containers = sorted(
+        path for path in {tuple(path) for kind, path in touched if kind == 'container'}
+        if not any(path[:len(root)] == root for root in value_roots)
+    )
+    
+    errors: List[Dict[str, str]] = []
+    checked: List[str] = []
+    try:
+        for path, shallow in [(path, False) for path in value_roots] + [(path, True) for path in containers]:
+            found, node = _resolve_path(data, path)
+            if not found:
+                continue
+            checked.append(json_pointer(path))
+            is_valid, validator = subschema_validators(list(path), shallow)
+            if not is_valid(node):
+                errors.extend(collect_schema_errors(node, validator, json_pointer(path)))
+    except Exception as e:
+        errors.append({"path": "", "message": f"Validation error: {str(e)}"})
+    
+    return {
+        "valid": not errors,
+        "errors": errors,
+        "warnings": [],
+        "checkedPaths": checked
+    }
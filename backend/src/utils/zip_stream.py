@@ -0,0 +1,73 @@
+import time
+import zipfile
+from typing import BinaryIO, Iterator, List
+
+# Read size when copying an entry into the archive
+ZIP_CHUNK = 64 * 1024
+
+
+class _Sink:
+    """
+    Write-only, non-seekable file object collecting what zipfile writes
+    until the stream drains it. zipfile notices the missing tell() and
+    switches to data descriptors, so nothing is ever rewritten.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ZipStream:
+    """
+    A zip archive produced chunk by chunk for a streaming response. Each
+    add_* call yields the archive bytes as they are written, so at most
+    one read chunk is buffered at a time, never the archive.
+    """
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode='w', allowZip64=True)
+
+    def add_fileobj(self, name: str, source: BinaryIO, compress: bool = False) -> Iterator[bytes]:
+        """
+        Copy a file object into the archive; PDFs are already compressed,
+        so entries are stored unless asked otherwise
+        """
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with self._zip.open(info, 'w') as target:
+            for chunk in iter(lambda: source.read(ZIP_CHUNK), b''):
+                target.write(chunk)
+                yield from self._drain()
+        yield from self._drain()
+
+    def add_bytes(self, name: str, data: bytes, compress: bool = True) -> Iterator[bytes]:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        self._zip.writestr(info, data)
+        yield from self._drain()
+
+    def close(self) -> Iterator[bytes]:
+        """
+        Write the central directory
+        """
+        self._zip.close()
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[bytes]:
+        data = self._sink.drain()
+        if data:
+            yield data
@@ -0,0 +1,111 @@
+"""
+CompileCache: key normalisation, plain and gzip storage round-trips,
+content hashes, LRU eviction under max_bytes and index rebuild on start.
+"""
+
+import gzip
+import hashlib
+import os
+
+import pytest
+
+from src.services.compile_cache import CompileCache, normalize_tex
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    def write(data: bytes, name: str = 'out.pdf') -> str:
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+
+def test_normalize_tex():
+    assert normalize_tex('a  \r\nb\t\rc\n\n\n') == 'a\nb\nc\n'
+    assert normalize_tex('a') == 'a\n'
+    # Leading whitespace is significant to TeX and kept
+    assert normalize_tex('  a') == '  a\n'
+
+
+def test_key_for_ignores_insignificant_differences():
+    key = CompileCache.key_for('\\a \r\n\\b\n', 'pdflatex', 'v1')
+    assert key == CompileCache.key_for('\\a\n\\b', 'pdflatex', 'v1')
+    assert key != CompileCache.key_for('\\a\n \\b', 'pdflatex', 'v1')
+    assert key != CompileCache.key_for('\\a\n\\b', 'tectonic', 'v1')
+    assert key != CompileCache.key_for('\\a\n\\b', 'pdflatex', 'v2')
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_put_file_round_trip(tmp_path, pdf_file, compress):
+    cache = CompileCache(str(tmp_path / 'cache'), max_bytes=10 ** 6, compress=compress)
+    data = b'%PDF-1.5\n' + os.urandom(2000) + b'%%EOF'
+    source = pdf_file(data)
+    entry = cache.put_file('k1', source, ['Overfull \\hbox'])
+
+    assert entry['sha256'] == hashlib.sha256(data).hexdigest()
+    assert entry['size'] == len(data) and entry['compressed'] is compress
+    assert entry['path'].endswith('.pdf.gz' if compress else '.pdf')
+    with open(entry['path'], 'rb') as f:
+        stored = f.read()
+    assert (gzip.decompress(stored) if compress else stored) == data
+
+    looked_up = cache.entry('k1')
+    assert looked_up == entry
+    assert cache.get('k1') == (data, ['Overfull \\hbox'])
+    # The engine's output file is copied, not moved
+    assert os.path.exists(source)
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_put_bytes_records_sha256(tmp_path, compress):
+    cache = CompileCache(str(tmp_path), max_bytes=10 ** 6, compress=compress)
+    cache.put('k', b'%PDF-data', [])
+    assert cache.entry('k')['sha256'] == hashlib.sha256(b'%PDF-data').hexdigest()
+    assert cache.get('k') == (b'%PDF-data', [])
+
+
+def test_miss_and_vanished_entry(tmp_path, pdf_file):
+    cache = CompileCache(str(tmp_path / 'cache'), max_bytes=10 ** 6)
+    assert cache.entry('nope') is None
+    entry = cache.put_file('k', pdf_file(b'%PDF'), [])
+    os.unlink(entry['path'])
+    assert cache.entry('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction_under_max_bytes(tmp_path, pdf_file):
+    # Each entry is 1000 bytes of PDF plus ~100 bytes of metadata
+    cache = CompileCache(str(tmp_path / 'cache'), max_bytes=3500)
+    for key in ('a', 'b', 'c'):
+        cache.put_file(key, pdf_file(os.urandom(1000)), [])
+    assert cache.entry('a') is not None  # 'a' becomes most recent
+    cache.put_file('d', pdf_file(os.urandom(1000)), [])
+
+    assert cache.entry('b') is None
+    assert all(cache.entry(key) is not None for key in ('a', 'c', 'd'))
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['bytes'] <= 3500
+    assert not any(name.startswith('b.') for name in os.listdir(tmp_path / 'cache'))
+
+
+def test_index_rebuilt_from_disk(tmp_path, pdf_file):
+    directory = str(tmp_path / 'cache')
+    cache = CompileCache(directory, max_bytes=10 ** 6)
+    for key in ('a', 'b'):
+        cache.put_file(key, pdf_file(os.urandom(500)), ['w'])
+    reopened = CompileCache(directory, max_bytes=10 ** 6)
+    assert reopened.stats()['entries'] == 2
+    assert reopened.stats()['bytes'] == cache.stats()['bytes']
+    assert reopened.entry('b')['warnings'] == ['w']
+
+    # A smaller cap on restart evicts down to it straight away
+    shrunk = CompileCache(directory, max_bytes=700)
+    assert shrunk.stats()['entries'] == 1
+
+
+def test_put_file_failure_returns_none(tmp_path):
+    cache = CompileCache(str(tmp_path / 'cache'), max_bytes=10 ** 6)
+    assert cache.put_file('k', str(tmp_path / 'missing.pdf'), []) is None
+    assert cache.entry('k') is None
+    assert not [name for name in os.listdir(tmp_path / 'cache') if name.endswith('.tmp')]
@@ -0,0 +1,172 @@
+"""
+CompileScheduler: queue-full rejection, queue wait timeouts, killing the
+whole process group on timeout and the prlimit command prefix. Jobs are
+short `python -c` children rather than a TeX engine.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from src.services import compile_scheduler as scheduler_module
+from src.services.compile_scheduler import CompileQueueTimeout, CompileScheduler, CompileTimeout, _limit_prefix
+
+
+@pytest.fixture(autouse=True)
+def no_prlimit(monkeypatch):
+    monkeypatch.setattr(scheduler_module, 'PRLIMIT', None)
+
+
+def hold_slot(scheduler: CompileScheduler):
+    """
+    Take the scheduler's only slot on another thread until the returned
+    event is set
+    """
+    held, release = threading.Event(), threading.Event()
+
+    def worker():
+        with scheduler.slot():
+            held.set()
+            release.wait(10)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert held.wait(5)
+    return release, thread
+
+
+def hold_briefly(scheduler: CompileScheduler):
+    with scheduler.slot():
+        pass
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            # Killed but not yet reaped by its new parent
+            return stat.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+def test_queue_full_is_rejected():
+    scheduler = CompileScheduler(max_concurrency=1, max_queue=1, queue_timeout=5)
+    release, thread = hold_slot(scheduler)
+    # A second job takes the only place in the queue
+    waiter = threading.Thread(target=lambda: hold_briefly(scheduler))
+    waiter.start()
+    try:
+        for _ in range(50):
+            if scheduler.stats()['waiting'] == 1:
+                break
+            time.sleep(0.05)
+        assert scheduler.stats()['waiting'] == 1
+        started = time.monotonic()
+        with pytest.raises(CompileQueueTimeout, match='full'):
+            with scheduler.slot():
+                pass
+        # Rejected up front rather than after waiting out queue_timeout
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+        thread.join()
+        waiter.join()
+    stats = scheduler.stats()
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 0
+    assert stats['waiting'] == 0 and stats['running'] == 0
+
+
+def test_queue_wait_times_out():
+    scheduler = CompileScheduler(max_concurrency=1, max_queue=4, queue_timeout=0.2)
+    release, thread = hold_slot(scheduler)
+    try:
+        with pytest.raises(CompileQueueTimeout, match='No compile slot'):
+            with scheduler.slot():
+                pass
+        # A deadline already in the past never waits at all
+        with pytest.raises(CompileQueueTimeout):
+            with scheduler.slot(deadline=time.monotonic() - 1):
+                pass
+    finally:
+        release.set()
+        thread.join()
+    assert scheduler.stats()['queueTimeouts'] == 2
+
+    # The slot is free again once the holder leaves
+    with scheduler.slot():
+        assert scheduler.stats()['running'] == 1
+    assert scheduler.stats()['running'] == 0
+
+
+def test_run_returns_output(tmp_path):
+    scheduler = CompileScheduler()
+    result = scheduler.run([sys.executable, '-c', 'print("ok")'], str(tmp_path), dict(os.environ))
+    assert result.returncode == 0
+    assert result.stdout.strip() == 'ok'
+    assert scheduler.stats()['completed'] == 1
+
+
+def test_timeout_kills_process_group(tmp_path):
+    pid_file = tmp_path / 'grandchild.pid'
+    # The child starts a grandchild in its process group, then hangs
+    script = (
+        'import subprocess, sys, time\n'
+        'child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])\n'
+        f'open({str(pid_file)!r}, "w").write(str(child.pid))\n'
+        'time.sleep(30)\n'
+    )
+    scheduler = CompileScheduler()
+
+    started = time.monotonic()
+    with pytest.raises(CompileTimeout):
+        scheduler.run([sys.executable, '-c', script], str(tmp_path), dict(os.environ), timeout=1)
+    assert time.monotonic() - started < 10
+    assert scheduler.stats()['kills'] == 1
+    assert scheduler.stats()['completed'] == 0
+
+    grandchild = int(pid_file.read_text())
+    for _ in range(50):
+        if not is_alive(grandchild):
+            break
+        time.sleep(0.1)
+    assert not is_alive(grandchild)
+
+
+def test_limit_prefix_without_prlimit():
+    assert _limit_prefix(60, 1024, 64) == []
+
+
+def test_limit_prefix(monkeypatch):
+    monkeypatch.setattr(scheduler_module, 'PRLIMIT', '/usr/bin/prlimit')
+    assert _limit_prefix(60, 1024, 64) == [
+        '/usr/bin/prlimit', '--cpu=60:61', f'--as={1024 * 1024 * 1024}', f'--fsize={64 * 1024 * 1024}', '--'
+    ]
+    # Zero disables a limit, and no limits at all means no prlimit
+    assert _limit_prefix(0, 512, 0) == ['/usr/bin/prlimit', f'--as={512 * 1024 * 1024}', '--']
+    assert _limit_prefix(0, 0, 0) == []
+
+
+def test_run_applies_prefix(monkeypatch, tmp_path):
+    # Stand in for prlimit with a wrapper that records its arguments
+    wrapper = tmp_path / 'prlimit'
+    wrapper.write_text(
+        f'#!{sys.executable}\n'
+        'import os, sys\n'
+        'open(os.path.join(os.path.dirname(sys.argv[0]), "args"), "w").write("\\n".join(sys.argv[1:]))\n'
+        'command = sys.argv[sys.argv.index("--") + 1:]\n'
+        'os.execvp(command[0], command)\n'
+    )
+    wrapper.chmod(0o755)
+    monkeypatch.setattr(scheduler_module, 'PRLIMIT', str(wrapper))
+
+    result = CompileScheduler().run([sys.executable, '-c', 'print("ok")'], str(tmp_path), dict(os.environ))
+    assert result.stdout.strip() == 'ok'
+    # The result reports the engine command, not the wrapper
+    assert result.args[0] == sys.executable
+    args = (tmp_path / 'args').read_text().splitlines()
+    assert args[0].startswith('--cpu=')
+    assert args[-4:] == ['--', sys.executable, '-c', 'print("ok")']
@@ -0,0 +1,196 @@
+"""
+RFC 6902 behaviour of apply_patch (the Appendix A examples plus the
+edge cases the editor relies on) and the touched paths that drive
+partial re-validation.
+"""
+
+import copy
+
+import pytest
+
+from src.utils.json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch, parse_pointer
+from src.utils.validation import validate_resume_subtrees
+
+
+def patched(document, operations):
+    original = copy.deepcopy(document)
+    result, _ = apply_patch(document, operations)
+    # The input is never mutated, whatever the patch did
+    assert document == original
+    return result
+
+
+# RFC 6902 Appendix A: (document, patch, expected result)
+APPENDIX_A = {
+    'A.1 add object member': ({'foo': 'bar'}, [{'op': 'add', 'path': '/baz', 'value': 'qux'}],
+                              {'baz': 'qux', 'foo': 'bar'}),
+    'A.2 add array element': ({'foo': ['bar', 'baz']}, [{'op': 'add', 'path': '/foo/1', 'value': 'qux'}],
+                              {'foo': ['bar', 'qux', 'baz']}),
+    'A.3 remove object member': ({'baz': 'qux', 'foo': 'bar'}, [{'op': 'remove', 'path': '/baz'}], {'foo': 'bar'}),
+    'A.4 remove array element': ({'foo': ['bar', 'qux', 'baz']}, [{'op': 'remove', 'path': '/foo/1'}],
+                                 {'foo': ['bar', 'baz']}),
+    'A.5 replace value': ({'baz': 'qux', 'foo': 'bar'}, [{'op': 'replace', 'path': '/baz', 'value': 'boo'}],
+                          {'baz': 'boo', 'foo': 'bar'}),
+    'A.6 move value': ({'foo': {'bar': 'baz', 'waldo': 'fred'}, 'qux': {'corge': 'grault'}},
+                       [{'op': 'move', 'from': '/foo/waldo', 'path': '/qux/thud'}],
+                       {'foo': {'bar': 'baz'}, 'qux': {'corge': 'grault', 'thud': 'fred'}}),
+    'A.7 move array element': ({'foo': ['all', 'grass', 'cows', 'eat']},
+                               [{'op': 'move', 'from': '/foo/1', 'path': '/foo/3'}],
+                               {'foo': ['all', 'cows', 'eat', 'grass']}),
+    'A.8 test value success': ({'baz': 'qux', 'foo': ['a', 2, 'c']},
+                               [{'op': 'test', 'path': '/baz', 'value': 'qux'},
+                                {'op': 'test', 'path': '/foo/1', 'value': 2}],
+                               {'baz': 'qux', 'foo': ['a', 2, 'c']}),
+    'A.10 add nested member': ({'foo': 'bar'}, [{'op': 'add', 'path': '/child', 'value': {'grandchild': {}}}],
+                               {'foo': 'bar', 'child': {'grandchild': {}}}),
+    'A.11 ignore unrecognized elements': ({'foo': 'bar'},
+                                          [{'op': 'add', 'path': '/baz', 'value': 'qux', 'xyz': 123}],
+                                          {'foo': 'bar', 'baz': 'qux'}),
+    'A.14 escape ordering': ({'/': 9, '~1': 10}, [{'op': 'test', 'path': '/~01', 'value': 10}],
+                             {'/': 9, '~1': 10}),
+    'A.16 add array value': ({'foo': ['bar']}, [{'op': 'add', 'path': '/foo/-', 'value': ['abc', 'def']}],
+                             {'foo': ['bar', ['abc', 'def']]}),
+}
+
+
+@pytest.mark.parametrize('name', list(APPENDIX_A))
+def test_rfc_appendix_a(name):
+    document, operations, expected = APPENDIX_A[name]
+    assert patched(document, operations) == expected
+
+
+@pytest.mark.parametrize('document, operations, error', [
+    # A.9 test value error
+    ({'baz': 'qux'}, [{'op': 'test', 'path': '/baz', 'value': 'bar'}], JsonPatchTestFailed),
+    # A.12 add to a nonexistent target
+    ({'foo': 'bar'}, [{'op': 'add', 'path': '/baz/bat', 'value': 'qux'}], JsonPatchError),
+    # A.15 strings and numbers never compare equal
+    ({'/': 9, '~1': 10}, [{'op': 'test', 'path': '/~01', 'value': '10'}], JsonPatchTestFailed),
+    # Booleans are not numbers either
+    ({'a': 1}, [{'op': 'test', 'path': '/a', 'value': True}], JsonPatchTestFailed),
+    ({'a': [1]}, [{'op': 'remove', 'path': '/a/01'}], JsonPatchError),
+    ({'a': [1]}, [{'op': 'replace', 'path': '/a/1', 'value': 2}], JsonPatchError),
+    ({'a': [1]}, [{'op': 'add', 'path': '/a/2', 'value': 2}], JsonPatchError),
+    ({'a': [1]}, [{'op': 'remove', 'path': '/a/-'}], JsonPatchError),
+    ({'a': 1}, [{'op': 'remove', 'path': '/b'}], JsonPatchError),
+    ({'a': 1}, [{'op': 'replace', 'path': '/b', 'value': 2}], JsonPatchError),
+    ({'a': 1}, [{'op': 'remove', 'path': ''}], JsonPatchError),
+    ({'a': 1}, [{'op': 'add', 'path': '/a'}], JsonPatchError),
+    ({'a': 1}, [{'op': 'move', 'path': '/b'}], JsonPatchError),
+    ({'a': 1}, [{'op': 'frobnicate', 'path': '/a'}], JsonPatchError),
+    ({'a': 1}, [{'path': '/a'}], JsonPatchError),
+    ({'a': {'b': {}}}, [{'op': 'move', 'from': '/a', 'path': '/a/b/c'}], JsonPatchError),
+    ({'a': 'text'}, [{'op': 'add', 'path': '/a/b', 'value': 1}], JsonPatchError),
+    ({'a': 1}, {'op': 'remove', 'path': '/a'}, JsonPatchError),
+])
+def test_errors(document, operations, error):
+    original = copy.deepcopy(document)
+    with pytest.raises(error):
+        apply_patch(document, operations)
+    assert document == original
+
+
+def test_patch_is_atomic():
+    document = {'a': [1, 2]}
+    with pytest.raises(JsonPatchTestFailed):
+        apply_patch(document, [{'op': 'remove', 'path': '/a/0'}, {'op': 'test', 'path': '/a/0', 'value': 1}])
+    assert document == {'a': [1, 2]}
+
+
+def test_root_operations_and_copy():
+    assert patched({'a': 1}, [{'op': 'replace', 'path': '', 'value': [1]}]) == [1]
+    assert patched({'a': 1}, [{'op': 'add', 'path': '', 'value': {'b': 2}}]) == {'b': 2}
+    document = {'a': {'x': [1]}}
+    result = patched(document, [{'op': 'copy', 'from': '/a', 'path': '/b'}, {'op': 'add', 'path': '/b/x/-', 'value': 2}])
+    assert result == {'a': {'x': [1]}, 'b': {'x': [1, 2]}}
+
+
+def test_move_to_same_path_and_to_prefix_sibling():
+    assert patched({'a': 1}, [{'op': 'move', 'from': '/a', 'path': '/a'}]) == {'a': 1}
+    # '/ab' starts with '/a' but is not a child of it
+    assert patched({'a': 1}, [{'op': 'move', 'from': '/a', 'path': '/ab'}]) == {'ab': 1}
+
+
+def test_untouched_subtrees_are_shared():
+    document = {'a': {'x': 1}, 'b': {'y': [1, 2]}}
+    result, _ = apply_patch(document, [{'op': 'replace', 'path': '/a/x', 'value': 2}])
+    assert result['b'] is document['b']
+    assert result['a'] is not document['a']
+
+
+def test_parse_pointer():
+    assert parse_pointer('') == []
+    assert parse_pointer('/a~1b/~0c/0') == ['a/b', '~c', '0']
+    with pytest.raises(JsonPatchError):
+        parse_pointer('a/b')
+
+
+# Touched paths
+
+def test_touched_for_each_operation():
+    document = {'a': {'b': 1}, 'list': [0, 1]}
+    _, touched = apply_patch(document, [{'op': 'replace', 'path': '/a/b', 'value': 2}])
+    assert touched == [('value', ['a', 'b'])]
+    _, touched = apply_patch(document, [{'op': 'remove', 'path': '/a/b'}])
+    assert touched == [('container', ['a'])]
+    _, touched = apply_patch(document, [{'op': 'add', 'path': '/list/-', 'value': 2}])
+    assert touched == [('value', ['list', 2]), ('container', ['list'])]
+    _, touched = apply_patch(document, [{'op': 'move', 'from': '/a/b', 'path': '/c'}])
+    assert touched == [('container', ['a']), ('value', ['c']), ('container', [])]
+
+
+def test_touched_paths_follow_shifting_elements():
+    document = {'items': ['a', 'b', 'c']}
+    result, touched = apply_patch(document, [
+        {'op': 'replace', 'path': '/items/1', 'value': 'B'},
+        {'op': 'add', 'path': '/items/0', 'value': 'z'},
+    ])
+    assert result == {'items': ['z', 'a', 'B', 'c']}
+    # The edited 'B' is now at index 2
+    assert ('value', ['items', 2]) in touched
+    assert ('value', ['items', 1]) not in touched
+
+    result, touched = apply_patch(document, [
+        {'op': 'replace', 'path': '/items/2', 'value': 'C'},
+        {'op': 'replace', 'path': '/items/1', 'value': 'B'},
+        {'op': 'remove', 'path': '/items/1'},
+    ])
+    assert result == {'items': ['a', 'C']}
+    # The removed element's entry is dropped, the later one shifts down
+    assert [entry for entry in touched if entry[0] == 'value'] == [('value', ['items', 1])]
+
+
+def _resume():
+    return {
+        'meta': {'region': 'US', 'seniority': 'mid', 'tone': 'standard', 'atsKeywords': []},
+        'contact': {'name': 'Jane'},
+        'summary': 'Engineer',
+        'experience': [{'company': 'A', 'role': 'Dev', 'startDate': '2020'},
+                       {'company': 'B', 'role': 'Dev', 'startDate': '2021'}],
+        'skills': {'languages': ['Go']},
+    }
+
+
+def test_touched_drives_subtree_validation():
+    result, touched = apply_patch(_resume(), [{'op': 'replace', 'path': '/experience/1/company', 'value': 'C'}])
+    report = validate_resume_subtrees(result, touched)
+    assert report['valid'] and report['checkedPaths'] == ['/experience/1/company']
+
+    result, touched = apply_patch(_resume(), [{'op': 'replace', 'path': '/experience/0/company', 'value': 7}])
+    report = validate_resume_subtrees(result, touched)
+    assert not report['valid']
+    assert [error['path'] for error in report['errors']] == ['/experience/0/company']
+
+    # Removing a required key is caught by the shallow container check
+    result, touched = apply_patch(_resume(), [{'op': 'remove', 'path': '/contact/name'}])
+    report = validate_resume_subtrees(result, touched)
+    assert not report['valid'] and report['checkedPaths'] == ['/contact']
+
+    # An invalid element inserted in front is still found after the shift
+    result, touched = apply_patch(_resume(), [
+        {'op': 'add', 'path': '/experience/0', 'value': {'company': 'X'}},
+        {'op': 'add', 'path': '/experience/0', 'value': {'company': 'Y', 'role': 'R', 'startDate': 'S'}},
+    ])
+    report = validate_resume_subtrees(result, touched)
+    assert not report['valid']
+    assert {error['path'] for error in report['errors']} == {'/experience/1'}
@@ -0,0 +1,103 @@
+"""
+Property tests for the table-driven escaper: it must equal the escape
+map applied character by character, agree with the chained-replace
+escaper it replaced (apart from the two intentional fixes), and batch
+escaping must equal escaping field by field.
+"""
+
+import random
+
+import pytest
+
+from src.utils.latex_escape import ESCAPE_MAP, LATEX_SPECIALS, escape_latex, escape_latex_many
+
+SEED = 20240607
+CASES = 20000
+
+PLAIN = list('abcXYZ019 .,;:!?-()[]<>/@+=*|\'`\n\t') + ['é', 'ß', 'Ж', '中', '😀']
+# Every mapped character plus the field separator escape_latex_many uses
+ALPHABET = PLAIN + list(ESCAPE_MAP) + ['"', '\x1e']
+# Characters the old chain handled, minus the two it got wrong
+OLD_ALPHABET = PLAIN + [c for c in LATEX_SPECIALS if c != '\\'] + ['—', '–']
+
+
+def old_escape_latex(text):
+    """
+    The chained str.replace escaper this module replaced, as it behaved
+    (its smart-quote lines only ever matched ASCII ")
+    """
+    if not text:
+        return ""
+    text = str(text)
+    text = text.replace('"', '``')
+    text = text.replace('—', '---').replace('–', '--')
+    text = text.replace('\\', r'\textbackslash{}')
+    text = text.replace('&', r'\&')
+    text = text.replace('%', r'\%')
+    text = text.replace('$', r'\$')
+    text = text.replace('#', r'\#')
+    text = text.replace('_', r'\_')
+    text = text.replace('{', r'\{')
+    text = text.replace('}', r'\}')
+    text = text.replace('~', r'\textasciitilde{}')
+    text = text.replace('^', r'\textasciicircum{}')
+    return text
+
+
+def reference_escape(text):
+    if not text:
+        return ""
+    return ''.join(ESCAPE_MAP.get(char, char) for char in str(text))
+
+
+def random_text(rng, alphabet, max_length=40):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+def test_matches_char_by_char_map():
+    rng = random.Random(SEED)
+    for _ in range(CASES):
+        text = random_text(rng, ALPHABET)
+        assert escape_latex(text) == reference_escape(text), repr(text)
+
+
+def test_matches_old_chain_outside_intentional_fixes():
+    rng = random.Random(SEED + 1)
+    for _ in range(CASES):
+        text = random_text(rng, OLD_ALPHABET)
+        assert escape_latex(text) == old_escape_latex(text), repr(text)
+
+
+@pytest.mark.parametrize('text, new, old', [
+    # The chain escaped the braces of the replacement it had just inserted
+    ('a\\b', r'a\textbackslash{}b', r'a\textbackslash\{\}b'),
+    # The chain turned every ASCII double quote into an opening quote
+    ('say "hi"', 'say "hi"', 'say ``hi``'),
+])
+def test_intentional_differences(text, new, old):
+    assert escape_latex(text) == new
+    assert old_escape_latex(text) == old
+
+
+@pytest.mark.parametrize('value', [None, '', 0, False, [], 12, 3.5])
+def test_non_string_values(value):
+    assert escape_latex(value) == old_escape_latex(value) == reference_escape(value)
+
+
+def test_many_matches_one_by_one():
+    rng = random.Random(SEED + 2)
+    for _ in range(CASES // 10):
+        fields = [random_text(rng, ALPHABET, 12) for _ in range(rng.randint(0, 8))]
+        assert escape_latex_many(fields) == [escape_latex(field) for field in fields], fields
+
+
+def test_many_falls_back_when_a_field_contains_the_separator():
+    fields = ['a&b', 'x\x1ey', '', None, '100%']
+    assert escape_latex_many(fields) == ['a\\&b', 'x\x1ey', '', '', '100\\%']
+    assert escape_latex_many(['\x1e', '\x1e\x1e']) == ['\x1e', '\x1e\x1e']
+
+
+def test_many_empty_and_single():
+    assert escape_latex_many([]) == []
+    assert escape_latex_many(['']) == ['']
+    assert escape_latex_many(['_']) == ['\\_']
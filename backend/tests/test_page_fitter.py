@@ -0,0 +1,109 @@
+"""
+PageFitter: level overrides and the page probe, the binary search over
+FIT_LEVELS, cached results and documents that never fit. A stub compiler
+counts pages from the level written into the source, so no engine runs.
+"""
+
+import math
+import re
+
+import pytest
+
+from src.services.page_fitter import FIT_LEVELS, PAGE_PROBE, PageFitter, apply_level
+
+TEX = '\\documentclass{article}\n\\begin{document}\nHello\n\\end{document}\n'
+
+
+class StubEngine:
+    name = 'stub'
+
+    def version(self) -> str:
+        return '1'
+
+
+class StubCompiler:
+    """
+    One page from `fits_at` upwards, two below it; None never fits
+    """
+
+    def __init__(self, fits_at):
+        self.engine = StubEngine()
+        self.fits_at = fits_at
+        self.probes = []
+
+    def count_pages(self, tex_string: str, deadline=None) -> int:
+        assert PAGE_PROBE in tex_string
+        match = re.search(r'% fit-to-page level (\d+)', tex_string)
+        level = int(match.group(1)) if match else 0
+        self.probes.append(level)
+        return 1 if self.fits_at is not None and level >= self.fits_at else 2
+
+
+def test_apply_level():
+    assert apply_level(TEX, 0) == TEX
+    tight = apply_level(TEX, 3)
+    assert tight.startswith('\\documentclass{article}\n\\begin{document}\n% fit-to-page level 3\n')
+    assert '\\fontsize{10.5pt}{12.6pt}\\selectfont' in tight
+    assert tight.endswith('\nHello\n\\end{document}\n')
+    # The probe goes in after the overrides, and alone at level 0
+    assert apply_level(TEX, 3, probe=True).index(PAGE_PROBE) > tight.index('level 3')
+    assert PAGE_PROBE in apply_level(TEX, 0, probe=True)
+
+
+def test_apply_level_needs_begin_document():
+    with pytest.raises(ValueError):
+        apply_level('\\documentclass{article}', 2)
+
+
+def test_fits_as_is():
+    compiler = StubCompiler(fits_at=0)
+    result = PageFitter().fit(TEX, compiler)
+    assert result['texString'] == TEX
+    assert (result['level'], result['pages'], result['fits']) == (0, 1, True)
+    assert compiler.probes == [0]
+    assert result['iterations'] == 1
+
+
+@pytest.mark.parametrize('fits_at', range(1, len(FIT_LEVELS)))
+def test_finds_loosest_fitting_level(fits_at):
+    compiler = StubCompiler(fits_at=fits_at)
+    result = PageFitter().fit(TEX, compiler)
+    assert result['level'] == fits_at
+    assert result['fits'] and result['pages'] == 1
+    assert f'% fit-to-page level {fits_at}\n' in result['texString']
+    assert PAGE_PROBE not in result['texString']
+
+    # As-is and densest first, then a binary search; no level twice
+    assert compiler.probes[:2] == [0, len(FIT_LEVELS) - 1]
+    assert len(compiler.probes) == len(set(compiler.probes)) == result['iterations']
+    assert result['iterations'] <= 2 + math.ceil(math.log2(len(FIT_LEVELS) - 1))
+
+
+def test_never_fits_uses_densest_level():
+    compiler = StubCompiler(fits_at=None)
+    result = PageFitter().fit(TEX, compiler)
+    densest = len(FIT_LEVELS) - 1
+    assert (result['level'], result['pages'], result['fits']) == (densest, 2, False)
+    # No search once the densest level is known to overflow
+    assert compiler.probes == [0, densest]
+
+
+def test_repeat_fit_is_cached():
+    fitter = PageFitter()
+    first = fitter.fit(TEX, StubCompiler(fits_at=4))
+
+    compiler = StubCompiler(fits_at=4)
+    # Line-ending and trailing-space differences are the same source
+    again = fitter.fit(TEX.replace('\n', ' \r\n'), compiler)
+    assert compiler.probes == []
+    assert again['iterations'] == 0
+    assert (again['level'], again['pages']) == (first['level'], first['pages'])
+
+
+def test_cache_is_per_engine_version():
+    fitter = PageFitter()
+    fitter.fit(TEX, StubCompiler(fits_at=2))
+
+    compiler = StubCompiler(fits_at=2)
+    compiler.engine.version = lambda: '2'
+    assert fitter.fit(TEX, compiler)['iterations'] > 0
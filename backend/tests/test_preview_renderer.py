@@ -0,0 +1,55 @@
+"""
+Preview renderers: only safe links are clickable, and null fields render
+empty instead of failing.
+"""
+
+import pytest
+
+from src.services.block_cache import BlockCache
+from src.services.preview_renderer import PREVIEW_RENDERERS, HTMLRenderer, MarkdownRenderer, PreviewRenderer
+
+
+@pytest.mark.parametrize('href, safe', [
+    ('https://example.com/a?b=c#d', True),
+    ('HTTP://example.com', True),
+    ('mailto:jane@example.com', True),
+    ('javascript:alert(1)', False),
+    ('JaVaScRiPt:alert(1)', False),
+    ('java\tscript:alert(1)', False),
+    (' javascript:alert(1)', False),
+    ('data:text/html,<b>x</b>', False),
+    ('example.com/jane', False),
+    ('//evil.example', False),
+    ('https://x.example/a>[y](javascript:alert(1))', False),
+    ('https://x.example/<a', False),
+    ('https://x.example/\nnext', False),
+    ('', False),
+    (None, False),
+])
+def test_is_safe_href(href, safe):
+    assert PreviewRenderer._is_safe_href(href) is safe
+
+
+def test_unsafe_links_render_as_text():
+    html = HTMLRenderer(BlockCache())
+    assert html._link('x', 'javascript:alert(1)') == 'x'
+    assert html._link('x', 'https://a.example/?q=1&r="') == '<a href="https://a.example/?q=1&amp;r=&quot;">x</a>'
+    markdown = MarkdownRenderer(BlockCache())
+    assert markdown._link('x', 'https://a.example/>(javascript:1)') == 'x'
+    assert markdown._link('x', 'https://a.example/') == '[x](<https://a.example/>)'
+
+
+@pytest.mark.parametrize('format_name', list(PREVIEW_RENDERERS))
+def test_null_fields_render(format_name):
+    document = {
+        'contact': {'name': None, 'email': None, 'links': [{'label': None, 'url': 'javascript:alert(1)'}, None]},
+        'experience': [{'company': None, 'role': None, 'startDate': None, 'bullets': [None, {'text': None}]}],
+        'projects': [{'name': None, 'url': 'javascript:alert(2)', 'bullets': None}],
+        'education': [{'institution': None, 'degree': 'BSc', 'endDate': None}],
+        'skills': {'languages': [None, 'Go'], 'tools': [None]},
+    }
+    output = PREVIEW_RENDERERS[format_name](BlockCache()).render(document)
+    assert 'None' not in output
+    assert 'BSc' in output and 'Go' in output
+    if format_name == 'html':
+        assert 'href="javascript' not in output
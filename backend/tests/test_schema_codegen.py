@@ -0,0 +1,125 @@
+"""
+Differential tests: the generated validator must agree with jsonschema's
+Draft7Validator on fuzzed documents, for the whole resume schema and for
+every sub-schema the patch path validates on its own.
+"""
+
+import random
+
+import pytest
+from jsonschema import Draft7Validator
+
+from src.utils.resume_schema import RESUME_SCHEMA, RESUME_VALIDATOR, subschema_validators
+from src.utils.schema_codegen import compile_schema
+
+SEED = 20240601
+DOCUMENTS = 3000
+
+# Values of every JSON type, including the ones Draft 7 treats specially
+# (bool is not an integer, 1.0 is)
+PRIMITIVES = [None, True, False, 0, 1, 1.0, 2.5, -3, '', 'x', 'US', 'senior', [], ['a'], [1], {}, {'name': 'n'}]
+
+
+def generate(schema, rng, depth=0):
+    """
+    A value that satisfies `schema` (optional keys and array sizes vary)
+    """
+    if not isinstance(schema, dict) or not schema:
+        return rng.choice(PRIMITIVES)
+    if 'enum' in schema:
+        return rng.choice(schema['enum'])
+    types = schema.get('type')
+    kind = rng.choice(types) if isinstance(types, list) else types
+    if kind == 'object':
+        document = {}
+        for key, subschema in schema.get('properties', {}).items():
+            if key in schema.get('required', []) or rng.random() < 0.6:
+                document[key] = generate(subschema, rng, depth + 1)
+        return document
+    if kind == 'array':
+        return [generate(schema.get('items', {}), rng, depth + 1) for _ in range(rng.randint(0, 3 if depth < 4 else 1))]
+    if kind == 'null':
+        return None
+    return rng.choice(['', 'text', 'Senior Engineer', '2020-01'])
+
+
+def mutate(value, rng):
+    """
+    Copy of `value` with one random change somewhere in the tree:
+    a type swap, a dropped or extra key, or a replaced array item
+    """
+    if isinstance(value, dict) and value and rng.random() < 0.7:
+        value = dict(value)
+        key = rng.choice(list(value))
+        choice = rng.random()
+        if choice < 0.25:
+            del value[key]
+        elif choice < 0.35:
+            value['unexpected'] = rng.choice(PRIMITIVES)
+        else:
+            value[key] = mutate(value[key], rng)
+        return value
+    if isinstance(value, list) and value and rng.random() < 0.7:
+        value = list(value)
+        index = rng.randrange(len(value))
+        value[index] = mutate(value[index], rng)
+        return value
+    return rng.choice(PRIMITIVES + ['Other', 'exec', 'bogus-enum'])
+
+
+def fuzzed(schema, rng, count):
+    for _ in range(count):
+        value = generate(schema, rng)
+        for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+            value = mutate(value, rng)
+        yield value
+
+
+def schema_paths(schema, path=()):
+    """
+    Every path into `schema` the patch validator can be asked about
+    (array positions as index 0)
+    """
+    yield list(path)
+    if not isinstance(schema, dict):
+        return
+    for key, subschema in schema.get('properties', {}).items():
+        yield from schema_paths(subschema, path + (key,))
+    if 'items' in schema:
+        yield from schema_paths(schema['items'], path + (0,))
+
+
+def test_resume_schema_agrees_with_jsonschema():
+    rng = random.Random(SEED)
+    is_valid = compile_schema(RESUME_SCHEMA)
+    outcomes = set()
+    for document in fuzzed(RESUME_SCHEMA, rng, DOCUMENTS):
+        expected = RESUME_VALIDATOR.is_valid(document)
+        assert is_valid(document) == expected, document
+        outcomes.add(expected)
+    # The fuzzer must exercise both answers to prove anything
+    assert outcomes == {True, False}
+
+
+@pytest.mark.parametrize('value', PRIMITIVES)
+def test_resume_schema_agrees_on_primitives(value):
+    assert compile_schema(RESUME_SCHEMA)(value) == RESUME_VALIDATOR.is_valid(value)
+
+
+@pytest.mark.parametrize('shallow', [False, True])
+@pytest.mark.parametrize('path', list(schema_paths(RESUME_SCHEMA)), ids=lambda path: '/'.join(map(str, path)) or 'root')
+def test_subschema_validators_agree_with_jsonschema(path, shallow):
+    rng = random.Random(f'{SEED}:{path}:{shallow}')
+    fast, validator = subschema_validators(path, shallow)
+    subschema = validator.schema
+    for value in list(fuzzed(subschema, rng, 200)) + PRIMITIVES:
+        assert fast(value) == validator.is_valid(value), (path, value)
+        # The cached reference validator must match a fresh one for the same node
+        assert validator.is_valid(value) == Draft7Validator(subschema).is_valid(value)
+
+
+def test_unsupported_keywords_raise():
+    with pytest.raises(NotImplementedError):
+        compile_schema({'type': 'string', 'minLength': 1})
+    with pytest.raises(NotImplementedError):
+        compile_schema({'enum': [1, 2]})
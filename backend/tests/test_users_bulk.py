@@ -0,0 +1,187 @@
+"""
+POST /api/users/bulk against an in-memory SQLite database: conflicts with
+existing rows and within the request, matching RETURNING rows back to
+entry indexes, one INSERT per batch and the row-by-row retry after an
+IntegrityError.
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+
+from src.models.user import User, db
+from src.routes import user as user_routes
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    # One shared connection, so every session sees the same in-memory database
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': StaticPool,
+                                               'connect_args': {'check_same_thread': False}}
+    db.init_app(app)
+    app.register_blueprint(user_routes.user_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def inserts(app):
+    """
+    INSERT statements run against the database, as (statement, row count)
+    """
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('INSERT'):
+            seen.append((statement, statement.count('(?, ?)')))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield seen
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def add_user(username, email):
+    db.session.add(User(username=username, email=email))
+    db.session.commit()
+
+
+def users(count, prefix='user'):
+    return [{'username': f'{prefix}{i}', 'email': f'{prefix}{i}@example.com'} for i in range(count)]
+
+
+def stored():
+    return {user.username: (user.id, user.email) for user in User.query.all()}
+
+
+def test_creates_users_in_batches(client, inserts, monkeypatch):
+    monkeypatch.setattr(user_routes, 'USERS_BULK_BATCH_SIZE', 4)
+    entries = users(10)
+
+    response = client.post('/api/users/bulk', json={'users': entries})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['conflicts'] == [] and body['errors'] == []
+
+    # Every created row points back at the entry it came from
+    created = body['created']
+    assert [item['index'] for item in created] == list(range(10))
+    rows = stored()
+    for item in created:
+        assert item['username'] == entries[item['index']]['username']
+        assert item['email'] == entries[item['index']]['email']
+        assert rows[item['username']] == (item['id'], item['email'])
+
+    # One multi-row INSERT ... RETURNING per batch of 4
+    assert [count for _, count in inserts] == [4, 4, 2]
+    assert all('RETURNING' in statement for statement, _ in inserts)
+
+
+def test_conflicts_with_existing_users(client, inserts):
+    add_user('taken', 'taken@example.com')
+    inserts.clear()
+
+    response = client.post('/api/users/bulk', json={'users': [
+        {'username': 'taken', 'email': 'new@example.com'},
+        {'username': 'fresh', 'email': 'fresh@example.com'},
+        {'username': 'other', 'email': 'taken@example.com'},
+    ]})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['conflicts'] == [
+        {'index': 0, 'field': 'username', 'value': 'taken'},
+        {'index': 2, 'field': 'email', 'value': 'taken@example.com'},
+    ]
+    assert [(item['index'], item['username']) for item in body['created']] == [(1, 'fresh')]
+    # Conflicts are found up front, so the batch insert never fails
+    assert [count for _, count in inserts] == [1]
+    assert stored()['taken'][1] == 'taken@example.com'
+
+
+def test_duplicates_within_request(client):
+    response = client.post('/api/users/bulk', json={'users': [
+        {'username': 'ann', 'email': 'ann@example.com'},
+        {'username': 'ann', 'email': 'ann2@example.com'},
+        {'username': 'bob', 'email': 'ann@example.com'},
+        {'username': 'cid', 'email': 'cid@example.com'},
+    ]})
+    assert response.status_code == 201
+    body = response.get_json()
+    # The first occurrence wins; later ones are reported against it
+    assert [(item['index'], item['username']) for item in body['created']] == [(0, 'ann'), (3, 'cid')]
+    assert body['conflicts'] == [
+        {'index': 1, 'field': 'username', 'value': 'ann'},
+        {'index': 2, 'field': 'email', 'value': 'ann@example.com'},
+    ]
+    assert sorted(stored()) == ['ann', 'cid']
+
+
+def test_invalid_entries_are_reported(client):
+    response = client.post('/api/users/bulk', json={'users': [
+        'not an object',
+        {'username': '', 'email': 'a@example.com'},
+        {'username': 'a' * 81, 'email': 'a@example.com'},
+        {'username': 'ok'},
+        {'username': 'fine', 'email': 'fine@example.com'},
+    ]})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [error['index'] for error in body['errors']] == [0, 1, 2, 3]
+    assert [item['index'] for item in body['created']] == [4]
+
+
+def test_status_without_created_rows(client):
+    add_user('taken', 'taken@example.com')
+    conflicting = client.post('/api/users/bulk', json={'users': [{'username': 'taken', 'email': 'x@example.com'}]})
+    assert conflicting.status_code == 409
+    invalid = client.post('/api/users/bulk', json={'users': [{'username': 'x'}]})
+    assert invalid.status_code == 400
+
+
+@pytest.mark.parametrize('payload', [{}, {'users': []}, {'users': {'username': 'x'}}])
+def test_rejects_bad_payload(client, payload):
+    assert client.post('/api/users/bulk', json=payload).status_code == 400
+
+
+def test_rejects_too_many_users(client, monkeypatch):
+    monkeypatch.setattr(user_routes, 'USERS_BULK_MAX', 3)
+    response = client.post('/api/users/bulk', json={'users': users(4)})
+    assert response.status_code == 400
+    assert User.query.count() == 0
+
+
+def test_integrity_error_retries_row_by_row(client, inserts, monkeypatch):
+    # Rows inserted after the conflict check, as a concurrent request would
+    add_user('user1', 'elsewhere@example.com')
+    add_user('someone', 'user3@example.com')
+    inserts.clear()
+    monkeypatch.setattr(user_routes, '_existing', lambda column, values: set())
+    monkeypatch.setattr(user_routes, 'USERS_BULK_BATCH_SIZE', 5)
+
+    response = client.post('/api/users/bulk', json={'users': users(5)})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [item['index'] for item in body['created']] == [0, 2, 4]
+    # The retry cannot tell which unique column clashed
+    assert body['conflicts'] == [
+        {'index': 1, 'field': None, 'value': 'user1'},
+        {'index': 3, 'field': None, 'value': 'user3'},
+    ]
+
+    # The failed batch, then one INSERT per row
+    assert [count for _, count in inserts] == [5, 1, 1, 1, 1, 1]
+    rows = stored()
+    assert rows['user1'][1] == 'elsewhere@example.com'
+    assert 'user3' not in rows
+    for item in body['created']:
+        assert rows[item['username']][0] == item['id']
@@ -60,7 +60,7 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "": ["*.md", "*.txt", "*.json", "*.js", "*.jsx", "*.css", "*.html"],
+        "": ["*.md", "*.txt", "*.json", "*.js", "*.jsx", "*.css", "*.html", "*.tex"],
     },
     zip_safe=False,
 )